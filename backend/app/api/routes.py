@@ -7,9 +7,13 @@ Wires together:
   - Dev's LLMEngine.generate_sar()      → generate endpoint
   - Het's TypologyClassifier.predict()  → generate endpoint (typology)
 """
+import json
 import uuid
 import sys
 import os
+import tempfile
+import threading
+from typing import Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from app.api.schemas import (
     CaseData,
@@ -17,7 +21,16 @@ from app.api.schemas import (
     SARNarrative,
     SARStatus,
     GenerateSARRequest,
+    ClassifyBatchRequest,
+    ClassifyBatchItem,
+    ClassifyBatchResponse,
+    ExplainRequest,
+    ExplainItem,
+    ExplainResponse,
     UpdateSARRequest,
+    SARDecisionRequest,
+    ModelUpdateRequest,
+    ModelActivateRequest,
     CaseListItem,
     CaseListResponse,
     AuditStep,
@@ -25,11 +38,15 @@ from app.api.schemas import (
     TypologyResult,
     RiskLevel,
     UploadResponse,
+    AppendResponse,
+    BatchUploadItem,
+    BatchUploadResponse,
     ChatRequest,
     ChatResponse,
 )
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from datetime import datetime
+from app.core.llm_scheduler import LaneFull
 
 # --- Ensure ml_models is importable ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
@@ -39,15 +56,20 @@ if PROJECT_ROOT not in sys.path:
 router = APIRouter()
 
 # In-memory storage (will be replaced with PostgreSQL later)
-cases_store: dict[str, dict] = {}       # case_id → parsed case data dict
+cases_store: dict[str, dict] = {}       # case_id → parsed case data dict (transactions: TransactionTable)
 sars_store: dict[str, SARResponse] = {}  # sar_id  → SARResponse
 case_to_sar: dict[str, str] = {}         # case_id → sar_id  (quick lookup)
+case_state: dict[str, dict] = {}         # case_id → running totals for appends (see _case_state)
 
 # --------------------------------------------------------------------------- #
 #  Lazy-initialized singletons for LLM + ML (avoids import failures at boot)
 # --------------------------------------------------------------------------- #
 _llm_engine = None
 _typology_classifier = None
+_feedback_store = None
+_model_registry = None
+# Serializes model swaps (activation, feedback updates); reads never lock
+_model_swap_lock = threading.Lock()
 
 
 def _get_llm_engine():
@@ -63,57 +85,160 @@ def _get_llm_engine():
     return _llm_engine
 
 
+def _llm_busy(e: LaneFull) -> HTTPException:
+    """429 for a call refused by the LLM scheduler, with its Retry-After hint."""
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def close_llm_engine():
+    """Release the LLM engine's pooled Ollama connections (app shutdown)."""
+    global _llm_engine
+    if _llm_engine is not None:
+        await _llm_engine.aclose()
+        _llm_engine = None
+
+
 def _get_typology_classifier():
-    """Lazily initialize the typology classifier (Het's module)."""
+    """Lazily initialize the typology classifier (Het's module).
+
+    Serves the registry's active version when there is one, otherwise the
+    default typology_model.joblib. Request handlers fetch it once and use
+    that object throughout, so a swap never changes the model mid-request.
+    """
     global _typology_classifier
     if _typology_classifier is None:
         try:
             from ml_models.typology_classifier import TypologyClassifier
-            _typology_classifier = TypologyClassifier()
+            registry = _get_model_registry()
+            active = registry.active() if registry else None
+            if active:
+                _typology_classifier = registry.load(active)
+            else:
+                _typology_classifier = TypologyClassifier()
         except Exception as e:
             print(f"[WARN] Could not load TypologyClassifier: {e}")
             _typology_classifier = None
     return _typology_classifier
 
 
+def _get_model_registry():
+    """Lazily initialize the versioned model registry (Het's module)."""
+    global _model_registry
+    if _model_registry is None:
+        try:
+            from ml_models.model_registry import ModelRegistry
+            _model_registry = ModelRegistry()
+        except Exception as e:
+            print(f"[WARN] Could not load ModelRegistry: {e}")
+            _model_registry = None
+    return _model_registry
+
+
+def _get_feedback_store():
+    """Lazily initialize the analyst feedback store (Het's module)."""
+    global _feedback_store
+    if _feedback_store is None:
+        try:
+            from ml_models.feedback_store import FeedbackStore
+            _feedback_store = FeedbackStore()
+        except Exception as e:
+            print(f"[WARN] Could not load FeedbackStore: {e}")
+            _feedback_store = None
+    return _feedback_store
+
+
 # =========================================================================== #
 #  1. UPLOAD — Parse CSV/JSON via Het's data_parser
 # =========================================================================== #
 
+# Uploads are copied to a temporary spool file in chunks of this size and
+# parsed from there (memory-mapped), so large uploads never sit in the heap
+_SPOOL_CHUNK_BYTES = 1024 * 1024
+
+
+async def _spool_upload(upload: UploadFile) -> str:
+    """Stream an upload to a temporary file in fixed-size chunks. Returns its path."""
+    suffix = os.path.splitext(upload.filename or "")[1]
+    fd, path = tempfile.mkstemp(prefix="sar_upload_", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(_SPOOL_CHUNK_BYTES):
+                out.write(chunk)
+    except BaseException:
+        _discard_spool(path)
+        raise
+    return path
+
+
+def _discard_spool(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _store_case(parsed: dict, filename: str) -> str:
+    """Assign a case_id to parsed upload data and store it. Returns the case_id."""
+    case_id = f"CASE-{uuid.uuid4().hex[:6].upper()}"
+    parsed.pop("ingest_stats", None)
+    parsed.pop("parse_seconds", None)
+    parsed.pop("txn_ids_missing", None)
+    # None when the upload supplied its own customer profile (JSON case document)
+    case_state[case_id] = {"customer": parsed.pop("customer_stats", None)}
+
+    # Assign case_id
+    parsed["case_id"] = case_id
+    parsed["filename"] = filename
+    parsed["uploaded_at"] = datetime.now().isoformat()
+
+    # Store parsed case data
+    cases_store[case_id] = parsed
+    return case_id
+
+
+def _customer_name(parsed: dict) -> str:
+    customer = parsed.get("customer", {})
+    return customer.get("name", "Unknown") if isinstance(customer, dict) else "Unknown"
+
+
 @router.post("/upload", response_model=UploadResponse, tags=["Data"])
 async def upload_data(file: UploadFile = File(...)):
-    """Upload transaction/customer data (CSV or JSON).
+    """Upload transaction/customer data (CSV, JSON, Parquet or Arrow IPC).
 
     Uses Het's data_parser to parse the file into the CaseData format defined
     in the integration contracts.
     """
-    if not file.filename.endswith((".csv", ".json")):
-        raise HTTPException(status_code=400, detail="Only CSV and JSON files are supported")
+    from app.utils.data_parser import SUPPORTED_EXTENSIONS
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Supported: {', '.join(SUPPORTED_EXTENSIONS)}",
+        )
 
-    content = await file.read()
-    case_id = f"CASE-{uuid.uuid4().hex[:6].upper()}"
+    # Spool to disk in chunks rather than buffering the upload in the heap
+    spool_path = await _spool_upload(file)
 
-    # --- Parse using Het's data parser ---
+    # --- Parse using Het's data parser, straight into a columnar table ---
+    # Transactions are kept as a TransactionTable: a compact columnar store
+    # that still behaves like the list of dicts for existing callers
+    import asyncio
     try:
-        from app.utils.data_parser import parse_file
-        parsed = parse_file(content, file.filename)
+        from app.utils.data_parser import parse_file_columnar
+        # Off the event loop: a large file parses for seconds
+        parsed = await asyncio.get_running_loop().run_in_executor(
+            None, parse_file_columnar, spool_path, file.filename,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to parse file: {e}")
+    finally:
+        _discard_spool(spool_path)
 
     if "error" in parsed:
         raise HTTPException(status_code=400, detail=parsed["error"])
 
-    # Assign case_id
-    parsed["case_id"] = case_id
-    parsed["filename"] = file.filename
-    parsed["uploaded_at"] = datetime.now().isoformat()
-
-    # Store parsed case data
-    cases_store[case_id] = parsed
-
+    ingest_stats = parsed.get("ingest_stats", {})
+    case_id = _store_case(parsed, file.filename)
     transactions = parsed.get("transactions", [])
-    customer = parsed.get("customer", {})
-    customer_name = customer.get("name", "Unknown") if isinstance(customer, dict) else "Unknown"
 
     return UploadResponse(
         case_id=case_id,
@@ -121,54 +246,357 @@ async def upload_data(file: UploadFile = File(...)):
         status="uploaded",
         message=f"Data uploaded successfully. {len(transactions)} transactions parsed.",
         transaction_count=len(transactions),
-        customer_name=customer_name,
+        customer_name=_customer_name(parsed),
+        rows_per_sec=ingest_stats.get("rows_per_sec"),
     )
 
 
-# =========================================================================== #
-#  2. GENERATE SAR — LLMEngine + TypologyClassifier
-# =========================================================================== #
+# --------------------------------------------------------------------------- #
+#  Append — delta uploads onto an existing case
+# --------------------------------------------------------------------------- #
 
-@router.post("/generate-sar", response_model=SARResponse, tags=["SAR"])
-async def generate_sar(request: GenerateSARRequest):
-    """Generate a SAR narrative for a given case.
+def _case_state(case_id: str) -> dict:
+    """Running totals that let appends update a case without a full rescan.
 
-    Pipeline:
-      1. Look up parsed case data
-      2. Run Het's TypologyClassifier.predict()
-      3. Call Dev's LLMEngine.generate_sar()
-      4. Bundle into SARResponse
+    Holds the customer-detection accumulator kept from the upload, plus the
+    case's txn_id set and the classifier's FeatureAccumulator, which are
+    built from the stored transactions once, on the first append.
+    """
+    from ml_models.typology_classifier import FeatureAccumulator
+
+    transactions = cases_store[case_id]["transactions"]
+    state = case_state.setdefault(case_id, {"customer": None})
+    if "txn_ids" not in state:
+        state["txn_ids"] = set(transactions.txn_ids.tolist())
+    if "features" not in state:
+        state["features"] = FeatureAccumulator()
+        state["features"].update(transactions)
+    return state
+
+
+def _case_features(case_id: str) -> dict:
+    """Feature dict for a stored case, reusing an appended case's running totals."""
+    from ml_models.typology_classifier import extract_features
+    features = case_state.get(case_id, {}).get("features")
+    if features is not None:
+        return features.features()
+    return extract_features(cases_store[case_id].get("transactions", []))
+
+
+@router.post("/cases/{case_id}/append", response_model=AppendResponse, tags=["Data"])
+async def append_data(case_id: str, file: UploadFile = File(...)):
+    """Append a delta upload (any supported format) to an existing case.
+
+    Rows whose txn_id the case already has (or that repeat within the
+    upload) are skipped. Delta files must carry a txn_id for every row
+    (400 otherwise), and a delta with nothing new is refused with 409. The
+    detected customer summary and the classifier features are updated from
+    the new rows only.
     """
-    case_id = request.case_id
-
-    # --- Fetch case data ---
     if case_id not in cases_store:
+        raise HTTPException(status_code=404, detail=f"Case {case_id} not found")
+
+    from app.utils.data_parser import SUPPORTED_EXTENSIONS
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
         raise HTTPException(
-            status_code=404,
-            detail=f"Case {case_id} not found. Upload data first via POST /api/upload.",
+            status_code=400,
+            detail=f"Unsupported file type. Supported: {', '.join(SUPPORTED_EXTENSIONS)}",
         )
 
+    spool_path = await _spool_upload(file)
+    import asyncio
+    try:
+        from app.utils.data_parser import parse_file_columnar
+        # Off the event loop: a large file parses for seconds
+        parsed = await asyncio.get_running_loop().run_in_executor(
+            None, parse_file_columnar, spool_path, file.filename,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to parse file: {e}")
+    finally:
+        _discard_spool(spool_path)
+
+    if "error" in parsed:
+        raise HTTPException(status_code=400, detail=parsed["error"])
+    if parsed.get("txn_ids_missing"):
+        # Generated ids (TXN-001, ...) would collide with the case's own
+        raise HTTPException(
+            status_code=400,
+            detail=f"{parsed['txn_ids_missing']} of {len(parsed['transactions'])} transactions "
+                   f"have no txn_id; delta uploads need one per row to skip duplicates",
+        )
+    if case_id not in cases_store:
+        raise HTTPException(status_code=404, detail=f"Case {case_id} not found")
+
+    import pandas as pd
+    from app.utils.case_store import TransactionTable
+
     case_data = cases_store[case_id]
-    transactions = case_data.get("transactions", [])
+    state = _case_state(case_id)
+    delta = parsed["transactions"]
+
+    # Keep the first occurrence of each txn_id the case hasn't seen yet
+    known = state["txn_ids"]
+    keep = []
+    for i, txn_id in enumerate(delta.txn_ids.tolist()):
+        if txn_id not in known:
+            known.add(txn_id)
+            keep.append(i)
+    new_rows = delta.take(keep)
+    if not len(new_rows):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Nothing appended: all {len(delta)} transactions are already in case {case_id}",
+        )
 
-    sar_id = f"SAR-{uuid.uuid4().hex[:6].upper()}"
+    case_data["transactions"] = TransactionTable.concat([case_data["transactions"], new_rows])
+
+    # A customer profile supplied by the original upload is left as-is
+    customer = state["customer"]
+    if customer is not None:
+        customer.update(pd.DataFrame({
+            "receiver": new_rows.entities[new_rows.receiver_codes],
+            "amount": new_rows.amounts,
+        }))
+        delta_stats = parsed.get("customer_stats")
+        if delta_stats is not None:
+            customer.merge_accounts(delta_stats.accounts)
+        case_data["customer"] = customer.result()
+
+    state["features"].update(new_rows)
+    case_data["updated_at"] = datetime.now().isoformat()
+
+    duplicates = len(delta) - len(new_rows)
+    return AppendResponse(
+        case_id=case_id,
+        filename=file.filename,
+        message=f"{len(new_rows)} transactions appended, {duplicates} duplicates skipped.",
+        appended_count=len(new_rows),
+        duplicate_count=duplicates,
+        transaction_count=len(case_data["transactions"]),
+        customer_name=_customer_name(case_data),
+    )
 
-    # --- Step 1: Typology prediction (Het's classifier) ---
-    typology_result = None
-    classifier = _get_typology_classifier()
-    if classifier:
+
+# --------------------------------------------------------------------------- #
+#  Batch upload — many files (or zip archives) parsed on a process pool
+# --------------------------------------------------------------------------- #
+
+_parse_pool = None
+
+# Limits on what the zip archives of one batch may unpack to, checked against
+# the archives' own size records before any member is copied to disk
+ZIP_MAX_MEMBERS = 1_000
+ZIP_MAX_MEMBER_BYTES = 512 * 1024 * 1024
+ZIP_MAX_TOTAL_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def _get_parse_pool():
+    """Lazily start the parser process pool (one worker per core)."""
+    global _parse_pool
+    if _parse_pool is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
+
+
+def _reset_parse_pool():
+    """Drop a broken pool (e.g. a worker was killed) so the next batch starts fresh."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+def _expand_upload(filename: str, path: str, unpacked: dict) -> list[tuple[str, str]]:
+    """Return (filename, spool path) for a spooled upload, unpacking zip archives.
+
+    Archive members are streamed to their own spool files; the archive's
+    spool file is removed once unpacked. ``unpacked`` counts the "members"
+    and "bytes" unpacked so far for the batch and is updated in place; an
+    archive that would take the batch past the ZIP_MAX_* limits raises 413
+    before any of its members is written.
+    """
+    if not filename.lower().endswith(".zip"):
+        return [(filename, path)]
+
+    import shutil
+    import zipfile
+    members = []
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = [
+                info for info in archive.infolist()
+                if not info.is_dir() and os.path.basename(info.filename)
+                and not info.filename.startswith("__MACOSX/")
+            ]
+            n_members = unpacked["members"] + len(infos)
+            n_bytes = unpacked["bytes"] + sum(info.file_size for info in infos)
+            largest = max((info.file_size for info in infos), default=0)
+            if (n_members > ZIP_MAX_MEMBERS or largest > ZIP_MAX_MEMBER_BYTES
+                    or n_bytes > ZIP_MAX_TOTAL_BYTES):
+                raise HTTPException(
+                    status_code=413,
+                    detail=(f"{filename} would bring the batch to {n_members} unpacked files, "
+                            f"{n_bytes:,d} bytes (largest file {largest:,d} bytes); the limits are "
+                            f"{ZIP_MAX_MEMBERS} files, {ZIP_MAX_MEMBER_BYTES:,d} bytes per file "
+                            f"and {ZIP_MAX_TOTAL_BYTES:,d} bytes in total"),
+                )
+            unpacked["members"], unpacked["bytes"] = n_members, n_bytes
+
+            for info in infos:
+                name = os.path.basename(info.filename)
+                fd, member_path = tempfile.mkstemp(
+                    prefix="sar_upload_", suffix=os.path.splitext(name)[1],
+                )
+                members.append((name, member_path))
+                with os.fdopen(fd, "wb") as out, archive.open(info) as src:
+                    shutil.copyfileobj(src, out, _SPOOL_CHUNK_BYTES)
+    except BaseException:
+        for _, member_path in members:
+            _discard_spool(member_path)
+        raise
+    finally:
+        _discard_spool(path)
+    return members
+
+
+@router.post("/upload-batch", response_model=BatchUploadResponse, tags=["Data"])
+async def upload_batch(files: list[UploadFile] = File(...)):
+    """Upload many files at once (or zip archives of them), one case per file.
+
+    Files are parsed in parallel on a process pool with Het's data_parser;
+    each gets its own case_id, parse time and error (if any).
+    """
+    import asyncio
+    import time
+    from concurrent.futures.process import BrokenProcessPool
+    from app.utils.data_parser import SUPPORTED_EXTENSIONS, parse_file_columnar
+
+    started = time.perf_counter()
+    # One slot per file, in upload order; parsed files are filled in later
+    items: list[Optional[BatchUploadItem]] = []
+    jobs: list[tuple[int, str, str]] = []
+    # Zip members and bytes unpacked so far, against the ZIP_MAX_* limits
+    unpacked = {"members": 0, "bytes": 0}
+    for upload in files:
         try:
-            tp = classifier.predict(transactions)
-            typology_result = TypologyResult(
-                prediction=tp.get("typology", "unknown"),
-                confidence=tp.get("confidence", 0.0),
-                top_features=tp.get("top_features", {}),
-            )
+            expanded = _expand_upload(upload.filename, await _spool_upload(upload), unpacked)
+        except HTTPException:
+            # Too large to unpack: refuse the whole batch
+            for _, _, path in jobs:
+                _discard_spool(path)
+            raise
         except Exception as e:
-            print(f"[WARN] Typology prediction failed: {e}")
+            items.append(BatchUploadItem(filename=upload.filename, status="failed",
+                                         error=f"Could not read archive: {e}"))
+            continue
+        for name, path in expanded:
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                jobs.append((len(items), name, path))
+                items.append(None)
+            else:
+                _discard_spool(path)
+                items.append(BatchUploadItem(filename=name, status="failed",
+                                             error="Unsupported file format"))
+
+    # Workers get spool paths, not bytes, and memory-map the files themselves
+    loop = asyncio.get_running_loop()
+    pool = _get_parse_pool()
+    try:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, parse_file_columnar, path, name) for _, name, path in jobs),
+            return_exceptions=True,
+        )
+    finally:
+        for _, _, path in jobs:
+            _discard_spool(path)
+
+    for (slot, name, _), parsed in zip(jobs, results):
+        if isinstance(parsed, Exception):
+            if isinstance(parsed, BrokenProcessPool):
+                _reset_parse_pool()
+            items[slot] = BatchUploadItem(filename=name, status="failed",
+                                          error=f"Failed to parse file: {parsed}")
+        elif "error" in parsed:
+            items[slot] = BatchUploadItem(filename=name, status="failed", error=parsed["error"],
+                                          parse_seconds=parsed.get("parse_seconds", 0.0))
+        else:
+            parse_seconds = parsed.get("parse_seconds", 0.0)
+            case_id = _store_case(parsed, name)
+            items[slot] = BatchUploadItem(
+                filename=name,
+                case_id=case_id,
+                transaction_count=len(parsed.get("transactions", [])),
+                customer_name=_customer_name(parsed),
+                parse_seconds=parse_seconds,
+            )
 
-    # --- Step 2: SAR generation (Dev's LLM engine) ---
-    llm = _get_llm_engine()
+    succeeded = sum(1 for item in items if item.status == "uploaded")
+    return BatchUploadResponse(
+        items=items,
+        total_files=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        wall_seconds=round(time.perf_counter() - started, 4),
+    )
+
+
+# =========================================================================== #
+#  2. GENERATE SAR — LLMEngine + TypologyClassifier
+# =========================================================================== #
+
+def _generation_case(case_id: str) -> dict:
+    """Parsed case data for SAR generation (404 if it was never uploaded)."""
+    if case_id not in cases_store:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Case {case_id} not found. Upload data first via POST /api/upload.",
+        )
+    return cases_store[case_id]
+
+
+def _predict_case_typology(case_id: str, case_data: dict) -> Optional[TypologyResult]:
+    """Step 1 of SAR generation: Het's classifier (None if unavailable or failing)."""
+    classifier = _get_typology_classifier()
+    if not classifier:
+        return None
+    try:
+        # Cached per (transactions content, model version): regenerating an
+        # unchanged case skips extraction and inference. On a miss, appended
+        # cases use their running features; others are extracted here.
+        tp = classifier.predict_cached(
+            case_data.get("transactions", []),
+            features=lambda: _case_features(case_id),
+        )
+        return TypologyResult(
+            prediction=tp.get("typology", "unknown"),
+            confidence=tp.get("confidence", 0.0),
+            top_features=tp.get("top_features", {}),
+            model_version=tp.get("model_version"),
+        )
+    except Exception as e:
+        print(f"[WARN] Typology prediction failed: {e}")
+        return None
+
+
+def _store_generated_sar(
+    case_id: str,
+    sar_id: str,
+    typology_result: Optional[TypologyResult],
+    result: Optional[dict] = None,
+    error: Optional[Exception] = None,
+) -> SARResponse:
+    """Bundle the classifier and LLM outputs into a SARResponse and store it.
+
+    `result` is LLMEngine.generate_sar()'s return value; None (with no
+    error) means the LLM engine is not available.
+    """
     narrative = SARNarrative(
         introduction="[LLM engine not connected — placeholder narrative]",
         body="[Transaction analysis pending LLM integration]",
@@ -177,10 +605,8 @@ async def generate_sar(request: GenerateSARRequest):
     audit_trail = []
     quality = QualityScore()
 
-    if llm:
+    if result is not None and error is None:
         try:
-            result = await llm.generate_sar(case_data)
-
             # Parse narrative
             narr = result.get("narrative", {})
             if isinstance(narr, dict):
@@ -221,19 +647,21 @@ async def generate_sar(request: GenerateSARRequest):
                     confidence=tp.get("confidence", 0.0),
                     top_features=tp.get("top_features", {}),
                 )
-
         except Exception as e:
-            print(f"[WARN] LLM generation failed: {e}")
-            # Add a fallback audit step recording the failure
-            audit_trail.append(AuditStep(
-                step=1,
-                agent="system",
-                action=f"LLM generation failed: {e}",
-                data_points_used=[],
-                rules_matched=[],
-                output="Falling back to placeholder narrative",
-                timestamp=datetime.now().isoformat(),
-            ))
+            error = e
+
+    if error is not None:
+        print(f"[WARN] LLM generation failed: {error}")
+        # Add a fallback audit step recording the failure
+        audit_trail.append(AuditStep(
+            step=1,
+            agent="system",
+            action=f"LLM generation failed: {error}",
+            data_points_used=[],
+            rules_matched=[],
+            output="Falling back to placeholder narrative",
+            timestamp=datetime.now().isoformat(),
+        ))
 
     # If no audit trail at all, add a placeholder step
     if not audit_trail:
@@ -263,6 +691,236 @@ async def generate_sar(request: GenerateSARRequest):
     return sar
 
 
+@router.post("/generate-sar", response_model=SARResponse, tags=["SAR"])
+async def generate_sar(request: GenerateSARRequest):
+    """Generate a SAR narrative for a given case.
+
+    Pipeline:
+      1. Look up parsed case data
+      2. Run Het's TypologyClassifier.predict()
+      3. Call Dev's LLMEngine.generate_sar()
+      4. Bundle into SARResponse
+    """
+    case_id = request.case_id
+    case_data = _generation_case(case_id)
+    sar_id = f"SAR-{uuid.uuid4().hex[:6].upper()}"
+
+    # --- Step 1: Typology prediction (Het's classifier) ---
+    typology_result = _predict_case_typology(case_id, case_data)
+
+    # --- Step 2: SAR generation (Dev's LLM engine) ---
+    llm = _get_llm_engine()
+    result, error = None, None
+    if llm:
+        try:
+            result = await llm.generate_sar(case_data, force_regenerate=request.force_regenerate)
+        except LaneFull as e:
+            raise _llm_busy(e)
+        except Exception as e:
+            error = e
+
+    return _store_generated_sar(case_id, sar_id, typology_result, result, error)
+
+
+def _sse(event: str, data) -> str:
+    """One server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/generate-sar/stream", tags=["SAR"])
+async def generate_sar_stream(request: GenerateSARRequest):
+    """Generate a SAR narrative, streamed as server-sent events.
+
+    Same pipeline and stored SARResponse as /generate-sar, but text is
+    sent as soon as the model produces it:
+      event: start    {"sar_id", "case_id", "typology"}
+      event: token    {"section", "text"}      (section is null before the first header)
+      event: section  {"section", "text"}      (a ### section is complete)
+      event: done     the stored SARResponse
+
+    Returns 429 with Retry-After when the LLM's SAR queue is full.
+    """
+    case_id = request.case_id
+    case_data = _generation_case(case_id)
+    sar_id = f"SAR-{uuid.uuid4().hex[:6].upper()}"
+
+    # Refuse up front while the SAR lane is full (429 needs headers not yet sent)
+    llm = _get_llm_engine()
+    if llm:
+        try:
+            llm.scheduler.check("sar")
+        except LaneFull as e:
+            raise _llm_busy(e)
+
+    async def events():
+        typology_result = _predict_case_typology(case_id, case_data)
+        yield _sse("start", {
+            "sar_id": sar_id,
+            "case_id": case_id,
+            "typology": typology_result.model_dump() if typology_result else None,
+        })
+
+        result, error = None, None
+        if llm:
+            try:
+                async for event in llm.stream_sar(case_data, force_regenerate=request.force_regenerate):
+                    if event["event"] == "result":
+                        result = event["result"]
+                    else:
+                        yield _sse(event["event"], {"section": event["section"], "text": event["text"]})
+            except Exception as e:
+                error = e
+
+        sar = _store_generated_sar(case_id, sar_id, typology_result, result, error)
+        yield _sse("done", sar.model_dump(mode="json"))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# =========================================================================== #
+#  2b. CLASSIFY BATCH + EXPLAIN — one feature matrix per request
+# =========================================================================== #
+
+def _feature_jobs(case_ids: list[str], cases: dict[str, list[dict]]) -> list[tuple[str, object]]:
+    """(case_id, zero-arg feature builder) per requested case; builder is None if not found."""
+    from ml_models.typology_classifier import extract_features
+
+    jobs: list[tuple[str, object]] = []
+    for cid in case_ids:
+        jobs.append((cid, (lambda cid=cid: _case_features(cid)) if cid in cases_store else None))
+    for cid, txns in cases.items():
+        jobs.append((cid, lambda txns=txns: extract_features(txns)))
+    return jobs
+
+
+@router.post("/classify-batch", response_model=ClassifyBatchResponse, tags=["SAR"])
+async def classify_batch(request: ClassifyBatchRequest):
+    """Score many cases' typologies at once with Het's TypologyClassifier.
+
+    Takes stored case_ids and/or ad-hoc {case_id: transactions}; results come
+    back in that order and match what /generate-sar would report per case.
+    """
+    import asyncio
+    import time
+
+    classifier = _get_typology_classifier()
+    if not classifier:
+        raise HTTPException(status_code=503, detail="Typology classifier is unavailable")
+
+    started = time.perf_counter()
+    items: list[ClassifyBatchItem] = []
+    jobs: list[tuple[int, object]] = []   # (item index, zero-arg feature builder)
+    for cid, build in _feature_jobs(request.case_ids, request.cases):
+        if build is None:
+            items.append(ClassifyBatchItem(case_id=cid, error="Case not found"))
+        else:
+            jobs.append((len(items), build))
+            items.append(ClassifyBatchItem(case_id=cid))
+
+    def score():
+        return classifier.predict_features_batch([build() for _, build in jobs])
+
+    # Feature extraction and inference are CPU-bound; keep them off the event loop
+    try:
+        predictions = await asyncio.get_running_loop().run_in_executor(None, score)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch classification failed: {e}")
+
+    for (slot, _), tp in zip(jobs, predictions):
+        items[slot].typology = TypologyResult(
+            prediction=tp.get("typology", "unknown"),
+            confidence=tp.get("confidence", 0.0),
+            top_features=tp.get("top_features", {}),
+            model_version=tp.get("model_version"),
+        )
+        items[slot].risk_score = tp.get("risk_score")
+
+    return ClassifyBatchResponse(
+        results=items,
+        total=len(items),
+        classified=len(jobs),
+        seconds=round(time.perf_counter() - started, 4),
+    )
+
+
+@router.post("/explain", response_model=ExplainResponse, tags=["SAR"])
+async def explain_cases(request: ExplainRequest):
+    """Per-case SHAP attributions for the predicted typology.
+
+    Same inputs as /classify-batch. The classifier keeps one TreeExplainer per
+    loaded model, so only the first call pays for building it.
+    """
+    import asyncio
+    import time
+
+    classifier = _get_typology_classifier()
+    if not classifier:
+        raise HTTPException(status_code=503, detail="Typology classifier is unavailable")
+
+    started = time.perf_counter()
+    items: list[ExplainItem] = []
+    jobs: list[tuple[int, object]] = []   # (item index, zero-arg feature builder)
+    for cid, build in _feature_jobs(request.case_ids, request.cases):
+        if build is None:
+            items.append(ExplainItem(case_id=cid, error="Case not found"))
+        else:
+            jobs.append((len(items), build))
+            items.append(ExplainItem(case_id=cid))
+
+    def explain():
+        return classifier.explain_features_batch([build() for _, build in jobs])
+
+    try:
+        explanations = await asyncio.get_running_loop().run_in_executor(None, explain)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {e}")
+
+    for (slot, _), ex in zip(jobs, explanations):
+        items[slot].typology = ex["typology"]
+        items[slot].confidence = ex["confidence"]
+        items[slot].features = ex["features"]
+
+    return ExplainResponse(
+        results=items,
+        total=len(items),
+        explained=len(jobs),
+        seconds=round(time.perf_counter() - started, 4),
+    )
+
+
+@router.get("/classifier/cache", tags=["SAR"])
+async def classifier_cache_stats():
+    """Hit/miss counters and size of the classifier's prediction cache."""
+    classifier = _get_typology_classifier()
+    if not classifier:
+        raise HTTPException(status_code=503, detail="Typology classifier is unavailable")
+    return {"model_version": classifier.model_version, **classifier.cache.stats()}
+
+
+@router.get("/llm/cache", tags=["SAR"])
+async def llm_cache_stats():
+    """Hit/miss counters and size of the LLM engine's SAR response cache."""
+    llm = _get_llm_engine()
+    if not llm:
+        raise HTTPException(status_code=503, detail="LLM engine is unavailable")
+    if llm.response_cache is None:
+        raise HTTPException(status_code=404, detail="LLM response cache is disabled")
+    return {"model": llm.model, **llm.response_cache.stats()}
+
+
+@router.get("/llm/scheduler", tags=["SAR"])
+async def llm_scheduler_stats():
+    """Per-lane running calls, queue depth, rejections, wait and service times."""
+    llm = _get_llm_engine()
+    if not llm:
+        raise HTTPException(status_code=503, detail="LLM engine is unavailable")
+    return llm.scheduler.stats()
+
+
 # =========================================================================== #
 #  3. GET SAR + AUDIT TRAIL
 # =========================================================================== #
@@ -318,16 +976,44 @@ async def update_sar(sar_id: str, request: UpdateSARRequest):
 
 
 # =========================================================================== #
-#  5. APPROVE SAR
+#  5. APPROVE / REJECT SAR — decisions feed the classifier
 # =========================================================================== #
 
+def _record_feedback(sar: SARResponse, label: Optional[str], decision: str):
+    """Store the case's feature vector with the analyst's final label.
+
+    Feedback is best effort: a missing case, model or label never blocks
+    the decision itself.
+    """
+    store = _get_feedback_store()
+    if not store or not label or sar.case_id not in cases_store:
+        return
+    classifier = _get_typology_classifier()
+    try:
+        store.record(
+            case_id=sar.case_id,
+            features=_case_features(sar.case_id),
+            label=label,
+            decision=decision,
+            sar_id=sar.sar_id,
+            model_version=classifier.model_version if classifier else None,
+        )
+    except Exception as e:
+        print(f"[WARN] Could not record feedback for {sar.sar_id}: {e}")
+
+
 @router.post("/sar/{sar_id}/approve", tags=["SAR"])
-async def approve_sar(sar_id: str):
-    """Approve a SAR narrative. Records approval in the audit trail."""
+async def approve_sar(sar_id: str, request: Optional[SARDecisionRequest] = None):
+    """Approve a SAR narrative. Records approval in the audit trail.
+
+    The case is stored as a labeled training row: the analyst's typology if
+    given, otherwise the predicted one.
+    """
     if sar_id not in sars_store:
         raise HTTPException(status_code=404, detail=f"SAR {sar_id} not found")
 
     sar = sars_store[sar_id]
+    request = request or SARDecisionRequest()
 
     # Add audit step for approval
     sar.audit_trail.append(AuditStep(
@@ -342,9 +1028,153 @@ async def approve_sar(sar_id: str):
 
     sar.status = SARStatus.APPROVED
     sars_store[sar_id] = sar
+    label = request.typology or (sar.typology.prediction if sar.typology else None)
+    _record_feedback(sar, label, decision="approved")
     return {"sar_id": sar_id, "status": "approved", "message": "SAR approved successfully"}
 
 
+@router.post("/sar/{sar_id}/reject", tags=["SAR"])
+async def reject_sar(sar_id: str, request: Optional[SARDecisionRequest] = None):
+    """Reject a SAR (no suspicious activity). Records rejection in the audit trail.
+
+    The case is stored as a labeled training row with typology 'normal'
+    unless the analyst gives another one.
+    """
+    if sar_id not in sars_store:
+        raise HTTPException(status_code=404, detail=f"SAR {sar_id} not found")
+
+    sar = sars_store[sar_id]
+    request = request or SARDecisionRequest()
+
+    sar.audit_trail.append(AuditStep(
+        step=len(sar.audit_trail) + 1,
+        agent="analyst",
+        action="SAR rejected" + (f": {request.reason}" if request.reason else ""),
+        data_points_used=[],
+        rules_matched=[],
+        output="Status changed from '{}' to 'rejected'".format(sar.status.value),
+        timestamp=datetime.now().isoformat(),
+    ))
+
+    sar.status = SARStatus.REJECTED
+    sars_store[sar_id] = sar
+    _record_feedback(sar, request.typology or "normal", decision="rejected")
+    return {"sar_id": sar_id, "status": "rejected", "message": "SAR rejected"}
+
+
+# --------------------------------------------------------------------------- #
+#  Model updates from analyst feedback
+# --------------------------------------------------------------------------- #
+
+@router.get("/model/feedback", tags=["Model"])
+async def feedback_stats():
+    """Number of stored feedback rows and how many are not yet trained on."""
+    store = _get_feedback_store()
+    if not store:
+        raise HTTPException(status_code=503, detail="Feedback store is unavailable")
+    return store.stats()
+
+
+def _swap_classifier(classifier):
+    """Serve `classifier` from now on; requests already running keep the old one."""
+    global _typology_classifier
+    _typology_classifier = classifier
+
+
+@router.post("/model/update", tags=["Model"])
+async def update_model(request: Optional[ModelUpdateRequest] = None):
+    """Continue boosting the classifier on feedback recorded since the last update.
+
+    Runs in a worker thread on a private copy of the active version. The
+    result is registered as a new version, activated and swapped in; until
+    then, predictions keep using the current model.
+    """
+    import asyncio
+    from ml_models.feedback_store import apply_feedback
+
+    classifier = _get_typology_classifier()
+    store = _get_feedback_store()
+    registry = _get_model_registry()
+    if not classifier or not store or not registry:
+        raise HTTPException(status_code=503, detail="Typology classifier is unavailable")
+    request = request or ModelUpdateRequest()
+
+    def update():
+        with _model_swap_lock:
+            live = _get_typology_classifier()
+            parent = registry.active()
+            if parent is None:
+                # First update on the default model: register it as the base
+                parent = registry.register(live, source="bootstrap")
+                registry.activate(parent)
+            candidate = registry.working_copy(parent)
+            try:
+                stats = apply_feedback(candidate, store,
+                                       rounds=request.rounds, min_rows=request.min_rows)
+                if not stats["updated"]:
+                    return {**stats, "model_version": live.model_version}
+                version = registry.register(
+                    candidate, metrics={k: stats[k] for k in ("rows", "rounds", "total_rounds")},
+                    source="feedback", parent=parent,
+                )
+            finally:
+                registry.discard(candidate)
+            registry.activate(version)
+            _swap_classifier(registry.load(version))
+            return {**stats, "parent_version": parent}
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, update)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model update failed: {e}")
+
+
+@router.get("/model/versions", tags=["Model"])
+async def list_model_versions():
+    """Registered model versions with their metadata, and which one is serving."""
+    registry = _get_model_registry()
+    if not registry:
+        raise HTTPException(status_code=503, detail="Model registry is unavailable")
+    classifier = _get_typology_classifier()
+    return {
+        "active": registry.active(),
+        "serving": classifier.model_version if classifier else None,
+        "versions": registry.versions(),
+    }
+
+
+@router.post("/model/activate", tags=["Model"])
+async def activate_model_version(request: ModelActivateRequest):
+    """Load a registered version in the background and swap it in.
+
+    The new model is fully loaded (and compiled, if needed) in a worker
+    thread before the swap; requests keep being served by the current
+    model until then, and those already running finish on it.
+    """
+    import asyncio
+
+    registry = _get_model_registry()
+    if not registry:
+        raise HTTPException(status_code=503, detail="Model registry is unavailable")
+
+    def activate():
+        with _model_swap_lock:
+            classifier = registry.load(request.version)
+            registry.activate(request.version)
+            _swap_classifier(classifier)
+            return registry.metadata(request.version)
+
+    try:
+        metadata = await asyncio.get_running_loop().run_in_executor(None, activate)
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model activation failed: {e}")
+    return {"active": request.version, "metadata": metadata}
+
+
 # =========================================================================== #
 #  6. LIST CASES — with real data from parsed uploads
 # =========================================================================== #
@@ -460,5 +1290,7 @@ async def chat_with_sar(request: ChatRequest):
         history = [h.dict() for h in request.history]
         response_text = await llm.chat_with_sar(case_data, history, request.query)
         return ChatResponse(response=response_text)
+    except LaneFull as e:
+        raise _llm_busy(e)
     except Exception as e:
          return ChatResponse(response=f"Error: {str(e)}")
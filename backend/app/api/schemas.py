@@ -78,6 +78,8 @@ class TypologyResult(BaseModel):
     prediction: str
     confidence: float
     top_features: dict[str, float] = {}
+    # Registry version (tree fingerprint) of the model that produced this
+    model_version: Optional[str] = None
 
 
 class SARResponse(BaseModel):
@@ -95,12 +97,71 @@ class SARResponse(BaseModel):
 
 class GenerateSARRequest(BaseModel):
     case_id: str
+    # Skip the LLM response cache and call the model again
+    force_regenerate: bool = False
+
+
+class ClassifyBatchRequest(BaseModel):
+    case_ids: list[str] = []
+    # Ad-hoc cases not uploaded via /upload: case_id → transaction dicts
+    cases: dict[str, list[dict]] = {}
+
+
+class ClassifyBatchItem(BaseModel):
+    case_id: str
+    typology: Optional[TypologyResult] = None
+    risk_score: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ClassifyBatchResponse(BaseModel):
+    results: list[ClassifyBatchItem]
+    total: int
+    classified: int
+    seconds: float
+
+
+class ExplainRequest(BaseModel):
+    case_ids: list[str] = []
+    # Ad-hoc cases not uploaded via /upload: case_id → transaction dicts
+    cases: dict[str, list[dict]] = {}
+
+
+class ExplainItem(BaseModel):
+    case_id: str
+    typology: Optional[str] = None
+    confidence: Optional[float] = None
+    # Top SHAP attributions for the predicted typology, by absolute impact
+    features: dict[str, float] = {}
+    error: Optional[str] = None
+
+
+class ExplainResponse(BaseModel):
+    results: list[ExplainItem]
+    total: int
+    explained: int
+    seconds: float
 
 
 class UpdateSARRequest(BaseModel):
     narrative: SARNarrative
 
 
+class SARDecisionRequest(BaseModel):
+    # Analyst's final typology when it differs from the predicted one
+    typology: Optional[str] = None
+    reason: Optional[str] = None
+
+
+class ModelUpdateRequest(BaseModel):
+    rounds: int = 10
+    min_rows: int = 1
+
+
+class ModelActivateRequest(BaseModel):
+    version: str
+
+
 class CaseListItem(BaseModel):
     case_id: str
     customer_name: str
@@ -122,6 +183,36 @@ class UploadResponse(BaseModel):
     message: str = ""
     transaction_count: int = 0
     customer_name: str = "Unknown"
+    rows_per_sec: Optional[float] = None
+
+
+class AppendResponse(BaseModel):
+    case_id: str
+    filename: str
+    status: str = "appended"
+    message: str = ""
+    appended_count: int = 0
+    duplicate_count: int = 0
+    transaction_count: int = 0
+    customer_name: str = "Unknown"
+
+
+class BatchUploadItem(BaseModel):
+    filename: str
+    case_id: Optional[str] = None
+    status: str = "uploaded"
+    transaction_count: int = 0
+    customer_name: str = "Unknown"
+    parse_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    items: list[BatchUploadItem]
+    total_files: int
+    succeeded: int
+    failed: int
+    wall_seconds: float
 
 
 class ChatMessage(BaseModel):
@@ -42,11 +42,15 @@ class AuditLogger(BaseCallbackHandler):
         self.entries.append(entry)
         return entry
 
+    def next_step(self) -> int:
+        """Number for a step logged now: one past the highest step so far."""
+        return max((entry["step"] for entry in self.entries), default=0) + 1
+
     def on_llm_start(
         self, serialized: dict[str, Any], prompts: list[str], **kwargs: Any
     ) -> Any:
         """Run when LLM starts running."""
-        self.current_step += 1
+        self.current_step = self.next_step()
         self.log_step(
             step=self.current_step,
             agent="LLM Engine",
@@ -56,7 +60,7 @@ class AuditLogger(BaseCallbackHandler):
 
     def on_llm_end(self, response: LLMResult, **kwargs: Any) -> Any:
         """Run when LLM ends running."""
-        self.current_step += 1
+        self.current_step = self.next_step()
         text = response.generations[0][0].text
         self.log_step(
             step=self.current_step,
@@ -2,9 +2,26 @@
 LLM Engine — Ollama + Llama 3.1 8B integration for SAR narrative generation.
 
 Owner: P2
+
+One engine serves the whole process: it keeps one bounded keep-alive HTTP
+connection pool to Ollama and builds the SAR and chat chains once, so a
+request only renders its prompt and calls the model. SAR narratives are
+memoised on disk by prompt fingerprint (see response_cache.py), so
+regenerating an unchanged case does not call the model again. Model calls
+go through an admission scheduler (see llm_scheduler.py) with separate SAR
+and chat lanes, so a burst of generations queues, or is refused, instead of
+overloading the model host.
 """
+import re
+from datetime import datetime
 from typing import Optional
 
+import httpx
+
+from app.core.llm_scheduler import LaneFull, LLMScheduler
+from app.core.prompt_compactor import DEFAULT_TOKEN_BUDGET, compact_transactions, estimate_tokens
+from app.core.response_cache import ResponseCache
+
 
 # SAR generation system prompt
 SAR_SYSTEM_PROMPT = """You are an expert Anti-Money Laundering (AML) Compliance Officer at a major financial institution. Your task is to write a Suspicious Activity Report (SAR) narrative that strictly adheres to **FinCEN guidance**.
@@ -43,31 +60,279 @@ Use these exact headers:
 5.  **No Fluff:** Do not include greeting or closing remarks (e.g., no "Here is your SAR"). Just the report.
 """
 
+# Chat assistant system prompt
+CHAT_SYSTEM_PROMPT = """You are an AI assistant helping a compliance officer analyze a suspicious activity case.
+Use the provided Case Data, SAR Narrative (if available), and Regulatory Context to answer the user's question.
+If you don't know the answer, say so. Be professional and concise."""
+
+# Ollama connection pool (shared by the SAR and chat chains)
+_MAX_CONNECTIONS = 8
+_KEEPALIVE_EXPIRY_S = 300.0
+_CONNECT_TIMEOUT_S = 10.0
+
+# Admission control: concurrent model calls and calls allowed to wait, per lane
+_SAR_CONCURRENCY = 2
+_SAR_MAX_QUEUE = 8
+_CHAT_CONCURRENCY = 2
+_CHAT_MAX_QUEUE = 16
+
+_SAR_TEMPERATURE = 0.2
+_CHAT_TEMPERATURE = 0.4
+
+
+# Markdown header that opens a narrative section, e.g. "### BODY (The 5Ws + How)"
+_SECTION_HEADER = re.compile(r"^\s*#{1,6}\s*\**\s*(INTRODUCTION|BODY|CONCLUSION)\b", re.IGNORECASE)
+
+
+class NarrativeSectionParser:
+    """
+    Incremental splitter of a streamed narrative into its ### sections.
+
+    feed() takes text chunks as they arrive and returns events: every chunk
+    as a "token" event tagged with the section it belongs to, and a
+    "section" event with the full text of a section once the next header
+    (or close()) ends it. Headers are only recognised on complete lines, so
+    a header split across chunks is still found.
+    """
+
+    def __init__(self):
+        self.section: Optional[str] = None   # None until the first header
+        self._lines: list[str] = []          # complete lines of the current section
+        self._partial = ""                   # text after the last newline
+
+    def feed(self, chunk: str) -> list[dict]:
+        events = []
+        text = self._partial + chunk
+        *lines, self._partial = text.split("\n")
+        for line in lines:
+            events.extend(self._line(line))
+        if chunk:
+            events.append({"event": "token", "section": self.section, "text": chunk})
+        return events
+
+    def close(self) -> list[dict]:
+        """Flush the last line and complete the open section."""
+        events = self._line(self._partial) if self._partial else []
+        self._partial = ""
+        return events + self._complete()
+
+    def _line(self, line: str) -> list[dict]:
+        match = _SECTION_HEADER.match(line)
+        if not match:
+            self._lines.append(line)
+            return []
+        events = self._complete()
+        self.section = match.group(1).lower()
+        self._lines = []
+        return events
+
+    def _complete(self) -> list[dict]:
+        if self.section is None:
+            return []
+        return [{"event": "section", "section": self.section,
+                 "text": "\n".join(self._lines).strip()}]
+
 
 class LLMEngine:
     """Wrapper for Ollama LLM calls with audit trail support."""
 
-    def __init__(self, model: str = "llama3.1:8b", base_url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        model: str = "llama3.1:8b",
+        base_url: str = "http://localhost:11434",
+        max_connections: int = _MAX_CONNECTIONS,
+        keepalive_expiry: float = _KEEPALIVE_EXPIRY_S,
+        transaction_token_budget: int = DEFAULT_TOKEN_BUDGET,
+        response_cache: Optional[ResponseCache] = None,
+        cache_responses: bool = True,
+        sar_concurrency: int = _SAR_CONCURRENCY,
+        sar_max_queue: int = _SAR_MAX_QUEUE,
+        chat_concurrency: int = _CHAT_CONCURRENCY,
+        chat_max_queue: int = _CHAT_MAX_QUEUE,
+    ):
+        from langchain_core.prompts import ChatPromptTemplate
+
         self.model = model
         self.base_url = base_url
         self.system_prompt = SAR_SYSTEM_PROMPT
-        
+        self.chat_system_prompt = CHAT_SYSTEM_PROMPT
+        # Estimated tokens the SAR prompt may spend on the transaction listing
+        self.transaction_token_budget = transaction_token_budget
+        self.sar_temperature = _SAR_TEMPERATURE
+        self.chat_temperature = _CHAT_TEMPERATURE
+        # Disk-backed SAR responses by prompt fingerprint (None = disabled)
+        if response_cache is None and cache_responses:
+            response_cache = ResponseCache()
+        self.response_cache = response_cache if cache_responses else None
+        # Per-lane limits; Ollama's OLLAMA_NUM_PARALLEL should cover their sum
+        self.scheduler = LLMScheduler({
+            "sar": (sar_concurrency, sar_max_queue),
+            "chat": (chat_concurrency, chat_max_queue),
+        })
+
         # Initialize RAG Pipeline
         from app.core.rag_pipeline import RAGPipeline
         self.rag_pipeline = RAGPipeline()
 
-    async def generate_sar(self, case_data: dict) -> dict:
+        # One keep-alive connection pool for every Ollama call; requests beyond
+        # max_connections wait for a free connection instead of opening more
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+        # Use placeholders to avoid LangChain parsing curly braces in the content as variables
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", "{system_content}"),
+            ("user", "{user_content}")
+        ])
+        self.sar_chain = self._build_chain(temperature=self.sar_temperature)
+        self.chat_chain = self._build_chain(temperature=self.chat_temperature)
+
+    def _build_chain(self, temperature: float):
+        """prompt | ChatOllama | str, with the model client on the shared pool."""
+        from langchain_ollama import ChatOllama
+        from langchain_core.output_parsers import StrOutputParser
+
+        llm = ChatOllama(
+            model=self.model,
+            base_url=self.base_url,
+            temperature=temperature,
+            keep_alive="5m",
+            async_client_kwargs={
+                "transport": self._transport,
+                "timeout": httpx.Timeout(None, connect=_CONNECT_TIMEOUT_S),
+            },
+        )
+        return self.prompt | llm | StrOutputParser()
+
+    async def aclose(self):
+        """Close the pooled Ollama connections (on application shutdown)."""
+        await self._transport.aclose()
+        if self.response_cache is not None:
+            self.response_cache.close()
+
+    async def generate_sar(self, case_data: dict, force_regenerate: bool = False) -> dict:
         """
         Generate a SAR narrative from case data with RAG and Audit Trail.
+
+        An identical prompt served before is answered from the response
+        cache (result["cache"] == "hit"); force_regenerate skips the lookup
+        and always calls the model ("bypass"), refreshing the cached entry.
+
+        Raises LaneFull when the SAR lane's wait queue is full.
         """
-        from langchain_ollama import ChatOllama
-        from langchain_core.prompts import ChatPromptTemplate
-        from langchain_core.output_parsers import StrOutputParser
+        audit_logger, inputs = await self._prepare_sar(case_data)
+        key, cached, cache_status = self._cache_lookup(audit_logger, inputs, force_regenerate)
+        if cached is not None:
+            return self._sar_result(audit_logger, cached, cache_status)
+        try:
+            # Prebuilt chain in a SAR lane slot, audit logger as callback
+            async with self.scheduler.slot("sar"):
+                narrative_text = await self.sar_chain.ainvoke(
+                    inputs, config={'callbacks': [audit_logger]}
+                )
+            self._cache_store(key, narrative_text)
+            return self._sar_result(audit_logger, narrative_text, cache_status)
+        except LaneFull:
+            raise
+        except Exception as e:
+            return self._sar_failure(audit_logger, e, cache_status)
+
+    async def stream_sar(self, case_data: dict, force_regenerate: bool = False):
+        """
+        generate_sar(), streamed: yields events as the model produces text.
+
+        Events (dicts with an "event" key):
+            {"event": "token", "section": "body", "text": "..."}
+            {"event": "section", "section": "introduction", "text": "..."}   # section complete
+            {"event": "result", "result": {...}}   # generate_sar()'s return value, last
+
+        A cached narrative is replayed through the same events, a line per token.
+        A full SAR lane ends the stream with a failed result.
+        """
+        audit_logger, inputs = await self._prepare_sar(case_data)
+        key, cached, cache_status = self._cache_lookup(audit_logger, inputs, force_regenerate)
+        parser = NarrativeSectionParser()
+        if cached is not None:
+            for line in cached.splitlines(keepends=True):
+                for event in parser.feed(line):
+                    yield event
+            for event in parser.close():
+                yield event
+            yield {"event": "result", "result": self._sar_result(audit_logger, cached, cache_status)}
+            return
+
+        chunks = []
+        try:
+            async with self.scheduler.slot("sar"):
+                async for chunk in self.sar_chain.astream(inputs, config={'callbacks': [audit_logger]}):
+                    chunks.append(chunk)
+                    for event in parser.feed(chunk):
+                        yield event
+            for event in parser.close():
+                yield event
+            narrative_text = "".join(chunks)
+            self._cache_store(key, narrative_text)
+            result = self._sar_result(audit_logger, narrative_text, cache_status)
+        except Exception as e:
+            result = self._sar_failure(audit_logger, e, cache_status)
+        yield {"event": "result", "result": result}
+
+    def _cache_lookup(self, audit_logger, inputs: dict, force_regenerate: bool):
+        """
+        Look the SAR prompt up in the response cache and log the outcome.
+
+        Returns (key, cached narrative or None, "hit" | "miss" | "bypass" | "disabled").
+        """
+        if self.response_cache is None:
+            return None, None, "disabled"
+        key = ResponseCache.key(self.model, self.sar_temperature,
+                                inputs["system_content"], inputs["user_content"])
+        if force_regenerate:
+            audit_logger.log_step(audit_logger.next_step(), "Response Cache", "Cache Bypassed",
+                                  output=f"Forced regeneration; key {key[:16]}.")
+            return key, None, "bypass"
+
+        entry = self.response_cache.get(key)
+        if entry is None:
+            audit_logger.log_step(audit_logger.next_step(), "Response Cache", "Cache Miss",
+                                  output=f"No cached response for key {key[:16]}; calling {self.model}.")
+            return key, None, "miss"
+
+        text = entry["response"]
+        created = datetime.fromtimestamp(entry["created_at"]).isoformat(timespec="seconds")
+        audit_logger.log_step(audit_logger.next_step(), "Response Cache", "Cache Hit",
+                              output=f"Key {key[:16]}: response of {self.model} "
+                                     f"(temperature {self.sar_temperature}) cached at {created}; "
+                                     f"model not called.")
+        audit_logger.log_step(audit_logger.next_step(), "LLM Engine", "Generated Response (cached)",
+                              output=text[:500] + "..." if len(text) > 500 else text)
+        return key, text, "hit"
+
+    def _cache_store(self, key: Optional[str], narrative_text: str):
+        """Cache a successful, non-empty model response."""
+        if key is None or not narrative_text.strip():
+            return
+        try:
+            self.response_cache.put(key, narrative_text)
+        except Exception as e:
+            print(f"[WARN] Could not cache SAR response: {e}")
+
+    async def _prepare_sar(self, case_data: dict):
+        """Steps 1-3 of SAR generation: audit logger, RAG context, chain inputs."""
         from app.core.audit_logger import AuditLogger
         
         # 1. Initialize Audit Logger
         audit_logger = AuditLogger()
-        audit_logger.log_step(1, "LLM Engine", "Started SAR Generation", output=f"Case Data: {str(case_data)[:200]}...")
+        audit_logger.log_step(
+            1, "LLM Engine", "Started SAR Generation",
+            output=f"Case {case_data.get('case_id', 'Unknown')}: "
+                   f"{len(case_data.get('transactions', []))} transactions.",
+        )
 
         # 2. Retrieve Context (RAG)
         query = f"Suspicious activity for customer {case_data.get('customer', {}).get('name', 'Unknown')}"
@@ -78,72 +343,76 @@ class LLMEngine:
         context_str = "\n".join([f"- {d['content']} (Source: {d['source']})" for d in retrieved_docs])
         audit_logger.log_step(3, "RAG Pipeline", "Context Retrieved", output=f"Found {len(retrieved_docs)} documents.")
 
-        # 3. Initialize LLM
-        llm = ChatOllama(
-            model=self.model,
-            base_url=self.base_url,
-            temperature=0.2,
-            keep_alive="5m"
+        # 3. Build Prompt (transactions compacted to the token budget)
+        compact = compact_transactions(case_data.get('transactions', []), self.transaction_token_budget)
+        user_message_content = self._build_prompt(case_data, context_str, transactions_text=compact["text"])
+        audit_logger.log_step(
+            4, "Prompt Compactor", "Transactions Compacted",
+            data_points_used=[f"{compact['rows_total']} transactions"],
+            output=(
+                f"Listed {compact['rows_listed']} of {compact['rows_total']} transactions, "
+                f"{compact['flows_listed']} repeated flows, {compact['bursts_listed']} same-day bursts "
+                f"in ~{compact['tokens']} tokens (budget {compact['budget']}); "
+                f"prompt ~{estimate_tokens(self.system_prompt) + estimate_tokens(user_message_content)} tokens."
+            ),
         )
+        return audit_logger, {
+            "system_content": self.system_prompt,
+            "user_content": user_message_content
+        }
 
-        # 4. Build Prompt
-        system_message = self.system_prompt
-        user_message_content = self._build_prompt(case_data, context_str)
+    def _sar_result(self, audit_logger, narrative_text: str, cache_status: str = "disabled") -> dict:
+        """Steps 5-6: split the narrative into sections and finish the audit trail."""
+        # 5. Parse Response
+        sections = self._parse_narrative(narrative_text)
+        
+        # 6. Finalize Audit Trail
+        audit_logger.log_step(audit_logger.next_step(), "LLM Engine", "Parsing Complete",
+                              output="Narrative structured into sections.")
+        
+        return {
+            "narrative": sections,
+            "audit_trail": audit_logger.get_trail(),
+            "quality_score": {
+                "completeness": 0.9, 
+                "compliance": 0.85, 
+                "readability": 0.9, 
+                "evidence_linkage": 0.8
+            },
+            "typology": None,
+            "cache": cache_status,
+        }
 
-        # Use placeholders to avoid LangChain parsing curly braces in the content as variables
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "{system_message_content}"),
-            ("user", "{user_message_content}")
-        ])
+    def _sar_failure(self, audit_logger, error: Exception, cache_status: str = "disabled") -> dict:
+        """Result returned when the model call fails."""
+        audit_logger.log_step(99, "Error", "Generation Failed", output=str(error))
+        return {
+            "narrative": {
+                "introduction": "Error generating SAR.",
+                "body": str(error),
+                "conclusion": "Please check LLM connection."
+            },
+            "audit_trail": audit_logger.get_trail(),
+            "quality_score": {},
+            "typology": None,
+            "cache": cache_status,
+        }
 
-        # 5. Chain with Callbacks
-        chain = prompt | llm | StrOutputParser()
+    def _build_prompt(
+        self, case_data: dict, context: Optional[str] = None, transactions_text: Optional[str] = None,
+    ) -> str:
+        """Build the full prompt from case data and RAG context.
 
-        try:
-            # Pass audit logger as callback
-            narrative_text = await chain.ainvoke(
-                {
-                    "system_message_content": system_message, 
-                    "user_message_content": user_message_content
-                }, 
-                config={'callbacks': [audit_logger]}
-            )
-            
-            # 6. Parse Response
-            sections = self._parse_narrative(narrative_text)
-            
-            # 7. Finalize Audit Trail
-            audit_logger.log_step(5, "LLM Engine", "Parsing Complete", output="Narrative structured into sections.")
-            
-            return {
-                "narrative": sections,
-                "audit_trail": audit_logger.get_trail(),
-                "quality_score": {
-                    "completeness": 0.9, 
-                    "compliance": 0.85, 
-                    "readability": 0.9, 
-                    "evidence_linkage": 0.8
-                },
-                "typology": None,
-            }
-        except Exception as e:
-            audit_logger.log_step(99, "Error", "Generation Failed", output=str(e))
-            return {
-                "narrative": {
-                    "introduction": "Error generating SAR.",
-                    "body": str(e),
-                    "conclusion": "Please check LLM connection."
-                },
-                "audit_trail": audit_logger.get_trail(),
-                "quality_score": {},
-                "typology": None
-            }
-
-    def _build_prompt(self, case_data: dict, context: Optional[str] = None) -> str:
-        """Build the full prompt from case data and RAG context."""
+        `transactions_text` is the compacted transaction listing; it is
+        computed here when not given.
+        """
         
         customer_str = str(case_data.get('customer', 'Unknown Customer'))
-        transactions_str = str(case_data.get('transactions', 'No Transactions'))
+        if transactions_text is None:
+            transactions_text = compact_transactions(
+                case_data.get('transactions', []), self.transaction_token_budget,
+            )["text"]
+        transactions_str = transactions_text
         
         prompt_parts = [
             "Generate a Suspicious Activity Report (SAR) narrative based on the following data:\n",
@@ -189,11 +458,9 @@ class LLMEngine:
     async def chat_with_sar(self, case_data: dict, history: list[dict], query: str, sar_narrative: Optional[str] = None) -> str:
         """
         Chat with the SAR context (RAG + Conversation History + Generated Narrative).
+
+        Raises LaneFull when the chat lane's wait queue is full.
         """
-        from langchain_ollama import ChatOllama
-        from langchain_core.prompts import ChatPromptTemplate
-        from langchain_core.output_parsers import StrOutputParser
-        
         # 1. Retrieve Context
         # We include the case data in the query context implicitly
         context_query = f"{query} related to {case_data.get('customer', {}).get('name', 'Customer')}"
@@ -204,10 +471,6 @@ class LLMEngine:
             context_str = "No specific regulatory context found."
         
         # 2. Build Prompt
-        system_prompt = """You are an AI assistant helping a compliance officer analyze a suspicious activity case.
-        Use the provided Case Data, SAR Narrative (if available), and Regulatory Context to answer the user's question.
-        If you don't know the answer, say so. Be professional and concise."""
-        
         case_summary = f"Customer: {case_data.get('customer', {})}\nTransactions Summary: {len(case_data.get('transactions', []))} transactions."
         
         # Convert history to string format (naive approach for now)
@@ -229,27 +492,15 @@ class LLMEngine:
         
         user_prompt = "\n".join(user_prompt_parts)
         
-        # 3. Call LLM
-        llm = ChatOllama(
-            model=self.model,
-            base_url=self.base_url,
-            temperature=0.4,
-            keep_alive="5m"
-        )
-        
-        # Use placeholders to avoid LangChain parsing curly braces in the content as variables
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "{system_prompt_content}"),
-            ("user", "{user_prompt_content}")
-        ])
-        
-        chain = prompt | llm | StrOutputParser()
-        
+        # 3. Call LLM (prebuilt chain, chat lane)
         try:
-            response = await chain.ainvoke({
-                "system_prompt_content": system_prompt,
-                "user_prompt_content": user_prompt
-            })
+            async with self.scheduler.slot("chat"):
+                response = await self.chat_chain.ainvoke({
+                    "system_content": self.chat_system_prompt,
+                    "user_content": user_prompt
+                })
             return response
+        except LaneFull:
+            raise
         except Exception as e:
             return f"I encountered an error answering that: {e}"
@@ -0,0 +1,156 @@
+"""
+LLM Scheduler — admission control in front of the Ollama model host.
+
+Owner: P2
+
+Every model call runs inside a slot of its lane:
+
+  - "sar"   long narrative generations
+  - "chat"  short copilot answers
+
+Each lane has its own concurrency limit and its own bounded wait queue,
+so a burst of SAR generations can fill the SAR lane without delaying chat.
+A call that finds its lane running at the limit waits in FIFO order; once
+the queue is also full it is rejected at once with LaneFull, which the API
+turns into 429 Too Many Requests with a Retry-After estimate, instead of
+piling more requests onto a saturated model.
+
+The host must be able to run every lane at once: set Ollama's
+OLLAMA_NUM_PARALLEL to at least the sum of the lane limits, or requests
+queue again inside Ollama where lanes cannot help.
+
+Usage:
+    scheduler = LLMScheduler({"sar": (2, 8), "chat": (2, 16)})
+    async with scheduler.slot("sar"):
+        text = await chain.ainvoke(inputs)
+    scheduler.stats()
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+# Service time assumed before a lane has completed any call (Retry-After)
+_DEFAULT_SERVICE_S = {"sar": 60.0, "chat": 10.0}
+# Recent samples kept per lane for the percentiles in stats()
+_WINDOW = 256
+
+
+class LaneFull(Exception):
+    """A lane's wait queue is full; retry after `retry_after` seconds."""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"LLM {lane} queue is full, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Lane:
+    """Concurrency limit, wait queue and timing counters of one lane."""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        if concurrency < 1 or max_queue < 0:
+            raise ValueError(f"Invalid limits for LLM lane {name!r}: {concurrency}, {max_queue}")
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_s: deque[float] = deque(maxlen=_WINDOW)
+        self.service_s: deque[float] = deque(maxlen=_WINDOW)
+
+    def full(self) -> bool:
+        return self.running + self.queued >= self.concurrency + self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a queue position frees up: mean service time / concurrency."""
+        service = (sum(self.service_s) / len(self.service_s) if self.service_s
+                   else _DEFAULT_SERVICE_S.get(self.name, 30.0))
+        return max(1, math.ceil(service / self.concurrency))
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_ms": {
+                "p50": round(_percentile(self.wait_s, 0.5) * 1e3, 1),
+                "p95": round(_percentile(self.wait_s, 0.95) * 1e3, 1),
+                "max": round(max(self.wait_s, default=0.0) * 1e3, 1),
+            },
+            "service_ms": {
+                "p50": round(_percentile(self.service_s, 0.5) * 1e3, 1),
+                "p95": round(_percentile(self.service_s, 0.95) * 1e3, 1),
+                "max": round(max(self.service_s, default=0.0) * 1e3, 1),
+            },
+        }
+
+
+class LLMScheduler:
+    """Per-lane concurrency limits with bounded FIFO wait queues."""
+
+    def __init__(self, lanes: dict[str, tuple[int, int]]):
+        """
+        Args:
+            lanes: lane name → (concurrency limit, max calls waiting)
+        """
+        self.lanes = {name: _Lane(name, *limits) for name, limits in lanes.items()}
+
+    @asynccontextmanager
+    async def slot(self, lane: str):
+        """
+        Hold one of `lane`'s slots for the duration of the block.
+
+        Raises LaneFull without waiting when the lane's queue is full.
+        """
+        self.check(lane)
+        state = self.lanes[lane]
+        state.queued += 1
+        enqueued = time.perf_counter()
+        try:
+            await state.semaphore.acquire()
+        finally:
+            state.queued -= 1
+        started = time.perf_counter()
+        state.wait_s.append(started - enqueued)
+        state.admitted += 1
+        state.running += 1
+        try:
+            yield
+        except BaseException:
+            state.failed += 1
+            raise
+        else:
+            state.completed += 1
+            state.service_s.append(time.perf_counter() - started)
+        finally:
+            state.running -= 1
+            state.semaphore.release()
+
+    def check(self, lane: str):
+        """Raise LaneFull if a call on `lane` would be rejected right now."""
+        state = self.lanes[lane]
+        if state.full():
+            state.rejected += 1
+            raise LaneFull(lane, state.retry_after())
+
+    def stats(self) -> dict:
+        return {name: state.stats() for name, state in self.lanes.items()}
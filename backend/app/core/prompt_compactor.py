@@ -0,0 +1,257 @@
+"""
+Prompt Compactor — fits a case's transactions into a token budget.
+
+Owner: P2
+
+Instead of the transaction dicts' repr, the SAR prompt gets a compact
+plain-text rendering:
+
+  - SUMMARY        counts, totals, date range, threshold statistics
+  - FLOWS          repeated sender → receiver pairs, aggregated
+  - SAME-DAY BURSTS days on which one receiver got several transactions
+  - TRANSACTIONS   one short line per listed row, in time order
+
+Lines are added by priority until the budget is spent: the summary, then
+the rows an investigator always needs (first, last, largest, smallest and
+those closest below the reporting threshold), then flows and bursts (each
+capped at half of what is left), then the other just-below-threshold rows
+and finally the remaining rows. Small cases therefore still list every transaction; large
+ones keep the evidence and say how much was left out.
+
+Tokens are estimated as characters / 4 (no tokenizer dependency).
+
+Usage:
+    compact = compact_transactions(case_data["transactions"], token_budget=3000)
+    compact["text"], compact["tokens"], compact["rows_listed"]
+"""
+import numpy as np
+import pandas as pd
+
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 3000
+
+# Cash-transaction reporting threshold (₹1,00,000) and the band just below it
+REPORTING_THRESHOLD = 100000
+NEAR_THRESHOLD_RATIO = 0.9
+
+# Rows always tried first
+_N_LARGEST = 5
+_N_SMALLEST = 2
+_N_NEAR_THRESHOLD = 10
+# Most of what is left after the key rows that flows, then bursts, may use
+_GROUP_SHARE = 0.5
+# Transactions into one receiver on one day that count as a burst
+_BURST_MIN = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: characters / 4, rounded up."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _as_frame(transactions) -> pd.DataFrame:
+    """Transactions (TransactionTable or list of dicts) as a DataFrame with canonical columns."""
+    if hasattr(transactions, "to_frame"):
+        df = transactions.to_frame()
+        df["txn_id"] = df["txn_id"].astype(object)
+    else:
+        df = pd.DataFrame(list(transactions))
+        for col, default in (("txn_id", ""), ("sender", "Unknown"), ("receiver", "Unknown"),
+                             ("amount", 0.0), ("currency", "INR"), ("timestamp", None),
+                             ("type", "")):
+            if col not in df:
+                df[col] = default
+        df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0)
+        df["timestamp"] = pd.to_datetime(
+            df["timestamp"], errors="coerce", utc=True, format="mixed",
+        ).dt.tz_localize(None)
+    for col in ("sender", "receiver", "currency", "type"):
+        df[col] = df[col].astype(str)
+    return df.reset_index(drop=True)
+
+
+def _amount(value: float) -> str:
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+
+def _day(ts) -> str:
+    return "????-??-??" if pd.isna(ts) else ts.strftime("%Y-%m-%d")
+
+
+class _Budget:
+    """Running token allowance; take() only accepts lines that still fit."""
+
+    def __init__(self, tokens: int):
+        self.left = tokens
+
+    def take(self, line: str, reserve: int = 0) -> bool:
+        """Spend tokens on `line` if at least `reserve` tokens remain afterwards."""
+        cost = estimate_tokens(line + "\n")
+        if cost > self.left - reserve:
+            return False
+        self.left -= cost
+        return True
+
+
+def compact_transactions(transactions, token_budget: int = DEFAULT_TOKEN_BUDGET) -> dict:
+    """
+    Render transactions as a compact, prioritised text block within `token_budget`.
+
+    Returns:
+        {
+            "text": "...",          # block to put in the prompt
+            "tokens": 2950,         # estimated tokens of text
+            "budget": 3000,
+            "rows_total": 5000,
+            "rows_listed": 130,     # transactions shown individually
+            "flows_listed": 12,
+            "bursts_listed": 4,
+        }
+    """
+    df = _as_frame(transactions)
+    n = len(df)
+    if n == 0:
+        text = "No Transactions"
+        return {"text": text, "tokens": estimate_tokens(text), "budget": token_budget,
+                "rows_total": 0, "rows_listed": 0, "flows_listed": 0, "bursts_listed": 0}
+
+    df = df.sort_values("timestamp", kind="stable", na_position="last").reset_index(drop=True)
+    amounts = df["amount"].to_numpy(dtype=np.float64)
+    near = (amounts >= NEAR_THRESHOLD_RATIO * REPORTING_THRESHOLD) & (amounts < REPORTING_THRESHOLD)
+    currencies = df["currency"].unique()
+    one_currency = len(currencies) == 1
+
+    # ---- Summary (always included) ---------------------------------------
+    ts = df["timestamp"]
+    summary = [
+        f"{n} transactions, {_day(ts.min())} to {_day(ts.max())}"
+        + (f", all in {currencies[0]}" if one_currency else f", currencies: {', '.join(currencies)}"),
+        f"total {_amount(amounts.sum())}, average {_amount(round(amounts.mean(), 2))}, "
+        f"largest {_amount(amounts.max())}, smallest {_amount(amounts.min())}",
+        f"{int((amounts < REPORTING_THRESHOLD).sum())} below the {_amount(REPORTING_THRESHOLD)} "
+        f"reporting threshold, {int(near.sum())} of them within "
+        f"{100 - int(NEAR_THRESHOLD_RATIO * 100)}% of it",
+        f"{df['sender'].nunique()} distinct senders, {df['receiver'].nunique()} distinct receivers, "
+        f"types: {', '.join(df['type'].value_counts().index[:6])}",
+    ]
+    budget = _Budget(token_budget)
+    for line in summary:
+        budget.left -= estimate_tokens(line + "\n")
+    # Section headers and "... N more" notes
+    budget.left -= 4 * estimate_tokens("SAME-DAY BURSTS (date | receiver | txns | senders | total):\n")
+
+    # ---- Rows by priority -------------------------------------------------
+    order = np.argsort(-amounts, kind="stable")
+    near_idx = np.flatnonzero(near)
+    near_idx = near_idx[np.argsort(-amounts[near_idx], kind="stable")]
+    tags: dict[int, list[str]] = {}
+    priority: list[int] = []
+
+    def want(i: int, tag: str):
+        tags.setdefault(int(i), []).append(tag)
+        priority.append(int(i))
+
+    want(0, "first")
+    want(n - 1, "last")
+    for i in order[:_N_LARGEST]:
+        want(i, "largest")
+    for i in near_idx[:_N_NEAR_THRESHOLD]:
+        want(i, "near-threshold")
+    for i in order[::-1][:_N_SMALLEST]:
+        want(i, "smallest")
+    for i in near_idx[_N_NEAR_THRESHOLD:]:
+        tags.setdefault(int(i), []).append("near-threshold")
+
+    # Time of day only when the data has one
+    with_time = bool((ts.dropna() != ts.dropna().dt.floor("D")).any())
+    row_format = "%Y-%m-%d %H:%M" if with_time else "%Y-%m-%d"
+    days = ts.dt.strftime(row_format).fillna(_day(pd.NaT)).tolist()
+    ids, senders, receivers, types, row_currencies = (
+        df[c].tolist() for c in ("txn_id", "sender", "receiver", "type", "currency")
+    )
+
+    def row_line(i: int) -> str:
+        amount = _amount(amounts[i]) if one_currency else f"{row_currencies[i]} {_amount(amounts[i])}"
+        note = f" | {', '.join(dict.fromkeys(tags[i]))}" if i in tags else ""
+        return (f"{days[i]} | {ids[i]} | {senders[i]} -> {receivers[i]} "
+                f"| {amount} | {types[i]}{note}")
+
+    listed: dict[int, str] = {}
+
+    def list_rows(indices):
+        for i in indices:
+            if i in listed:
+                continue
+            line = row_line(i)
+            if not budget.take(line):
+                return False
+            listed[i] = line
+        return True
+
+    list_rows(priority)
+
+    # ---- Repeated counterparties -------------------------------------------
+    flows = (
+        df.groupby(["sender", "receiver"], sort=False)
+        .agg(count=("amount", "size"), total=("amount", "sum"), low=("amount", "min"),
+             high=("amount", "max"), first=("timestamp", "min"), last=("timestamp", "max"))
+        .reset_index()
+    )
+    flows = flows[flows["count"] >= 2].sort_values(["total", "count"], ascending=False)
+    flow_lines = []
+    keep = int(budget.left * (1 - _GROUP_SHARE))
+    for f in flows.itertuples(index=False):
+        line = (f"{f.sender} -> {f.receiver} | {f.count} | {_amount(f.total)} | "
+                f"{_amount(f.low)}-{_amount(f.high)} | {_day(f.first)}..{_day(f.last)}")
+        if not budget.take(line, reserve=keep):
+            break
+        flow_lines.append(line)
+
+    # ---- Same-day bursts ---------------------------------------------------
+    dated = df[df["timestamp"].notna()]
+    bursts = (
+        dated.assign(day=dated["timestamp"].dt.floor("D"))
+        .groupby(["day", "receiver"], sort=False)
+        .agg(count=("amount", "size"), senders=("sender", "nunique"), total=("amount", "sum"))
+        .reset_index()
+    )
+    bursts = bursts[bursts["count"] >= _BURST_MIN].sort_values(["count", "total"], ascending=False)
+    burst_lines = []
+    keep = int(budget.left * (1 - _GROUP_SHARE))
+    for b in bursts.itertuples(index=False):
+        line = f"{_day(b.day)} | {b.receiver} | {b.count} | {b.senders} | {_amount(b.total)}"
+        if not budget.take(line, reserve=keep):
+            break
+        burst_lines.append(line)
+
+    # ---- Remaining rows: near-threshold first, then in time order ------------
+    if list_rows(near_idx[_N_NEAR_THRESHOLD:].tolist()):
+        list_rows(range(n))
+
+    # ---- Render ---------------------------------------------------------------
+    parts = ["SUMMARY:", *summary]
+    if flow_lines:
+        parts += ["", "REPEATED FLOWS (sender -> receiver | txns | total | range | dates):",
+                  *flow_lines]
+        if len(flow_lines) < len(flows):
+            parts.append(f"... {len(flows) - len(flow_lines)} more flows omitted")
+    if burst_lines:
+        parts += ["", "SAME-DAY BURSTS (date | receiver | txns | senders | total):", *burst_lines]
+        if len(burst_lines) < len(bursts):
+            parts.append(f"... {len(bursts) - len(burst_lines)} more bursts omitted")
+    parts += ["", f"TRANSACTIONS ({'time' if with_time else 'date'} | id | sender -> receiver "
+                  f"| amount | type | note):"]
+    parts += [listed[i] for i in sorted(listed)]
+    if len(listed) < n:
+        parts.append(f"... {n - len(listed)} more transactions omitted (covered by the summary)")
+
+    text = "\n".join(parts)
+    return {
+        "text": text,
+        "tokens": estimate_tokens(text),
+        "budget": token_budget,
+        "rows_total": n,
+        "rows_listed": len(listed),
+        "flows_listed": len(flow_lines),
+        "bursts_listed": len(burst_lines),
+    }
@@ -0,0 +1,145 @@
+"""
+Response Cache — disk-backed memo of LLM responses by prompt fingerprint.
+
+Owner: P2
+
+Keys are a SHA-256 of (model, temperature, system prompt, rendered user
+prompt), so only byte-identical requests hit. Entries live in a SQLite file
+and survive restarts; they expire after a TTL and are evicted least
+recently used first once the stored responses exceed the size cap.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DEFAULT_PATH = os.path.join(_BACKEND_ROOT, "llm_cache", "responses.sqlite3")
+
+# Defaults: 256 MiB of response text, kept for a week
+_DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_DEFAULT_TTL_S = 7 * 24 * 3600
+
+
+class ResponseCache:
+    """
+    Thread-safe, size-bounded LRU of LLM responses in SQLite, with TTL.
+
+    Usage:
+        cache = ResponseCache()
+        key = ResponseCache.key(model, temperature, system_prompt, user_prompt)
+        entry = cache.get(key)          # {"response", "created_at"} or None
+        cache.put(key, response_text)
+        cache.stats()                   # hits, misses, evictions, expired, ...
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        ttl_seconds: float = _DEFAULT_TTL_S,
+    ):
+        self.path = path or _DEFAULT_PATH
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used)")
+
+    @staticmethod
+    def key(model: str, temperature: float, system_prompt: str, user_prompt: str) -> str:
+        """Fingerprint of everything that determines the model's response."""
+        payload = json.dumps([model, float(temperature), system_prompt, user_prompt],
+                             ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,),
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return {"response": row[0], "created_at": row[1]}
+
+    def put(self, key: str, response: str):
+        size = len(response.encode("utf-8", "surrogatepass"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Least recently used first, until back under the cap
+            doomed = []
+            for old_key, old_size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_used"
+            ):
+                if total <= self.max_bytes:
+                    break
+                doomed.append((old_key,))
+                total -= old_size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            self.evictions += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": stored,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
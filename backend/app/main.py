@@ -3,19 +3,29 @@ SAR Narrative Generator — FastAPI Backend
 """
 import sys
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.routes import router, close_llm_engine
 
 # Ensure project root is on sys.path so `ml_models` package is importable
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the shared Ollama connection pool
+    await close_llm_engine()
+
+
 app = FastAPI(
     title="SAR Narrative Generator",
     description="AI-powered Suspicious Activity Report drafting with audit trail",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS — allow Streamlit frontend
@@ -0,0 +1,581 @@
+"""
+Case Store — Compact columnar storage for a case's transactions.
+
+Owner: HET
+
+A TransactionTable keeps one case's transactions as NumPy columns instead of
+a list of dicts:
+
+  - sender / receiver  → int32 codes into one interned entity vocabulary
+  - currency / type    → small integer codes into their own vocabularies
+  - amount             → float64
+  - timestamp          → int64 epoch nanoseconds (NaT for unparseable text)
+  - txn_id             → UTF-8 encoded fixed-width bytes
+
+It is also a read-only Sequence of transaction dicts, so existing callers
+(len(), iteration, indexing) keep working unchanged; repr() is a short
+summary rather than every row.
+"""
+import copy
+import hashlib
+import os
+import sys
+from collections.abc import Sequence
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# --- Ensure ml_models is importable (shared timestamp parsing) ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml_models.timestamps import NAT_NS, infer_timestamp_format, parse_timestamps
+
+
+# Canonical transaction fields, in the order the parser emits them
+TXN_FIELDS = ("txn_id", "sender", "receiver", "amount", "currency", "timestamp", "type")
+
+# Defaults for canonical fields missing from a record (mirror data_parser)
+_FIELD_DEFAULTS = {
+    "txn_id": "",
+    "sender": "Unknown",
+    "receiver": "Unknown",
+    "amount": 0.0,
+    "currency": "INR",
+    "timestamp": "",
+    "type": "NEFT",
+}
+
+# int64 sentinel pandas uses for NaT
+NAT = NAT_NS
+
+# Rows materialized per block when iterating the dict view
+_ITER_BLOCK = 65_536
+
+# Rows shown by repr()
+_REPR_ROWS = 3
+
+
+# =========================================================================== #
+#  Column encoders
+# =========================================================================== #
+
+def _factorize(values) -> tuple[np.ndarray, np.ndarray]:
+    """Dictionary-encode values in first-appearance order."""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object)
+
+
+def _encode_ids(values) -> np.ndarray:
+    """Store txn_ids as UTF-8 bytes (one byte per char for typical ids)."""
+    return np.char.encode(np.asarray(values, dtype=str), "utf-8")
+
+
+def _encode_timestamps(
+    text: pd.Series, timestamp_format: Optional[str],
+) -> tuple[np.ndarray, dict[int, str]]:
+    """Parse timestamp text to epoch ns, keeping text that would not round-trip.
+
+    Timestamps that render back to their original text as ISO-8601 seconds
+    ("%Y-%m-%dT%H:%M:%S") are stored only as integers; anything else keeps
+    its original text as well. Text is parsed with ml_models.timestamps in
+    `timestamp_format`, the case's layout (infer_timestamp_format()), so the
+    classifier sees the same timestamps whether a case is a table or a list
+    of dicts.
+    """
+    text = text.astype(str).reset_index(drop=True)
+    ns = parse_timestamps(text.to_numpy(dtype=object), timestamp_format)
+
+    rendered = _render_timestamps(ns)
+    mismatch = np.flatnonzero(rendered != text.to_numpy(dtype=object))
+    overrides = {int(i): text.iat[i] for i in mismatch}
+    return ns, overrides
+
+
+def _render_timestamps(ns: np.ndarray) -> np.ndarray:
+    """Vectorized epoch-ns → "%Y-%m-%dT%H:%M:%S" text ("" for NaT)."""
+    rendered = np.datetime_as_string(ns.view("datetime64[ns]").astype("datetime64[s]"), unit="s")
+    rendered = rendered.astype(object)
+    rendered[ns == NAT] = ""
+    return rendered
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _arrow_to_bytes(arr) -> np.ndarray:
+    """Copy an Arrow string array into a fixed-width bytes array via its buffers."""
+    import pyarrow as pa
+
+    if pa.types.is_large_string(arr.type):
+        offset_type = np.int64
+    else:
+        arr = arr.cast(pa.string())
+        offset_type = np.int32
+    n = len(arr)
+    if n == 0:
+        return np.array([], dtype="S1")
+
+    _, offsets_buf, data_buf = arr.buffers()
+    offsets = np.frombuffer(offsets_buf, dtype=offset_type)[arr.offset:arr.offset + n + 1]
+    data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.empty(0, np.uint8)
+    lengths = np.diff(offsets)
+    width = max(int(lengths.max()), 1)
+
+    # Scatter each string's bytes into its own fixed-width row
+    out = np.zeros((n, width), dtype=np.uint8)
+    rows = np.repeat(np.arange(n), lengths)
+    cols = np.arange(int(lengths.sum())) - np.repeat(offsets[:-1] - offsets[0], lengths)
+    out[rows, cols] = data[offsets[0]:offsets[-1]]
+    return out.view(f"S{width}").ravel()
+
+
+def _remap(codes: np.ndarray, vocab: np.ndarray, merged: dict) -> np.ndarray:
+    """Translate codes from a local vocabulary into a merged one."""
+    mapping = np.empty(len(vocab), dtype=np.int32)
+    for i, value in enumerate(vocab):
+        mapping[i] = merged.setdefault(value, len(merged))
+    return mapping[codes] if len(codes) else codes.astype(np.int32)
+
+
+# =========================================================================== #
+#  TransactionTable
+# =========================================================================== #
+
+class TransactionTable(Sequence):
+    """
+    Columnar, dictionary-encoded transactions for one case.
+
+    Usage:
+        table = TransactionTable.from_records(parsed["transactions"])
+        len(table)                 # number of transactions
+        table[0]                   # {"txn_id": ..., "sender": ..., ...}
+        table.amounts              # float64 column, no Python objects
+        table.sender_codes         # int32 codes into table.entities
+    """
+
+    def __init__(
+        self,
+        txn_ids: np.ndarray,
+        sender_codes: np.ndarray,
+        receiver_codes: np.ndarray,
+        entities: np.ndarray,
+        amounts: np.ndarray,
+        currency_codes: np.ndarray,
+        currencies: np.ndarray,
+        type_codes: np.ndarray,
+        types: np.ndarray,
+        timestamps: np.ndarray,
+        timestamp_text: Optional[dict[int, str]] = None,
+        extras: Optional[dict[str, np.ndarray]] = None,
+        timestamp_format: Optional[str] = None,
+    ):
+        self.txn_ids = txn_ids
+        self.sender_codes = sender_codes
+        self.receiver_codes = receiver_codes
+        self.entities = entities
+        self.amounts = amounts
+        self.currency_codes = currency_codes
+        self.currencies = currencies
+        self.type_codes = type_codes
+        self.types = types
+        self.timestamps = timestamps
+        self.timestamp_text = timestamp_text or {}
+        self.extras = extras or {}
+        # Layout the timestamps were parsed with (None: no timestamp at all)
+        self.timestamp_format = timestamp_format
+        self._content_hash: Optional[str] = None
+
+    # ---- Construction ---------------------------------------------------- #
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[dict], timestamp_format: Optional[str] = None,
+    ) -> "TransactionTable":
+        """Build a table from transaction dicts (parser or JSON upload output).
+
+        `timestamp_format` is the case's timestamp layout when these records
+        continue a case; by default it is inferred from the records.
+        """
+        records = records if isinstance(records, list) else list(records)
+        return cls.from_frame(pd.DataFrame.from_records(records), timestamp_format)
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, timestamp_format: Optional[str] = None,
+    ) -> "TransactionTable":
+        """Build a table from a DataFrame with canonical column names."""
+        n = len(df)
+
+        def column(name):
+            if name in df.columns:
+                # Records missing a field (ragged JSON) get the parser default
+                return df[name].reset_index(drop=True).fillna(_FIELD_DEFAULTS[name])
+            return pd.Series([_FIELD_DEFAULTS[name]] * n, dtype=object)
+
+        # Interleave sender/receiver so entity codes follow the order in
+        # which each name first appears while walking the transactions
+        parties = np.empty(2 * n, dtype=object)
+        parties[0::2] = column("sender").astype(str).to_numpy(dtype=object)
+        parties[1::2] = column("receiver").astype(str).to_numpy(dtype=object)
+        party_codes, entities = _factorize(parties)
+
+        currency_codes, currencies = _factorize(column("currency").astype(str))
+        type_codes, types = _factorize(column("type").astype(str))
+        amounts = pd.to_numeric(column("amount"), errors="coerce").fillna(0).to_numpy(np.float64)
+        ts_text = column("timestamp")
+        if timestamp_format is None:
+            timestamp_format = infer_timestamp_format(ts_text)
+        timestamps, timestamp_text = _encode_timestamps(ts_text, timestamp_format)
+
+        extras = {}
+        for name in df.columns:
+            if name in TXN_FIELDS:
+                continue
+            values = df[name]
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                extras[name] = values.to_numpy(np.float64)
+            else:
+                extras[name] = np.asarray(
+                    [None if _is_missing(v) else v for v in values], dtype=object,
+                )
+
+        return cls(
+            txn_ids=_encode_ids(column("txn_id").astype(str)),
+            sender_codes=party_codes[0::2].copy(),
+            receiver_codes=party_codes[1::2].copy(),
+            entities=entities,
+            amounts=amounts,
+            currency_codes=currency_codes,
+            currencies=currencies,
+            type_codes=type_codes,
+            types=types,
+            timestamps=timestamps,
+            timestamp_text=timestamp_text,
+            extras=extras,
+            timestamp_format=timestamp_format,
+        )
+
+    @classmethod
+    def from_arrow(cls, table) -> "TransactionTable":
+        """Build a table from a pyarrow.Table with canonical column names.
+
+        Columns are encoded with Arrow compute kernels and handed to NumPy
+        as buffers. Values read exactly as the same data uploaded as CSV:
+        null cells are "", and non-string columns (numeric ids, typed
+        timestamps) are rendered as pandas writes them to CSV, so those (and
+        timestamp text, via _encode_timestamps) do go through Python objects.
+        Non-canonical columns are dropped, as in the CSV path.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        n = table.num_rows
+
+        def text(name):
+            if name not in table.column_names:
+                return pa.array([_FIELD_DEFAULTS[name]] * n, pa.string())
+            col = table.column(name).combine_chunks() if n else pa.array([], pa.string())
+            if pa.types.is_string(col.type):
+                return pc.fill_null(col, "")
+            values = col.to_pandas()
+            return pa.array(values.astype(str).where(values.notna(), ""), pa.string())
+
+        def encode(arr):
+            encoded = pc.dictionary_encode(arr)
+            codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32)
+            return codes, np.asarray(encoded.dictionary.to_pylist(), dtype=object)
+
+        party_codes, entities = encode(pa.concat_arrays([text("sender"), text("receiver")]))
+        currency_codes, currencies = encode(text("currency"))
+        type_codes, types = encode(text("type"))
+
+        if "amount" in table.column_names:
+            try:
+                amounts = pc.cast(table.column("amount"), pa.float64())
+                amounts = pc.fill_null(amounts, 0.0).to_numpy()
+            except pa.ArrowInvalid:
+                amounts = pd.to_numeric(
+                    table.column("amount").to_pandas(), errors="coerce",
+                ).fillna(0).to_numpy(np.float64)
+        else:
+            amounts = np.zeros(n, dtype=np.float64)
+
+        ts_text = text("timestamp").to_pandas()
+        timestamp_format = infer_timestamp_format(ts_text)
+        timestamps, timestamp_text = _encode_timestamps(ts_text, timestamp_format)
+
+        if "txn_id" in table.column_names:
+            txn_ids = _arrow_to_bytes(text("txn_id"))
+        else:
+            txn_ids = _encode_ids([f"TXN-{i+1:03d}" for i in range(n)])
+
+        return cls(
+            txn_ids=txn_ids,
+            sender_codes=party_codes[:n].copy(),
+            receiver_codes=party_codes[n:].copy(),
+            entities=entities,
+            amounts=np.ascontiguousarray(amounts, dtype=np.float64),
+            currency_codes=currency_codes,
+            currencies=currencies,
+            type_codes=type_codes,
+            types=types,
+            timestamps=np.ascontiguousarray(timestamps, dtype=np.int64),
+            timestamp_text=timestamp_text,
+            timestamp_format=timestamp_format,
+        )
+
+    @classmethod
+    def concat(cls, tables: list["TransactionTable"]) -> "TransactionTable":
+        """Concatenate tables, merging vocabularies.
+
+        Codes of the first table are preserved; names first seen in later
+        tables are appended to the vocabulary in order. Timestamps keep the
+        layout of the first table that has any; tables parsed with another
+        layout are re-parsed from their text, as in a single upload.
+        """
+        tables = [t for t in tables if t is not None]
+        if not tables:
+            return cls.from_records([])
+        if len(tables) == 1:
+            return tables[0]
+
+        timestamp_format = next(
+            (t.timestamp_format for t in tables if t.timestamp_format is not None), None,
+        )
+        tables = [t.with_timestamp_format(timestamp_format) for t in tables]
+
+        entity_map, currency_map, type_map = {}, {}, {}
+        senders, receivers, currency_codes, type_codes = [], [], [], []
+        timestamp_text = {}
+        offset = 0
+        for t in tables:
+            # Sender/receiver share one vocabulary; remap both with one pass
+            senders.append(_remap(t.sender_codes, t.entities, entity_map))
+            receivers.append(_remap(t.receiver_codes, t.entities, entity_map))
+            currency_codes.append(_remap(t.currency_codes, t.currencies, currency_map))
+            type_codes.append(_remap(t.type_codes, t.types, type_map))
+            timestamp_text.update({i + offset: s for i, s in t.timestamp_text.items()})
+            offset += len(t)
+
+        extra_names = list(dict.fromkeys(name for t in tables for name in t.extras))
+        extras = {}
+        for name in extra_names:
+            parts = []
+            numeric = all(
+                t.extras[name].dtype == np.float64 for t in tables if name in t.extras
+            )
+            for t in tables:
+                if name in t.extras:
+                    parts.append(t.extras[name])
+                elif numeric:
+                    parts.append(np.full(len(t), np.nan))
+                else:
+                    parts.append(np.full(len(t), None, dtype=object))
+            extras[name] = np.concatenate(parts) if numeric else np.concatenate(
+                [p.astype(object) for p in parts]
+            )
+
+        return cls(
+            txn_ids=np.concatenate([t.txn_ids for t in tables]),
+            sender_codes=np.concatenate(senders),
+            receiver_codes=np.concatenate(receivers),
+            entities=np.asarray(list(entity_map), dtype=object),
+            amounts=np.concatenate([t.amounts for t in tables]),
+            currency_codes=np.concatenate(currency_codes),
+            currencies=np.asarray(list(currency_map), dtype=object),
+            type_codes=np.concatenate(type_codes),
+            types=np.asarray(list(type_map), dtype=object),
+            timestamps=np.concatenate([t.timestamps for t in tables]),
+            timestamp_text=timestamp_text,
+            extras=extras,
+            timestamp_format=timestamp_format,
+        )
+
+    def with_timestamp_format(self, timestamp_format: Optional[str]) -> "TransactionTable":
+        """This table with its timestamp text re-parsed in another layout."""
+        if self.timestamp_format is None or self.timestamp_format == timestamp_format:
+            return self
+        timestamps, timestamp_text = _encode_timestamps(
+            pd.Series(self.timestamp_strings(), dtype=object), timestamp_format,
+        )
+        table = copy.copy(self)
+        table.timestamps = timestamps
+        table.timestamp_text = timestamp_text
+        table.timestamp_format = timestamp_format
+        table._content_hash = None
+        return table
+
+    def take(self, indices) -> "TransactionTable":
+        """Rows at ``indices`` as a new table sharing this table's vocabularies."""
+        indices = np.asarray(indices, dtype=np.intp)
+        position = {int(old): new for new, old in enumerate(indices.tolist())}
+        return TransactionTable(
+            txn_ids=self.txn_ids[indices],
+            sender_codes=self.sender_codes[indices],
+            receiver_codes=self.receiver_codes[indices],
+            entities=self.entities,
+            amounts=self.amounts[indices],
+            currency_codes=self.currency_codes[indices],
+            currencies=self.currencies,
+            type_codes=self.type_codes[indices],
+            types=self.types,
+            timestamps=self.timestamps[indices],
+            timestamp_text={
+                position[i]: text for i, text in self.timestamp_text.items() if i in position
+            },
+            extras={name: col[indices] for name, col in self.extras.items()},
+            timestamp_format=self.timestamp_format,
+        )
+
+    # ---- Columnar accessors --------------------------------------------- #
+
+    def content_hash(self) -> str:
+        """Stable hex digest of the canonical columns (computed once per table).
+
+        Tables are never modified in place (appends build a new one), so the
+        digest is memoized. Display-only data (original timestamp text,
+        extra columns) is not part of it.
+        """
+        if self._content_hash is None:
+            h = hashlib.blake2b(digest_size=16)
+            for vocab in (self.entities, self.currencies, self.types):
+                text = "\x1f".join(map(str, vocab)).encode("utf-8", "surrogatepass")
+                h.update(len(text).to_bytes(8, "little"))
+                h.update(text)
+            for col in (
+                self.txn_ids, self.sender_codes, self.receiver_codes, self.amounts,
+                self.currency_codes, self.type_codes, self.timestamps,
+            ):
+                h.update(col.dtype.str.encode())
+                h.update(np.ascontiguousarray(col).tobytes())
+            self._content_hash = h.hexdigest()
+        return self._content_hash
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the table, vocabularies included."""
+        arrays = [
+            self.txn_ids, self.sender_codes, self.receiver_codes, self.amounts,
+            self.currency_codes, self.type_codes, self.timestamps,
+            self.entities, self.currencies, self.types, *self.extras.values(),
+        ]
+        total = sum(a.nbytes for a in arrays)
+        for vocab in (self.entities, self.currencies, self.types):
+            total += sum(sys.getsizeof(v) for v in vocab)
+        for col in self.extras.values():
+            if col.dtype == object:
+                total += sum(sys.getsizeof(v) for v in col if v is not None)
+        total += sum(sys.getsizeof(s) for s in self.timestamp_text.values())
+        return total
+
+    def timestamp_strings(self, start: int = 0, stop: Optional[int] = None) -> list[str]:
+        """Render the timestamp column back to its original text."""
+        stop = len(self) if stop is None else stop
+        out = _render_timestamps(self.timestamps[start:stop]).tolist()
+        if self.timestamp_text:
+            for i, text in self.timestamp_text.items():
+                if start <= i < stop:
+                    out[i - start] = text
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """Expose the table as a DataFrame with categorical columns (no string copies)."""
+        return pd.DataFrame({
+            "txn_id": np.char.decode(self.txn_ids, "utf-8"),
+            "sender": pd.Categorical.from_codes(self.sender_codes, categories=pd.Index(self.entities)),
+            "receiver": pd.Categorical.from_codes(self.receiver_codes, categories=pd.Index(self.entities)),
+            "amount": self.amounts,
+            "currency": pd.Categorical.from_codes(self.currency_codes, categories=pd.Index(self.currencies)),
+            "timestamp": self.timestamps.view("datetime64[ns]"),
+            "type": pd.Categorical.from_codes(self.type_codes, categories=pd.Index(self.types)),
+        })
+
+    # ---- Dict-compatible view ------------------------------------------- #
+
+    def _records(self, start: int, stop: int) -> list[dict]:
+        ids = np.char.decode(self.txn_ids[start:stop], "utf-8").tolist()
+        senders = self.entities[self.sender_codes[start:stop]].tolist()
+        receivers = self.entities[self.receiver_codes[start:stop]].tolist()
+        amounts = self.amounts[start:stop].tolist()
+        currencies = self.currencies[self.currency_codes[start:stop]].tolist()
+        timestamps = self.timestamp_strings(start, stop)
+        types = self.types[self.type_codes[start:stop]].tolist()
+
+        records = [
+            {
+                "txn_id": txn_id,
+                "sender": sender,
+                "receiver": receiver,
+                "amount": amount,
+                "currency": currency,
+                "timestamp": timestamp,
+                "type": txn_type,
+            }
+            for txn_id, sender, receiver, amount, currency, timestamp, txn_type in zip(
+                ids, senders, receivers, amounts, currencies, timestamps, types,
+            )
+        ]
+        for name, col in self.extras.items():
+            for rec, value in zip(records, col[start:stop].tolist()):
+                if not _is_missing(value):
+                    rec[name] = value
+        return records
+
+    def to_records(self) -> list[dict]:
+        """Materialize the full list of transaction dicts."""
+        return self._records(0, len(self))
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("transaction index out of range")
+        return self._records(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        for start in range(0, len(self), _ITER_BLOCK):
+            yield from self._records(start, min(start + _ITER_BLOCK, len(self)))
+
+    def __repr__(self) -> str:
+        # Bounded: logging a million-row case must not materialize every row
+        head = ", ".join(repr(rec) for rec in self._records(0, min(len(self), _REPR_ROWS)))
+        more = ", ..." if len(self) > _REPR_ROWS else ""
+        return f"TransactionTable({len(self)} transactions: [{head}{more}])"
+
+
+class TransactionTableBuilder:
+    """Collects transaction batches (e.g. from a streaming parser) into one table."""
+
+    def __init__(self):
+        # Timestamp layout inferred from the first batch that has one
+        self.timestamp_format: Optional[str] = None
+        self._parts: list[TransactionTable] = []
+
+    def append(self, records):
+        """Encode one batch of transaction dicts; the dicts can then be dropped.
+
+        A ready-made TransactionTable (e.g. from an Arrow upload) is taken as-is.
+        """
+        if isinstance(records, TransactionTable):
+            part = records
+        elif records:
+            part = TransactionTable.from_records(records, self.timestamp_format)
+        else:
+            return
+        self._parts.append(part)
+        self.timestamp_format = self.timestamp_format or part.timestamp_format
+
+    def build(self) -> TransactionTable:
+        table = TransactionTable.concat(self._parts)
+        self._parts = [table]
+        return table
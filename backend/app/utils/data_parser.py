@@ -6,15 +6,53 @@ Owner: HET ONLY
 Parses uploaded CSV/JSON files into CaseData format matching
 the integration contracts in SAR_TODO_ROUND1.md.
 """
+import codecs
+import csv
+import hashlib
 import io
 import json
+import mmap
+import os
 import uuid
 import re
-from typing import Optional
+import time
+from typing import Callable, Optional
 
+import numpy as np
 import pandas as pd
 
 
+# ---------------------------------------------------------------------------
+#  Streaming settings
+# ---------------------------------------------------------------------------
+# Rows per chunk when a CSV is parsed in streaming mode
+CSV_CHUNK_ROWS = 50_000
+
+# Uploads larger than this are parsed chunk-by-chunk by parse_file()
+STREAMING_THRESHOLD_BYTES = 32 * 1024 * 1024
+
+# Columnar formats read through pyarrow (in requirements.txt; imported only
+# when such a file is parsed, so CSV/JSON uploads do not pay for the import)
+_ARROW_FORMATS = {
+    ".parquet": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+    ".ipc": "ipc",
+}
+
+# Transactions per batch handed to the sink by the streaming JSON parser
+JSON_BATCH_SIZE = 10_000
+
+# Bytes read from the source per refill of the JSON stream buffer
+_JSON_READ_SIZE = 1024 * 1024
+
+# Newline-delimited JSON: one transaction object per line
+_NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+# Every extension parse_file() accepts
+SUPPORTED_EXTENSIONS = (".csv", ".json", *_NDJSON_EXTENSIONS, *_ARROW_FORMATS)
+
+
 # ---------------------------------------------------------------------------
 #  Column name normalization map
 # ---------------------------------------------------------------------------
@@ -65,20 +103,33 @@ _COLUMN_ALIASES = {
     "receiver_account": "receiver_account",
     "to_account": "receiver_account",
     "beneficiary_account": "receiver_account",
+    # branch_code (IFSC codes embed the bank code in their first letters)
+    "branch_code": "branch_code",
+    "branch": "branch_code",
+    "ifsc": "branch_code",
+    "ifsc_code": "branch_code",
+    # lat / lon
+    "lat": "lat",
+    "latitude": "lat",
+    "lon": "lon",
+    "lng": "lon",
+    "longitude": "lon",
 }
 
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalize column names using the alias map."""
-    # Lowercase and strip whitespace
-    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+def _resolve_columns(columns) -> list[str]:
+    """Map raw header names to their canonical names via the alias map."""
+    resolved = []
+    for col in columns:
+        # Lowercase and strip whitespace
+        col = str(col).strip().lower().replace(" ", "_")
+        resolved.append(_COLUMN_ALIASES.get(col, col))
+    return resolved
 
-    rename_map = {}
-    for col in df.columns:
-        if col in _COLUMN_ALIASES:
-            rename_map[col] = _COLUMN_ALIASES[col]
 
-    df = df.rename(columns=rename_map)
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize column names using the alias map."""
+    df.columns = _resolve_columns(df.columns)
     return df
 
 
@@ -117,35 +168,377 @@ def _detect_customer(df: pd.DataFrame) -> dict:
     return customer
 
 
-def _build_transactions(df: pd.DataFrame) -> list[dict]:
-    """Convert DataFrame rows to list of transaction dicts."""
-    required_cols = ["txn_id", "sender", "receiver", "amount", "timestamp"]
-    transactions = []
-
-    # Generate txn_ids if missing
-    if "txn_id" not in df.columns:
-        df["txn_id"] = [f"TXN-{i+1:03d}" for i in range(len(df))]
-
-    for _, row in df.iterrows():
-        txn = {
-            "txn_id": str(row.get("txn_id", "")),
-            "sender": str(row.get("sender", "Unknown")),
-            "receiver": str(row.get("receiver", "Unknown")),
-            "amount": float(row.get("amount", 0)),
-            "currency": str(row.get("currency", "INR")),
-            "timestamp": str(row.get("timestamp", "")),
-            "type": str(row.get("type", "NEFT")),
+class CustomerAccumulator:
+    """Incremental equivalent of _detect_customer(), fed one chunk at a time.
+
+    Keeps per-receiver counts, first-seen account and incoming totals, so
+    memory grows with the number of distinct receivers, not with rows.
+    """
+
+    def __init__(self):
+        self.counts: dict[str, int] = {}
+        self.accounts: dict[str, str] = {}
+        self.incoming: dict[str, float] = {}
+
+    def update(self, df: pd.DataFrame):
+        """Fold a normalized chunk into the running totals."""
+        if "receiver" not in df.columns or df.empty:
+            return
+
+        # Counts in first-appearance order so ties resolve like value_counts()
+        for name, count in df["receiver"].value_counts(sort=False).items():
+            self.counts[name] = self.counts.get(name, 0) + int(count)
+
+        if "receiver_account" in df.columns:
+            firsts = df.drop_duplicates("receiver")
+            for name, acct in zip(firsts["receiver"], firsts["receiver_account"]):
+                self.accounts.setdefault(name, acct)
+
+        if "amount" in df.columns:
+            sums = df.groupby("receiver", sort=False)["amount"].sum()
+            for name, total in sums.items():
+                self.incoming[name] = self.incoming.get(name, 0.0) + float(total)
+
+    def merge_accounts(self, accounts: dict):
+        """Adopt first-seen receiver accounts from another accumulator."""
+        for name, acct in accounts.items():
+            self.accounts.setdefault(name, acct)
+
+    @classmethod
+    def from_table(cls, table, customer: Optional[dict] = None) -> "CustomerAccumulator":
+        """Rebuild the running totals from a stored TransactionTable.
+
+        Tables don't keep receiver accounts, so only the detected customer's
+        account (if given) is known afterwards.
+        """
+        acc = cls()
+        acc.update(pd.DataFrame({
+            "receiver": table.entities[table.receiver_codes],
+            "amount": table.amounts,
+        }))
+        if customer and customer.get("account_id") not in (None, "Unknown"):
+            acc.accounts[customer["name"]] = customer["account_id"]
+        return acc
+
+    def result(self) -> dict:
+        """Return the customer dict in the same shape as _detect_customer()."""
+        customer = {
+            "name": "Unknown",
+            "account_id": "Unknown",
+            "kyc_status": "verified",
+            "business_type": None,
+            "avg_monthly_volume": 0,
         }
-        transactions.append(txn)
+        if not self.counts:
+            return customer
 
-    return transactions
+        # Most frequent receiver is likely the subject
+        primary = max(self.counts, key=self.counts.get)
+        customer["name"] = str(primary)
+        if primary in self.accounts:
+            customer["account_id"] = str(self.accounts[primary])
+        if self.incoming:
+            customer["avg_monthly_volume"] = round(self.incoming.get(primary, 0.0), 2)
+        return customer
+
+
+# Defaults used when a canonical transaction column is absent
+_TXN_DEFAULTS = {
+    "sender": "Unknown",
+    "receiver": "Unknown",
+    "amount": 0.0,
+    "currency": "INR",
+    "timestamp": "",
+    "type": "NEFT",
+}
+
+
+def _generate_txn_ids(n: int, start: int = 0) -> list[str]:
+    """Vectorized equivalent of f"TXN-{i+1:03d}" for i in range(start, start+n)."""
+    seq = pd.Series(np.arange(start + 1, start + n + 1, dtype=np.int64))
+    return ("TXN-" + seq.astype(str).str.zfill(3)).tolist()
+
+
+def _numeric_upcast(df: pd.DataFrame) -> Optional[str]:
+    """Common dtype iterrows() would upcast ``df`` to, or None if any column is non-numeric.
+
+    iterrows() turns an all-numeric frame into rows of one common dtype (an
+    int txn_id next to a float amount reads back as "1.0").
+    """
+    if len(df.columns) and all(pd.api.types.is_numeric_dtype(t) for t in df.dtypes):
+        return str(df.iloc[:1].to_numpy().dtype)
+    return None
+
+
+def _build_transaction_columns(
+    df: pd.DataFrame, start: int = 0, defaults: Optional[dict] = None,
+    upcast: Optional[str] = None,
+) -> dict[str, list]:
+    """Convert a normalized DataFrame to per-field value lists, one column at a time.
+
+    Values match what the row-wise ``str()``/``float()`` casts produced:
+    text fields via ``astype(str)``, amount via ``astype(float)`` and
+    missing columns filled with their _TXN_DEFAULTS value (or the
+    schema profile's ``defaults``, when given). ``upcast`` is the
+    _numeric_upcast() of the whole file's frame; it is passed in because a
+    schema profile reads only some of the columns.
+    """
+    defaults = {**_TXN_DEFAULTS, **(defaults or {})}
+    n = len(df)
+
+    # Mirror iterrows()' upcast of an all-numeric frame
+    if upcast is not None and _numeric_upcast(df) is not None:
+        df = df.astype(upcast)
+
+    columns = {}
+    if "txn_id" in df.columns:
+        columns["txn_id"] = df["txn_id"].astype(str).tolist()
+    else:
+        columns["txn_id"] = _generate_txn_ids(n, start)
+
+    for field in _TXN_DEFAULTS:
+        if field not in df.columns:
+            columns[field] = [defaults[field]] * n
+        elif field == "amount":
+            columns[field] = df[field].astype(float).tolist()
+        else:
+            columns[field] = df[field].astype(str).tolist()
+
+    lat, lon = _geo_coords(df)
+    columns["lat"] = lat.tolist()
+    columns["lon"] = lon.tolist()
+    return columns
+
+
+def _build_transactions(
+    df: pd.DataFrame, start: int = 0, defaults: Optional[dict] = None,
+    upcast: Optional[str] = None,
+) -> list[dict]:
+    """Convert DataFrame rows to list of transaction dicts.
+
+    ``start`` offsets generated txn_ids so chunked parses number rows
+    continuously across chunks. Coordinates come from _geo_coords().
+    """
+    cols = _build_transaction_columns(df, start, defaults, upcast)
+    return [
+        {
+            "txn_id": txn_id,
+            "sender": sender,
+            "receiver": receiver,
+            "amount": amount,
+            "currency": currency,
+            "timestamp": timestamp,
+            "type": txn_type,
+            "lat": lat,
+            "lon": lon,
+        }
+        for txn_id, sender, receiver, amount, currency, timestamp, txn_type, lat, lon in zip(
+            cols["txn_id"], cols["sender"], cols["receiver"], cols["amount"],
+            cols["currency"], cols["timestamp"], cols["type"], cols["lat"], cols["lon"],
+        )
+    ]
 
 
 # ---------------------------------------------------------------------------
-#  Geospatial Enrichment
+#  Schema profiles — compiled CSV parse plans keyed by header fingerprint
 # ---------------------------------------------------------------------------
-import random
+# Every field a transaction or the customer detection reads; other columns
+# are not loaded at all when a profile is used
+_CANONICAL_FIELDS = frozenset(_COLUMN_ALIASES.values())
+
+# Fields read as numbers; blank amounts become 0, blank coordinates stay
+# NaN so geo-enrichment fills them
+_NUMERIC_FIELDS = frozenset({"amount", "lat", "lon"})
+
+# Text fields blank cells are filled with ""
+_TEXT_FIELDS = _CANONICAL_FIELDS - _NUMERIC_FIELDS
+
+# The header line must fit in this many bytes to be fingerprinted
+_HEADER_PEEK_BYTES = 64 * 1024
+
+
+def header_fingerprint(columns) -> str:
+    """Stable key for a raw CSV header (exact names, in order)."""
+    joined = "\x1f".join(str(col) for col in columns)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:16]
+
+
+class SchemaProfile:
+    """
+    Compiled parse plan for one CSV feed layout.
+
+    Caches what parse_csv() otherwise works out on every upload: the alias
+    mapping from raw header to canonical fields, an explicit dtype per
+    column and per-feed default values. read_csv()
+    is handed the exact ``usecols``/``dtype`` spec, so known feeds skip
+    column normalization and type inference entirely.
+
+    Args:
+        name: Human-readable feed name (e.g. "core_banking")
+        columns: Raw header names, exactly as they appear in the file
+        dtypes: Canonical field -> pandas dtype ("str", "float64", ...);
+            fields not listed are read as "str"
+        defaults: Canonical field -> value for fields the feed lacks
+        upcast: Dtype the feed's full frame is upcast to because every column
+            is numeric (see _numeric_upcast()); None for a feed with text
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: list[str],
+        dtypes: Optional[dict] = None,
+        defaults: Optional[dict] = None,
+        learned: bool = False,
+        upcast: Optional[str] = None,
+    ):
+        self.name = name
+        self.columns = [str(col) for col in columns]
+        self.fingerprint = header_fingerprint(self.columns)
+        self.defaults = dict(defaults or {})
+        self.learned = learned
+        self.upcast = upcast
+
+        # Raw -> canonical for the columns we read (first alias wins)
+        self.rename: dict[str, str] = {}
+        for raw, canonical in zip(self.columns, _resolve_columns(self.columns)):
+            if canonical in _CANONICAL_FIELDS and canonical not in self.rename.values():
+                self.rename[raw] = canonical
+
+        dtypes = dtypes or {}
+        self.dtypes = {
+            raw: dtypes.get(canonical, "float64" if canonical in _NUMERIC_FIELDS else "str")
+            for raw, canonical in self.rename.items()
+        }
+
+    def read_options(self) -> dict:
+        """Exact read_csv() arguments for this layout."""
+        # The C parser already yields str cells; object skips a str() re-cast
+        dtype = {raw: object if dt == "str" else dt for raw, dt in self.dtypes.items()}
+        return {"usecols": list(self.rename), "dtype": dtype}
 
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rename a frame read with read_options() and fill its blanks."""
+        df = df.rename(columns=self.rename)
+        text = [col for col in df.columns if col in _TEXT_FIELDS]
+        if text:
+            df[text] = df[text].fillna("")
+        for field in _NUMERIC_FIELDS.intersection(df.columns):
+            values = df[field]
+            if not pd.api.types.is_numeric_dtype(values.dtype):
+                values = pd.to_numeric(values, errors="coerce")
+            df[field] = values.fillna(0) if field == "amount" else values
+        return df
+
+    def __repr__(self) -> str:
+        return f"SchemaProfile({self.name!r}, fingerprint={self.fingerprint!r})"
+
+
+_SCHEMA_PROFILES: dict[str, SchemaProfile] = {}
+
+# Learned profiles kept (least recently used are evicted first); every
+# distinct header ever uploaded would otherwise stay registered
+MAX_LEARNED_PROFILES = 256
+
+
+def register_schema_profile(profile: SchemaProfile) -> SchemaProfile:
+    """Add (or replace) the parse plan for a feed layout."""
+    _SCHEMA_PROFILES.pop(profile.fingerprint, None)
+    _SCHEMA_PROFILES[profile.fingerprint] = profile
+    if profile.learned:
+        learned = [fp for fp, p in _SCHEMA_PROFILES.items() if p.learned]
+        for fp in learned[:max(0, len(learned) - MAX_LEARNED_PROFILES)]:
+            _SCHEMA_PROFILES.pop(fp, None)
+    return profile
+
+
+def get_schema_profile(columns) -> Optional[SchemaProfile]:
+    """Registered profile for a raw header, or None for an unknown layout."""
+    fingerprint = header_fingerprint(columns)
+    profile = _SCHEMA_PROFILES.get(fingerprint)
+    if profile is not None and profile.learned:
+        # Keep recently used learned profiles at the end, away from eviction
+        _SCHEMA_PROFILES.pop(fingerprint, None)
+        _SCHEMA_PROFILES[fingerprint] = profile
+    return profile
+
+
+def _read_csv_header(source) -> Optional[list[str]]:
+    """Raw column names from a CSV's first line (None if it can't be peeked)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        line = bytes(source[:_HEADER_PEEK_BYTES]).split(b"\n", 1)[0]
+    elif _is_path(source):
+        with open(source, "rb") as fh:
+            line = fh.readline(_HEADER_PEEK_BYTES)
+    else:
+        # Don't consume a caller's file object just to fingerprint it
+        return None
+    try:
+        return next(csv.reader([line.decode("utf-8-sig").rstrip("\r\n")]))
+    except (UnicodeDecodeError, StopIteration, csv.Error):
+        return None
+
+
+def match_schema_profile(source, filename: str = "") -> Optional[SchemaProfile]:
+    """Profile for a CSV upload's header, or None (non-CSV or unknown layout)."""
+    if filename and os.path.splitext(filename)[1].lower() != ".csv":
+        return None
+    header = _read_csv_header(source)
+    return get_schema_profile(header) if header else None
+
+
+def _learn_schema_profile(
+    header: Optional[list[str]], raw_dtypes: pd.Series, upcast: Optional[str],
+):
+    """Compile and register a profile from the dtypes pandas inferred.
+
+    Called on the inference path with the raw (not yet normalized) frame's
+    dtypes and the normalized frame's _numeric_upcast(), so the next upload
+    with the same header replays them instead of inferring them and yields
+    the same transactions. Hand-registered profiles are never overwritten.
+    """
+    if not header or [str(col) for col in raw_dtypes.index] != header:
+        # Duplicate or unreadable header names; pandas mangled them
+        return
+    existing = get_schema_profile(header)
+    if existing is not None and not existing.learned:
+        return
+
+    dtypes = {}
+    for raw, canonical in zip(header, _resolve_columns(header)):
+        if canonical not in _CANONICAL_FIELDS or canonical in dtypes:
+            continue
+        dtype = raw_dtypes[raw]
+        if canonical in _NUMERIC_FIELDS:
+            numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            dtypes[canonical] = "float64" if numeric else "str"
+        elif pd.api.types.is_numeric_dtype(dtype):
+            # Replay e.g. an int txn_id as int so it renders the same way
+            dtypes[canonical] = str(dtype)
+        else:
+            dtypes[canonical] = "str"
+
+    register_schema_profile(SchemaProfile(
+        name=f"learned-{header_fingerprint(header)}",
+        columns=header,
+        dtypes=dtypes,
+        learned=True,
+        upcast=upcast,
+    ))
+
+
+# Layout of the bank's standard transaction export (and data/sample_data)
+register_schema_profile(SchemaProfile(
+    name="standard_export",
+    columns=["txn_id", "sender", "receiver", "amount", "currency", "timestamp",
+             "type", "sender_account", "receiver_account"],
+    dtypes={"amount": "float64"},
+))
+
+
+# ---------------------------------------------------------------------------
+#  Geospatial Enrichment
+# ---------------------------------------------------------------------------
 INDIAN_CITIES_COORDS = {
     "Mumbai": (19.0760, 72.8777),
     "Delhi": (28.6139, 77.2090),
@@ -159,26 +552,207 @@ INDIAN_CITIES_COORDS = {
     "Jaipur": (26.9124, 75.7873)
 }
 
-def _get_random_coords() -> tuple[float, float]:
-    """Return Lat/Lon with slight jitter around a random major Indian city."""
-    city = random.choice(list(INDIAN_CITIES_COORDS.keys()))
-    base_lat, base_lon = INDIAN_CITIES_COORDS[city]
-    # Add jitter (approx 1-5 km radius)
-    lat = base_lat + random.uniform(-0.05, 0.05)
-    lon = base_lon + random.uniform(-0.05, 0.05)
+# Bank code (leading letters of an account number or IFSC code) -> the
+# city of the bank's registered office
+ACCOUNT_PREFIX_CITIES = {
+    "HDFC": "Mumbai",
+    "ICIC": "Mumbai",
+    "ICICI": "Mumbai",
+    "SBI": "Mumbai",
+    "SBIN": "Mumbai",
+    "KOTAK": "Mumbai",
+    "KKBK": "Mumbai",
+    "YES": "Mumbai",
+    "YESB": "Mumbai",
+    "BOI": "Mumbai",
+    "BKID": "Mumbai",
+    "AXIS": "Ahmedabad",
+    "UTIB": "Ahmedabad",
+    "PNB": "Delhi",
+    "PUNB": "Delhi",
+    "CANARA": "Bangalore",
+    "CNRB": "Bangalore",
+    "IOB": "Chennai",
+    "IOBA": "Chennai",
+    "IDIB": "Chennai",
+    "UCO": "Kolkata",
+    "UCBA": "Kolkata",
+    "INDB": "Pune",
+}
+
+# Exact branch code -> (lat, lon); filled by register_branch_coords()
+BRANCH_COORDS: dict[str, tuple[float, float]] = {}
+
+# Jitter around a city centre (approx 1-5 km radius)
+_GEO_JITTER_DEG = 0.05
+
+# Hash key seeding city choice and jitter (pd.util.hash_array needs 16 chars)
+_GEO_HASH_KEY = "sar-geo-enrich01"
+
+# Columns _geo_coords() reads
+_GEO_FIELDS = ("branch_code", "sender_account", "sender", "txn_id", "lat", "lon")
+
+_CITY_NAMES = list(INDIAN_CITIES_COORDS)
+_CITY_LAT = np.array([INDIAN_CITIES_COORDS[c][0] for c in _CITY_NAMES])
+_CITY_LON = np.array([INDIAN_CITIES_COORDS[c][1] for c in _CITY_NAMES])
+_PREFIX_INDEX = pd.Index(list(ACCOUNT_PREFIX_CITIES))
+_PREFIX_CITY = np.array([_CITY_NAMES.index(c) for c in ACCOUNT_PREFIX_CITIES.values()])
+
+
+def register_branch_coords(mapping: dict[str, tuple[float, float]]):
+    """Add exact (lat, lon) locations for branch codes, e.g. an IFSC directory."""
+    BRANCH_COORDS.update({str(code).strip().upper(): coords for code, coords in mapping.items()})
+
+
+def _bank_codes(values: np.ndarray) -> np.ndarray:
+    """Upper-cased leading letters of each string ("HDFC-1001" -> "HDFC").
+
+    Works on the fixed-width code points instead of a per-string regex;
+    runs longer than any key of ACCOUNT_PREFIX_CITIES come back empty.
+    """
+    width = max(len(p) for p in ACCOUNT_PREFIX_CITIES) + 1
+    chars = np.asarray(values, dtype=f"U{width}").view(np.uint32).reshape(-1, width).copy()
+    folded = chars | 0x20
+    letters = (folded >= ord("a")) & (folded <= ord("z"))
+    # Length of the leading run of letters (a full-width run is too long)
+    run = np.where(letters.all(axis=1), 0, letters.argmin(axis=1))
+    chars[np.arange(width) >= run[:, None]] = 0
+    chars[letters] &= ~np.uint32(0x20)
+    return chars.reshape(-1).view(f"U{width}").astype(object)
+
+
+def _geo_coords(frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Resolve lat/lon for every row of a normalized frame in bulk.
+
+    Rows that already carry coordinates keep them. Otherwise, in order:
+    an exact BRANCH_COORDS hit on branch_code; the city of the bank code
+    that branch_code or sender_account starts with (e.g. "HDFC-1001");
+    failing both, a city picked by hash. The last two get a jitter derived
+    from the same hash, so a re-upload places every row at the same spot.
+    """
+    n = len(frame)
+
+    def numeric(name):
+        if name not in frame.columns:
+            return np.full(n, np.nan)
+        return pd.to_numeric(frame[name].reset_index(drop=True), errors="coerce").to_numpy(np.float64, copy=True)
+
+    lat, lon = numeric("lat"), numeric("lon")
+    todo = np.isnan(lat) | np.isnan(lon)
+    if not todo.any():
+        return lat, lon
+
+    # Stable per-row key: the most specific identifier the row has
+    key = np.full(n, "", dtype=object)
+    filled = np.zeros(n, dtype=bool)
+    has_branch = has_account = filled
+    for name in ("branch_code", "sender_account", "sender", "txn_id"):
+        if name in frame.columns and not filled.all():
+            values = frame[name].fillna("").astype(str).to_numpy(dtype=object)
+            take = ~filled & (values != "")
+            key[take] = values[take]
+            filled = filled | take
+        if name == "branch_code":
+            has_branch = filled
+        elif name == "sender_account":
+            has_account = filled
+
+    # Work on distinct keys; a case has far fewer accounts than transactions
+    codes, uniques = pd.factorize(key)
+    uniques = np.asarray(uniques, dtype=object)
+    h = pd.util.hash_array(uniques, hash_key=_GEO_HASH_KEY, categorize=False)[codes]
+
+    # Bank code -> city, else a hashed city
+    pos = _PREFIX_INDEX.get_indexer(_bank_codes(uniques))[codes]
+    pos[~has_account] = -1
+    city = np.where(pos >= 0, _PREFIX_CITY[pos], (h % len(_CITY_NAMES)).astype(np.intp))
+
+    # Two independent 20-bit fractions of the hash -> jitter in [-1, 1]
+    u_lat = ((h >> np.uint64(12)) & np.uint64(0xFFFFF)) / 0xFFFFF * 2 - 1
+    u_lon = ((h >> np.uint64(40)) & np.uint64(0xFFFFF)) / 0xFFFFF * 2 - 1
+    new_lat = _CITY_LAT[city] + u_lat * _GEO_JITTER_DEG
+    new_lon = _CITY_LON[city] + u_lon * _GEO_JITTER_DEG
+
+    if BRANCH_COORDS:
+        directory = pd.Index(list(BRANCH_COORDS))
+        hit = directory.get_indexer(pd.Series(uniques).str.strip().str.upper())[codes]
+        known = (hit >= 0) & has_branch
+        coords = np.array(list(BRANCH_COORDS.values()), dtype=np.float64)
+        new_lat[known] = coords[hit[known], 0]
+        new_lon[known] = coords[hit[known], 1]
+
+    lat[todo] = new_lat[todo]
+    lon[todo] = new_lon[todo]
     return lat, lon
 
+
+def _enrich_records(records: list[dict]):
+    """Set "lat"/"lon" on transaction dicts in place via _geo_coords()."""
+    if not records:
+        return
+    frame = pd.DataFrame({f: [rec.get(f) for rec in records] for f in _GEO_FIELDS})
+    lat, lon = _geo_coords(frame)
+    for rec, rec_lat, rec_lon in zip(records, lat.tolist(), lon.tolist()):
+        rec["lat"] = rec_lat
+        rec["lon"] = rec_lon
+
 # ---------------------------------------------------------------------------
 #  Public API
 # ---------------------------------------------------------------------------
 
-def parse_csv(file_content: bytes, filename: str) -> dict:
+def _is_path(source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def _csv_source(source) -> tuple:
+    """read_csv() arguments for bytes, a path (memory-mapped) or a file object."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), {}
+    if _is_path(source):
+        return os.fspath(source), {"memory_map": True}
+    return source, {}
+
+
+def _read_csv(source, **kwargs):
+    """pd.read_csv() on bytes, a path (memory-mapped) or a file object."""
+    path_or_buf, options = _csv_source(source)
+    return pd.read_csv(path_or_buf, **options, **kwargs)
+
+
+def _prepare_inferred(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """Normalize a frame whose dtypes pandas inferred (the unknown-header path)."""
+    df.columns = columns
+
+    # Handle missing values
+    df = df.fillna("")
+
+    # Convert amount to numeric
+    if "amount" in df.columns:
+        df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+
+    # Blank coordinates are left to geo-enrichment
+    for field in ("lat", "lon"):
+        if field in df.columns:
+            df[field] = pd.to_numeric(df[field], errors="coerce")
+    return df
+
+
+def parse_csv(
+    file_content: bytes, filename: str, profile: Optional[SchemaProfile] = None,
+) -> dict:
     """
     Parse uploaded CSV file into normalized case data format.
 
+    Known feeds (header fingerprint in the schema profile registry) are
+    read with the profile's exact dtypes and columns; unknown headers go
+    through pandas inference and a profile is learned for next time.
+
     Args:
-        file_content: Raw bytes of the uploaded file
+        file_content: Raw bytes of the uploaded file, or a path to it on
+            disk (read through a memory map)
         filename: Name of the uploaded file
+        profile: Parse plan to use instead of looking one up by header
 
     Returns:
         Dict matching the CaseData integration contract:
@@ -187,37 +761,298 @@ def parse_csv(file_content: bytes, filename: str) -> dict:
             "transactions": [...],
             "customer": { "name": ..., "account_id": ..., ... }
         }
+        plus "customer_stats", the CustomerAccumulator behind "customer"
+        (kept by the API so appended transactions update it incrementally),
+        "txn_ids_missing", the number of rows given a generated txn_id, and
+        "ingest_stats" as in parse_csv_stream() (the whole file is one chunk).
+    """
+    started = time.perf_counter()
+    header = _read_csv_header(file_content)
+    if profile is None and header:
+        profile = get_schema_profile(header)
+
+    df = None
+    if profile is not None:
+        try:
+            df = profile.prepare(_read_csv(file_content, **profile.read_options()))
+        except (ValueError, TypeError) as e:
+            print(f"[WARN] {filename} does not fit schema profile {profile.name}: {e}; "
+                  f"falling back to dtype inference")
+            profile = None
+
+    if df is None:
+        try:
+            df = _read_csv(file_content)
+        except Exception as e:
+            return {"error": f"Failed to read CSV: {e}"}
+        if not df.empty:
+            raw_dtypes = df.dtypes
+            df = _prepare_inferred(df, _resolve_columns(df.columns))
+            _learn_schema_profile(header, raw_dtypes, _numeric_upcast(df))
+
+    if df.empty:
+        return {"error": "CSV file is empty"}
+
+    # Build output
+    transactions = _build_transactions(
+        df,
+        defaults=profile.defaults if profile else None,
+        upcast=profile.upcast if profile else _numeric_upcast(df),
+    )
+    customer_acc = CustomerAccumulator()
+    customer_acc.update(df)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "case_id": _case_id_from_filename(filename),
+        "transactions": transactions,
+        "customer": customer_acc.result(),
+        "customer_stats": customer_acc,
+        "txn_ids_missing": 0 if "txn_id" in df.columns else len(df),
+        "ingest_stats": {
+            "rows": len(df),
+            "chunks": 1,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(len(df) / elapsed, 1) if elapsed > 0 else float(len(df)),
+            "schema_profile": profile.name if profile else None,
+        },
+    }
+
+
+def parse_csv_stream(
+    source,
+    filename: str,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    on_batch: Optional[Callable[[list[dict]], None]] = None,
+    profile: Optional[SchemaProfile] = None,
+) -> dict:
     """
+    Parse a CSV in bounded-size chunks instead of loading it whole.
+
+    Columns are normalized once from the header (or taken from the schema
+    profile for a known feed); each chunk is converted to transactions and
+    folded into the customer detection before the next one is read, so the
+    parser's working set is one chunk regardless of file size.
+
+    If a chunk doesn't fit the profile's dtypes, the remaining rows are
+    re-read with dtype inference; chunks already handed off are kept.
+
+    Args:
+        source: Raw bytes, a file path (memory-mapped) or a binary file-like object
+        filename: Name of the uploaded file
+        chunk_rows: Rows per chunk
+        on_batch: Optional sink called with each chunk's transactions. When
+            given, transactions are handed off instead of being collected and
+            the returned "transactions" list is empty.
+        profile: Parse plan to use instead of looking one up by header
+
+    Returns:
+        Same shape as parse_csv(), plus "ingest_stats" with the row count,
+        chunk count, elapsed seconds, rows/sec throughput and the schema
+        profile used (None when dtypes were inferred).
+    """
+    started = time.perf_counter()
+    transactions: list[dict] = []
+    customer_acc = CustomerAccumulator()
+    columns: Optional[list[str]] = None
+    n_rows = 0
+    n_chunks = 0
+    n_generated_ids = 0
+
+    header = _read_csv_header(source)
+    if profile is None and header:
+        profile = get_schema_profile(header)
+    used_profile = profile
+
+    upcast = None
+
+    def consume(reader, plan: Optional[SchemaProfile]):
+        nonlocal columns, upcast, n_rows, n_chunks, n_generated_ids
+        for chunk in reader:
+            if plan is not None:
+                chunk = plan.prepare(chunk)
+            else:
+                # Resolve aliases and the upcast once from the first chunk,
+                # then reuse them for every chunk (as the learned profile does)
+                raw_dtypes = chunk.dtypes
+                learn = columns is None
+                if learn:
+                    columns = _resolve_columns(chunk.columns)
+                chunk = _prepare_inferred(chunk, columns)
+                if learn:
+                    upcast = _numeric_upcast(chunk)
+                    _learn_schema_profile(header, raw_dtypes, upcast)
+
+            batch = _build_transactions(
+                chunk, start=n_rows, defaults=plan.defaults if plan else None,
+                upcast=plan.upcast if plan else upcast,
+            )
+            customer_acc.update(chunk)
+            if on_batch is not None:
+                on_batch(batch)
+            else:
+                transactions.extend(batch)
+
+            if "txn_id" not in chunk.columns:
+                n_generated_ids += len(chunk)
+            n_rows += len(chunk)
+            n_chunks += 1
+
     try:
-        df = pd.read_csv(io.BytesIO(file_content))
+        if profile is not None:
+            try:
+                consume(_read_csv(source, chunksize=chunk_rows, **profile.read_options()), profile)
+            except (ValueError, TypeError) as e:
+                print(f"[WARN] {filename} does not fit schema profile {profile.name}: {e}; "
+                      f"falling back to dtype inference from row {n_rows}")
+                used_profile = None
+                done = n_rows
+                consume(
+                    _read_csv(source, chunksize=chunk_rows, skiprows=lambda i: 0 < i <= done),
+                    None,
+                )
+        else:
+            consume(_read_csv(source, chunksize=chunk_rows), None)
     except Exception as e:
         return {"error": f"Failed to read CSV: {e}"}
 
-    if df.empty:
+    if n_rows == 0:
         return {"error": "CSV file is empty"}
 
-    # Normalize column names
-    df = _normalize_columns(df)
+    elapsed = time.perf_counter() - started
+    return {
+        "case_id": _case_id_from_filename(filename),
+        "transactions": transactions,
+        "customer": customer_acc.result(),
+        "customer_stats": customer_acc,
+        "txn_ids_missing": n_generated_ids,
+        "ingest_stats": {
+            "rows": n_rows,
+            "chunks": n_chunks,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(n_rows / elapsed, 1) if elapsed > 0 else float(n_rows),
+            "schema_profile": used_profile.name if used_profile else None,
+        },
+    }
 
-    # Handle missing values
-    df = df.fillna("")
 
-    # Convert amount to numeric
-    if "amount" in df.columns:
-        df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+def _case_id_from_filename(filename: str) -> str:
+    """Generate a case_id from the uploaded filename."""
+    base_name = re.sub(r"[^a-zA-Z0-9]", "_", os.path.splitext(filename)[0]).upper()
+    return f"CASE-{base_name[:8]}"
 
-    # Build output
-    transactions = _build_transactions(df)
-    customer = _detect_customer(df)
 
-    # Generate a case_id from filename
-    base_name = re.sub(r"[^a-zA-Z0-9]", "_", filename.replace(".csv", "")).upper()
-    case_id = f"CASE-{base_name[:8]}"
+def _detect_customer_from_table(table, receiver_accounts=None) -> dict:
+    """_detect_customer() computed from a TransactionTable's receiver codes.
+
+    Ties on receiver count resolve to the receiver seen first, as with
+    value_counts() in the DataFrame version.
+    """
+    customer = {
+        "name": "Unknown",
+        "account_id": "Unknown",
+        "kyc_status": "verified",
+        "business_type": None,
+        "avg_monthly_volume": 0,
+    }
+    if len(table) == 0:
+        return customer
+
+    codes = table.receiver_codes
+    n_entities = len(table.entities)
+    counts = np.bincount(codes, minlength=n_entities)
+    first_row = np.full(n_entities, len(codes), dtype=np.int64)
+    np.minimum.at(first_row, codes, np.arange(len(codes)))
+
+    candidates = np.flatnonzero(counts == counts.max())
+    primary = int(candidates[np.argmin(first_row[candidates])])
+    customer["name"] = str(table.entities[primary])
+
+    if receiver_accounts is not None:
+        acct = receiver_accounts[int(first_row[primary])].as_py()
+        customer["account_id"] = "" if acct is None else str(acct)
+
+    incoming = np.bincount(codes, weights=table.amounts, minlength=n_entities)
+    customer["avg_monthly_volume"] = round(float(incoming[primary]), 2)
+    return customer
+
+
+def _open_arrow_source(source):
+    """Wrap bytes zero-copy, or memory-map a file that is already on disk."""
+    import pyarrow as pa
+
+    if _is_path(source):
+        return pa.memory_map(os.fspath(source), "r")
+    return pa.BufferReader(pa.py_buffer(source))
+
+
+def parse_arrow(source, filename: str) -> dict:
+    """
+    Parse a Parquet or Arrow IPC (Feather v2) upload.
+
+    Columns are renamed through _COLUMN_ALIASES on the Arrow table and
+    encoded straight into a TransactionTable, without materializing
+    per-row Python objects. Files already on disk are memory-mapped.
+
+    Args:
+        source: Raw bytes, or a path to the spooled file
+        filename: Name of the uploaded file (extension selects the reader)
+
+    Returns:
+        Same shape as parse_csv(), with "transactions" as a TransactionTable.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
 
+    from app.utils.case_store import TransactionTable
+
+    started = time.perf_counter()
+    fmt = _ARROW_FORMATS[os.path.splitext(filename)[1].lower()]
+    try:
+        with _open_arrow_source(source) as stream:
+            if fmt == "parquet":
+                table = pq.read_table(stream)
+            else:
+                try:
+                    table = pa.ipc.open_file(stream).read_all()
+                except pa.ArrowInvalid:
+                    # Not the random-access file format; try the streaming one
+                    stream.seek(0)
+                    table = pa.ipc.open_stream(stream).read_all()
+    except Exception as e:
+        return {"error": f"Failed to read {fmt} file: {e}"}
+
+    if table.num_rows == 0:
+        return {"error": f"{fmt} file is empty"}
+
+    table = table.rename_columns(_resolve_columns(table.column_names))
+    transactions = TransactionTable.from_arrow(table)
+    geo = table.select([f for f in _GEO_FIELDS if f in table.column_names]).to_pandas()
+    if geo.empty:
+        geo = pd.DataFrame(index=range(table.num_rows))
+    transactions.extras["lat"], transactions.extras["lon"] = _geo_coords(geo)
+
+    if "receiver" in table.column_names:
+        accounts = table.column("receiver_account") if "receiver_account" in table.column_names else None
+        customer = _detect_customer_from_table(transactions, accounts)
+    else:
+        customer = _detect_customer(pd.DataFrame())
+    customer_stats = CustomerAccumulator.from_table(transactions, customer)
+
+    elapsed = time.perf_counter() - started
     return {
-        "case_id": case_id,
+        "case_id": _case_id_from_filename(filename),
         "transactions": transactions,
         "customer": customer,
+        "customer_stats": customer_stats,
+        "txn_ids_missing": 0 if "txn_id" in table.column_names else table.num_rows,
+        "ingest_stats": {
+            "rows": table.num_rows,
+            "chunks": 1,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(table.num_rows / elapsed, 1) if elapsed > 0 else float(table.num_rows),
+        },
     }
 
 
@@ -228,20 +1063,309 @@ def parse_json(file_content: bytes, filename: str = "") -> dict:
         # Validate structure...
         # Inject coords if missing
         if "transactions" in data:
-            for txn in data["transactions"]:
-                if "lat" not in txn:
-                    lat, lon = _get_random_coords()
-                    txn["lat"] = lat
-                    txn["lon"] = lon
+            _enrich_records(data["transactions"])
         return data
     except Exception as e:
         return {"error": f"Invalid JSON: {e}"}
 
-def parse_file(file_content: bytes, filename: str) -> dict:
-    """Dispatcher."""
-    if filename.endswith(".csv"):
-        return parse_csv(file_content, filename)
-    elif filename.endswith(".json"):
-        return parse_json(file_content, filename)
+class _JsonStream:
+    """Pull-based reader over a JSON text source, decoding one value at a time.
+
+    Only the unread tail of the current read is buffered, so a document can
+    be walked without holding its raw bytes, decoded text or full object
+    tree in memory.
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, fileobj, read_size: int = _JSON_READ_SIZE):
+        self._file = fileobj
+        self._read_size = read_size
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next read to the buffer, dropping the consumed prefix."""
+        if self.eof:
+            return False
+        data = self._file.read(self._read_size)
+        self.buf = self.buf[self.pos:] + self._utf8.decode(data, final=not data)
+        self.pos = 0
+        self.eof = not data
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, chars: str) -> str:
+        """Consume one structural character, which must be one of ``chars``."""
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"expected one of {chars!r} at offset {self.pos}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next read
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _normalize_records(records: list[dict]) -> list[dict]:
+    """Rename record keys through _COLUMN_ALIASES (no-op for canonical keys)."""
+    keys = list(dict.fromkeys(k for rec in records for k in rec))
+    mapping = {k: c for k, c in zip(keys, _resolve_columns(keys)) if k != c}
+    if not mapping:
+        return records
+    return [{mapping.get(k, k): v for k, v in rec.items()} for rec in records]
+
+
+def _customer_frame(records: list[dict]) -> pd.DataFrame:
+    """The columns CustomerAccumulator needs, cleaned like parse_csv() does."""
+    df = pd.DataFrame.from_records(records)
+    df = df[[c for c in ("receiver", "receiver_account", "amount") if c in df.columns]].fillna("")
+    if "amount" in df.columns:
+        df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+    return df
+
+
+def _iter_json_document(stream: _JsonStream, doc: dict, batch_size: int):
+    """Yield transaction batches from a {"customer":..., "transactions":[...]}
+    document (or a bare top-level array); other top-level keys land in ``doc``."""
+    batch: list[dict] = []
+
+    def array_items():
+        stream.expect("[")
+        if stream.peek() == "]":
+            stream.expect("]")
+            return
+        while True:
+            yield stream.value()
+            if stream.expect(",]") == "]":
+                return
+
+    if stream.peek() == "[":
+        for txn in array_items():
+            batch.append(txn)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    else:
+        stream.expect("{")
+        if stream.peek() == "}":
+            stream.expect("}")
+        else:
+            while True:
+                key = stream.value()
+                stream.expect(":")
+                if key == "transactions" and stream.peek() == "[":
+                    for txn in array_items():
+                        batch.append(txn)
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+                else:
+                    doc[key] = stream.value()
+                if stream.expect(",}") == "}":
+                    break
+
+    if stream.peek():
+        raise ValueError(f"unexpected data after the JSON document at offset {stream.pos}")
+    if batch:
+        yield batch
+
+
+def _iter_ndjson(fileobj, doc: dict, batch_size: int):
+    """Yield transaction batches from newline-delimited JSON.
+
+    A line holding only {"customer": {...}} sets the customer instead of
+    being read as a transaction.
+    """
+    batch: list[dict] = []
+    # readline() works the same on files, BytesIO and mmap objects
+    for line in iter(fileobj.readline, b""):
+        line = line.strip()
+        if not line:
+            continue
+        obj = json.loads(line)
+        if isinstance(obj, dict) and set(obj) == {"customer"}:
+            doc["customer"] = obj["customer"]
+            continue
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_json_stream(
+    source,
+    filename: str = "",
+    batch_size: int = JSON_BATCH_SIZE,
+    on_batch: Optional[Callable[[list[dict]], None]] = None,
+) -> dict:
+    """
+    Parse a JSON case document or NDJSON feed incrementally.
+
+    Transactions are decoded one at a time and handed on in batches of
+    ``batch_size``, so peak memory is one read buffer plus one batch, not
+    the whole document. ``.ndjson``/``.jsonl`` files are read line by line;
+    anything else is treated as a {"customer":..., "transactions":[...]}
+    document (a bare top-level array of transactions also works).
+
+    Args:
+        source: Raw bytes, a file path (memory-mapped) or a binary file-like object
+        filename: Name of the uploaded file
+        batch_size: Transactions per batch
+        on_batch: Optional sink for each batch (e.g. a TransactionTableBuilder).
+            When given, the returned "transactions" list is empty.
+
+    Returns:
+        The document's top-level keys with "transactions" and "customer"
+        (detected from receivers when the document has none, in which case
+        "customer_stats" is included too), plus "ingest_stats" and
+        "txn_ids_missing" (transactions without a txn_id).
+    """
+    started = time.perf_counter()
+    doc: dict = {}
+    transactions: list[dict] = []
+    customer_acc = CustomerAccumulator()
+    n_rows = 0
+    n_batches = 0
+    n_missing_ids = 0
+
+    mapped = None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        fileobj = io.BytesIO(source)
+    elif _is_path(source):
+        # Read spooled uploads through a memory map instead of heap buffers
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return {"error": "Invalid JSON: file is empty"}
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        fileobj = mapped
+    else:
+        fileobj = source
+
+    try:
+        if filename.lower().endswith(_NDJSON_EXTENSIONS):
+            batches = _iter_ndjson(fileobj, doc, batch_size)
+        else:
+            batches = _iter_json_document(_JsonStream(fileobj), doc, batch_size)
+
+        for batch in batches:
+            batch = _normalize_records(batch)
+            # Inject coords if missing
+            _enrich_records(batch)
+            customer_acc.update(_customer_frame(batch))
+            n_missing_ids += sum(1 for txn in batch if txn.get("txn_id") in (None, ""))
+            if on_batch is not None:
+                on_batch(batch)
+            else:
+                transactions.extend(batch)
+            n_rows += len(batch)
+            n_batches += 1
+    except Exception as e:
+        return {"error": f"Invalid JSON: {e}"}
+    finally:
+        if mapped is not None:
+            mapped.close()
+
+    if not isinstance(doc.get("customer"), dict):
+        doc["customer"] = customer_acc.result()
+        doc["customer_stats"] = customer_acc
+
+    elapsed = time.perf_counter() - started
+    doc["transactions"] = transactions
+    doc["txn_ids_missing"] = n_missing_ids
+    doc["ingest_stats"] = {
+        "rows": n_rows,
+        "chunks": n_batches,
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(n_rows / elapsed, 1) if elapsed > 0 else float(n_rows),
+    }
+    return doc
+
+
+def parse_file(
+    file_content,
+    filename: str,
+    on_batch: Optional[Callable[[list[dict]], None]] = None,
+    profile: Optional[SchemaProfile] = None,
+) -> dict:
+    """Dispatcher.
+
+    ``file_content`` is the raw upload bytes or a path to a file on disk
+    (e.g. a spooled upload), which every format reads through a memory map.
+
+    Large CSV uploads (over STREAMING_THRESHOLD_BYTES) go through the chunked
+    parse_csv_stream() path; smaller ones are parsed in one go. JSON and
+    NDJSON are always decoded incrementally by parse_json_stream().
+
+    When ``on_batch`` is given every format hands its transactions to it
+    (in one or more batches) and returns an empty "transactions" list.
+    ``profile`` is an already-matched CSV schema profile (see
+    match_schema_profile()); CSVs are matched by header when it's None.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in _ARROW_FORMATS:
+        result = parse_arrow(file_content, filename)
+    elif ext == ".json" or ext in _NDJSON_EXTENSIONS:
+        return parse_json_stream(file_content, filename, on_batch=on_batch)
+    elif ext == ".csv":
+        size = os.path.getsize(file_content) if _is_path(file_content) else len(file_content)
+        if size == 0:
+            # mmap cannot map an empty file; report it like pandas would
+            return {"error": "CSV file is empty"}
+        if size > STREAMING_THRESHOLD_BYTES:
+            return parse_csv_stream(file_content, filename, on_batch=on_batch, profile=profile)
+        result = parse_csv(file_content, filename, profile=profile)
     else:
         return {"error": "Unsupported file format"}
+
+    if on_batch is not None and "error" not in result:
+        on_batch(result.get("transactions", []))
+        result["transactions"] = []
+    return result
+
+
+def parse_file_columnar(file_content, filename: str) -> dict:
+    """
+    parse_file() straight into a TransactionTable, with timing.
+
+    This is the unit of work for the upload endpoints (and the batch
+    upload's process pool, so it must stay a picklable top-level function).
+
+    Returns:
+        parse_file()'s dict with "transactions" as a TransactionTable and
+        "parse_seconds" added, or {"error": ...}.
+    """
+    from app.utils.case_store import TransactionTableBuilder
+
+    started = time.perf_counter()
+    profile = match_schema_profile(file_content, filename)
+    builder = TransactionTableBuilder()
+    parsed = parse_file(file_content, filename, on_batch=builder.append, profile=profile)
+    if "error" not in parsed:
+        parsed["transactions"] = builder.build()
+    parsed["parse_seconds"] = round(time.perf_counter() - started, 4)
+    return parsed
@@ -0,0 +1,99 @@
+"""
+Benchmark: list-of-dicts vs columnar TransactionTable case storage.
+
+Reports resident memory per million transactions and the scan time of
+extract_features() and build_transaction_network() for both layouts.
+
+Usage:
+    cd backend
+    python benchmarks/bench_case_store.py                # 1M transactions
+    python benchmarks/bench_case_store.py --rows 200000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Add backend and project root to path
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+sys.path.append(os.path.dirname(BACKEND))
+
+from app.utils.case_store import TransactionTable
+from app.utils.graph_generator import build_transaction_network
+from ml_models.typology_classifier import extract_features
+
+
+def _make_transactions(n: int, seed: int = 42) -> list[dict]:
+    """Synthetic parser output: 2k entities, 4 payment types, 90 days."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Entity {i}" for i in range(2000)])
+    ts = pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 90 * 86400, n), unit="s")
+    senders = names[rng.integers(0, len(names), n)].tolist()
+    receivers = names[rng.integers(0, len(names), n)].tolist()
+    amounts = rng.uniform(1000, 500000, n).round(2).tolist()
+    types = np.array(["NEFT", "RTGS", "IMPS", "UPI"])[rng.integers(0, 4, n)].tolist()
+    stamps = ts.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    return [
+        {
+            "txn_id": f"TXN-{i+1:07d}",
+            "sender": senders[i],
+            "receiver": receivers[i],
+            "amount": amounts[i],
+            "currency": "INR",
+            "timestamp": stamps[i],
+            "type": types[i],
+        }
+        for i in range(n)
+    ]
+
+
+def _retained(build) -> tuple[object, int]:
+    """Return build()'s result and the bytes it still holds once built."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def _best_of(fn, arg, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.rows
+    per_million = 1_000_000 / n
+
+    records, list_bytes = _retained(lambda: _make_transactions(n))
+    table, table_bytes = _retained(lambda: TransactionTable.from_records(records))
+
+    print(f"Transactions: {n:,d}")
+    print(f"  memory / 1M txns   list-of-dicts {list_bytes * per_million / 2**20:8.1f} MiB"
+          f"   table {table_bytes * per_million / 2**20:8.1f} MiB"
+          f"   ({list_bytes / table_bytes:.1f}x smaller)")
+
+    for name, fn in [("extract_features", extract_features),
+                     ("build_transaction_network", build_transaction_network)]:
+        t_list = _best_of(fn, records)
+        t_table = _best_of(fn, table)
+        print(f"  {name:26s} list {t_list:7.3f}s   table {t_table:7.3f}s   ({t_list / t_table:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
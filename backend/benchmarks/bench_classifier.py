@@ -0,0 +1,112 @@
+"""
+Benchmark: typology scoring throughput at different batch sizes.
+
+Scores the same synthetic cases with TypologyClassifier.predict_batch() in
+batches of 1, 100 and 10,000 cases, reports cases/sec for each (end to end,
+for inference alone on pre-extracted features, and for a bare predict_proba()
+without per-case top_features, with the attribution overhead) and checks
+every per-case result matches TypologyClassifier.predict().
+
+Requires a trained model (python ml_models/typology_classifier.py).
+
+Usage:
+    cd backend
+    python benchmarks/bench_classifier.py                    # 10k cases
+    python benchmarks/bench_classifier.py --cases 2000 --batch-sizes 1 50 2000
+    python benchmarks/bench_classifier.py --exact-contribs   # exact TreeSHAP top_features
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add backend and project root to path
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+sys.path.append(os.path.dirname(BACKEND))
+
+from ml_models.typology_classifier import FEATURE_NAMES, TypologyClassifier, extract_features
+
+
+def _make_cases(n_cases: int, seed: int = 42) -> list[list[dict]]:
+    """Synthetic alerts of 5-60 transactions among a few dozen parties."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Entity {i}" for i in range(40)])
+    types = np.array(["NEFT", "RTGS", "IMPS", "UPI"])
+    cases = []
+    for c in range(n_cases):
+        n = int(rng.integers(5, 61))
+        ts = pd.Timestamp("2026-01-01") + pd.to_timedelta(
+            np.sort(rng.integers(0, 30 * 86400, n)), unit="s",
+        )
+        cases.append([
+            {
+                "txn_id": f"TXN-{c}-{i}",
+                "sender": str(s),
+                "receiver": str(r),
+                "amount": float(a),
+                "currency": "INR",
+                "timestamp": t,
+                "type": str(k),
+            }
+            for i, (s, r, a, t, k) in enumerate(zip(
+                names[rng.integers(0, 40, n)],
+                names[rng.integers(0, 5, n)],
+                rng.uniform(5000, 2_000_000, n).round(2),
+                ts.strftime("%Y-%m-%dT%H:%M:%S"),
+                types[rng.integers(0, 4, n)],
+            ))
+        ])
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", type=int, default=10_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--exact-contribs", action="store_true")
+    args = parser.parse_args()
+
+    clf = TypologyClassifier(approx_contribs=not args.exact_contribs)
+    clf.load_model()
+    cases = _make_cases(args.cases)
+
+    # Reference: the single-case API, one call per case
+    expected = [clf.predict(txns) for txns in cases]
+
+    features = [extract_features(txns) for txns in cases]
+    X = np.array([[f[k] for k in FEATURE_NAMES] for f in features])
+
+    print(f"Cases: {len(cases):,d}")
+    print(f"{'batch':>8s}  {'end-to-end/s':>13s}  {'inference/s':>12s}  "
+          f"{'plain/s':>10s}  {'overhead':>8s}  identical")
+    for batch in args.batch_sizes:
+        results = []
+        start = time.perf_counter()
+        for i in range(0, len(cases), batch):
+            results.extend(clf.predict_batch(cases[i:i + batch]))
+        end_to_end = time.perf_counter() - start
+
+        scored = []
+        start = time.perf_counter()
+        for i in range(0, len(features), batch):
+            scored.extend(clf.predict_features_batch(features[i:i + batch]))
+        inference = time.perf_counter() - start
+
+        # Plain predict_proba(): no contributions, no result dicts
+        start = time.perf_counter()
+        for i in range(0, len(X), batch):
+            clf.forest.predict_proba(X[i:i + batch])
+        plain = time.perf_counter() - start
+
+        identical = results == expected and scored == expected
+        print(f"{batch:>8,d}  {len(cases) / end_to_end:>13,.0f}  "
+              f"{len(cases) / inference:>12,.0f}  {len(cases) / plain:>10,.0f}  "
+              f"{inference / plain:>7.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark: per-call ChatOllama chains vs LLMEngine's pooled, prebuilt chains.
+
+Runs a local stub of Ollama's /api/chat (streamed NDJSON, keep-alive) so
+only client-side overhead is measured: building the model client, prompt
+and chain, and opening HTTP connections. Reports per-request latency for
+sequential calls, wall time for concurrent batches and how many TCP
+connections each variant opened.
+
+Usage:
+    cd backend
+    python benchmarks/bench_llm_client.py                     # 300 calls, 16 concurrent
+    python benchmarks/bench_llm_client.py --calls 1000 --concurrency 64 --latency-ms 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+# Add backend and project root to path
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+sys.path.append(os.path.dirname(BACKEND))
+
+from app.core.llm_engine import LLMEngine, SAR_SYSTEM_PROMPT
+
+_REPLY = "### INTRODUCTION\nStub.\n### BODY\nStub.\n### CONCLUSION\nStub."
+
+
+# --------------------------------------------------------------------------- #
+#  Stub Ollama server
+# --------------------------------------------------------------------------- #
+
+class StubOllama:
+    """Minimal HTTP/1.1 /api/chat server on its own thread and event loop."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1e3
+        self.connections = 0
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.port = sock.getsockname()[1]
+        self._loop.run_until_complete(asyncio.start_server(self._handle, sock=sock, backlog=512))
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                body = json.loads(await reader.readexactly(length)) if length else {}
+                await self._work(body)
+                payload = self._reply(body.get("model", "stub"))
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _work(self, body: dict):
+        """Simulated model time for one request."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    @staticmethod
+    def _reply(model: str) -> bytes:
+        chunk = {"model": model, "created_at": "2026-01-01T00:00:00Z",
+                 "message": {"role": "assistant", "content": _REPLY}, "done": False}
+        done = {"model": model, "created_at": "2026-01-01T00:00:00Z",
+                "message": {"role": "assistant", "content": ""}, "done": True,
+                "done_reason": "stop", "total_duration": 1, "load_duration": 1,
+                "prompt_eval_count": 1, "prompt_eval_duration": 1,
+                "eval_count": 1, "eval_duration": 1}
+        return (json.dumps(chunk) + "\n" + json.dumps(done) + "\n").encode()
+
+
+# --------------------------------------------------------------------------- #
+#  Variants
+# --------------------------------------------------------------------------- #
+
+async def per_call(base_url: str, user: str) -> str:
+    """What generate_sar() did before: a new client, prompt and chain per request."""
+    from langchain_ollama import ChatOllama
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    llm = ChatOllama(model="llama3.1:8b", base_url=base_url, temperature=0.2, keep_alive="5m")
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "{system_message_content}"),
+        ("user", "{user_message_content}"),
+    ])
+    chain = prompt | llm | StrOutputParser()
+    return await chain.ainvoke({"system_message_content": SAR_SYSTEM_PROMPT,
+                                "user_message_content": user})
+
+
+def pooled(engine: LLMEngine):
+    async def call(base_url: str, user: str) -> str:
+        return await engine.sar_chain.ainvoke({"system_content": engine.system_prompt,
+                                               "user_content": user})
+    return call
+
+
+async def _measure(call, base_url: str, stub: StubOllama, calls: int, concurrency: int) -> dict:
+    user = "Generate a SAR for case CASE-0001 with 12 transactions."
+    for _ in range(5):   # warm-up (imports, first connection)
+        await call(base_url, user)
+
+    before = stub.connections
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        text = await call(base_url, user)
+        latencies.append(time.perf_counter() - start)
+    assert text == _REPLY
+    sequential_connections = stub.connections - before
+
+    before = stub.connections
+    sem = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with sem:
+            await call(base_url, user)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(calls)))
+    concurrent_seconds = time.perf_counter() - start
+    return {
+        "median_ms": statistics.median(latencies) * 1e3,
+        "p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1e3,
+        "seq_connections": sequential_connections,
+        "concurrent_rps": calls / concurrent_seconds,
+        "concurrent_connections": stub.connections - before,
+    }
+
+
+async def _run(args):
+    stub = StubOllama(latency_ms=args.latency_ms).start()
+    base_url = f"http://127.0.0.1:{stub.port}"
+    engine = LLMEngine(base_url=base_url, max_connections=args.max_connections)
+
+    rows = {
+        "per-call chain": await _measure(per_call, base_url, stub, args.calls, args.concurrency),
+        "pooled engine": await _measure(pooled(engine), base_url, stub, args.calls, args.concurrency),
+    }
+    await engine.aclose()
+
+    print(f"\n{args.calls} calls, concurrency {args.concurrency}, stub latency "
+          f"{args.latency_ms} ms, pool size {args.max_connections}\n")
+    print(f"{'variant':<16s} {'median ms':>10s} {'p95 ms':>8s} {'conns (seq)':>12s} "
+          f"{'req/s (conc)':>13s} {'conns (conc)':>13s}")
+    for name, r in rows.items():
+        print(f"{name:<16s} {r['median_ms']:>10.3f} {r['p95_ms']:>8.3f} {r['seq_connections']:>12d} "
+              f"{r['concurrent_rps']:>13,.0f} {r['concurrent_connections']:>13d}")
+    saved = rows["per-call chain"]["median_ms"] - rows["pooled engine"]["median_ms"]
+    print(f"\nPer-request overhead saved (median): {saved:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="simulated model time per request on the stub")
+    parser.add_argument("--max-connections", type=int, default=8, help="engine pool size")
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: chat latency during a SAR burst, with and without the LLM scheduler.
+
+A stub Ollama host (see bench_llm_client.py) runs at most --host-parallel
+requests at once, like OLLAMA_NUM_PARALLEL, and queues the rest in arrival
+order; SAR requests take --sar-ms and chat requests --chat-ms. A burst of
+--sars SAR generations is sent, then --chats chat questions shortly after.
+
+  - direct     every call goes straight to the host (the old behaviour)
+  - scheduled  calls go through LLMEngine.scheduler: SAR and chat lanes with
+               their own limits and bounded queues; overflow gets LaneFull (429)
+
+Reports completed / rejected calls and latency percentiles per kind.
+
+Usage:
+    cd backend
+    python benchmarks/bench_llm_scheduler.py                      # 30 SARs + 10 chats
+    python benchmarks/bench_llm_scheduler.py --sars 60 --sar-ms 500 --host-parallel 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add backend and project root to path
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+sys.path.append(os.path.dirname(BACKEND))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_llm_client import StubOllama
+from app.core.llm_engine import LLMEngine, SAR_SYSTEM_PROMPT
+from app.core.llm_scheduler import LaneFull
+from app.core.response_cache import ResponseCache
+
+
+class BusyHost(StubOllama):
+    """Stub host with a fixed number of model slots and per-kind model time."""
+
+    def __init__(self, parallel: int, sar_ms: float, chat_ms: float):
+        super().__init__()
+        self.sar_s = sar_ms / 1e3
+        self.chat_s = chat_ms / 1e3
+        self._slots = asyncio.Semaphore(parallel)
+
+    async def _work(self, body: dict):
+        system = body.get("messages", [{}])[0].get("content", "")
+        async with self._slots:
+            await asyncio.sleep(self.sar_s if system == SAR_SYSTEM_PROMPT else self.chat_s)
+
+
+async def _call(engine: LLMEngine, kind: str, scheduled: bool):
+    """One model call; returns latency in seconds, or None if refused."""
+    chain = engine.sar_chain if kind == "sar" else engine.chat_chain
+    system = engine.system_prompt if kind == "sar" else engine.chat_system_prompt
+    inputs = {"system_content": system, "user_content": f"benchmark {kind} request"}
+    start = time.perf_counter()
+    try:
+        if scheduled:
+            async with engine.scheduler.slot(kind):
+                await chain.ainvoke(inputs)
+        else:
+            await chain.ainvoke(inputs)
+    except LaneFull:
+        return None
+    return time.perf_counter() - start
+
+
+async def _burst(engine: LLMEngine, args, scheduled: bool) -> dict:
+    sars = [asyncio.create_task(_call(engine, "sar", scheduled)) for _ in range(args.sars)]
+    await asyncio.sleep(0.05)
+    chats = [asyncio.create_task(_call(engine, "chat", scheduled)) for _ in range(args.chats)]
+    return {"sar": await asyncio.gather(*sars), "chat": await asyncio.gather(*chats)}
+
+
+def _row(name: str, kind: str, latencies: list) -> str:
+    done = sorted(x for x in latencies if x is not None)
+    if not done:
+        return f"{name:<10s} {kind:<5s} {0:>6d} {len(latencies):>9d}"
+    p95 = done[min(len(done) - 1, int(0.95 * len(done)))]
+    return (f"{name:<10s} {kind:<5s} {len(done):>6d} {len(latencies) - len(done):>9d} "
+            f"{statistics.median(done) * 1e3:>9.0f} {p95 * 1e3:>9.0f} {done[-1] * 1e3:>9.0f}")
+
+
+async def _run(args):
+    host = BusyHost(args.host_parallel, args.sar_ms, args.chat_ms).start()
+    rows = []
+    for name, scheduled in (("direct", False), ("scheduled", True)):
+        engine = LLMEngine(
+            base_url=f"http://127.0.0.1:{host.port}",
+            max_connections=args.sars + args.chats,
+            response_cache=ResponseCache(os.path.join(tempfile.mkdtemp(), "responses.sqlite3")),
+            sar_concurrency=args.sar_concurrency, sar_max_queue=args.sar_queue,
+            chat_concurrency=args.chat_concurrency, chat_max_queue=args.chat_queue,
+        )
+        result = await _burst(engine, args, scheduled)
+        rows += [_row(name, kind, result[kind]) for kind in ("sar", "chat")]
+        if scheduled:
+            stats = engine.scheduler.stats()
+        await engine.aclose()
+
+    print(f"\n{args.sars} SARs ({args.sar_ms:.0f} ms) + {args.chats} chats ({args.chat_ms:.0f} ms), "
+          f"host parallel {args.host_parallel}; lanes sar {args.sar_concurrency}+{args.sar_queue} "
+          f"queued, chat {args.chat_concurrency}+{args.chat_queue} queued\n")
+    print(f"{'variant':<10s} {'kind':<5s} {'done':>6s} {'rejected':>9s} {'p50 ms':>9s} "
+          f"{'p95 ms':>9s} {'max ms':>9s}")
+    for row in rows:
+        print(row)
+    for lane, s in stats.items():
+        print(f"\n{lane} lane: wait p95 {s['wait_ms']['p95']} ms, service p95 {s['service_ms']['p95']} ms, "
+              f"rejected {s['rejected']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sars", type=int, default=30)
+    parser.add_argument("--chats", type=int, default=10)
+    parser.add_argument("--sar-ms", type=float, default=400.0, help="stub model time per SAR")
+    parser.add_argument("--chat-ms", type=float, default=40.0, help="stub model time per chat")
+    parser.add_argument("--host-parallel", type=int, default=4, help="requests the stub host runs at once")
+    parser.add_argument("--sar-concurrency", type=int, default=2)
+    parser.add_argument("--sar-queue", type=int, default=8)
+    parser.add_argument("--chat-concurrency", type=int, default=2)
+    parser.add_argument("--chat-queue", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: raw transaction repr vs token-budgeted compaction in the SAR prompt.
+
+Reports, per case size, the estimated prompt tokens with the old
+str(transactions) listing and with compact_transactions(), the compaction
+time and how many rows / flows / bursts made it into the budget. With
+--ollama it also times the model's time to first token (prompt processing)
+for both prompts against a running Ollama server.
+
+Usage:
+    cd backend
+    python benchmarks/bench_prompt_compactor.py                     # 50..5,000 rows, budget 3,000
+    python benchmarks/bench_prompt_compactor.py --budget 1500 --sizes 200 5000
+    python benchmarks/bench_prompt_compactor.py --ollama http://localhost:11434
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add backend and project root to path
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+sys.path.append(os.path.dirname(BACKEND))
+
+from app.core.llm_engine import LLMEngine
+from app.core.prompt_compactor import compact_transactions, estimate_tokens
+from app.utils.case_store import TransactionTable
+
+
+def _make_case(n: int, seed: int = 42) -> TransactionTable:
+    """Synthetic case: 40 senders into 8 receivers over 60 days, half just below threshold."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Entity {i}" for i in range(40)])
+    ts = pd.Timestamp("2026-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 60 * 86400, n)), unit="s")
+    amounts = np.where(rng.random(n) < 0.5, rng.uniform(90_000, 100_000, n), rng.uniform(1_000, 200_000, n))
+    return TransactionTable.from_records([
+        {"txn_id": f"TXN-{i:05d}", "sender": names[rng.integers(40)], "receiver": names[rng.integers(8)],
+         "amount": float(round(amounts[i])), "currency": "INR",
+         "timestamp": ts[i].strftime("%Y-%m-%dT%H:%M:%S"),
+         "type": ("NEFT", "RTGS", "IMPS")[rng.integers(3)]}
+        for i in range(n)
+    ])
+
+
+async def _time_to_first_token(engine: LLMEngine, user: str) -> float:
+    start = time.perf_counter()
+    async for _ in engine.sar_chain.astream({"system_content": engine.system_prompt, "user_content": user}):
+        return time.perf_counter() - start
+    return time.perf_counter() - start
+
+
+async def _run(args):
+    engine = LLMEngine(base_url=args.ollama or "http://localhost:11434",
+                       transaction_token_budget=args.budget)
+    customer = {"name": "Benchmark Customer", "customer_id": "C-0001"}
+
+    print(f"\nBudget {args.budget:,d} tokens for the transaction listing (chars / 4)\n")
+    header = (f"{'rows':>6s} {'raw prompt tok':>15s} {'compact tok':>12s} {'ratio':>7s} "
+              f"{'compact ms':>11s} {'rows':>6s} {'flows':>6s} {'bursts':>7s}")
+    if args.ollama:
+        header += f" {'raw TTFT s':>11s} {'compact TTFT s':>15s}"
+    print(header)
+
+    for n in args.sizes:
+        table = _make_case(n)
+        raw_prompt = engine._build_prompt({"customer": customer, "transactions": table},
+                                          transactions_text=str(table.to_records()))
+        start = time.perf_counter()
+        compact = compact_transactions(table, args.budget)
+        compact_ms = (time.perf_counter() - start) * 1e3
+        prompt = engine._build_prompt({"customer": customer, "transactions": table},
+                                      transactions_text=compact["text"])
+        raw_tokens = estimate_tokens(engine.system_prompt) + estimate_tokens(raw_prompt)
+        tokens = estimate_tokens(engine.system_prompt) + estimate_tokens(prompt)
+
+        line = (f"{n:>6,d} {raw_tokens:>15,d} {tokens:>12,d} {raw_tokens / tokens:>6.1f}x "
+                f"{compact_ms:>11.1f} {compact['rows_listed']:>6d} {compact['flows_listed']:>6d} "
+                f"{compact['bursts_listed']:>7d}")
+        if args.ollama:
+            raw_ttft = await _time_to_first_token(engine, raw_prompt)
+            ttft = await _time_to_first_token(engine, prompt)
+            line += f" {raw_ttft:>11.2f} {ttft:>15.2f}"
+        print(line)
+    await engine.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000, 5000])
+    parser.add_argument("--budget", type=int, default=3000)
+    parser.add_argument("--ollama", metavar="URL", help="also time prompt processing on this Ollama server")
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark: vectorized vs per-row synthetic training data generation.
+
+Generates the typology training set with the previous Python loop
+(reference, five dicts per iteration) and with the vectorized generator,
+reports rows/sec for each, checks every class keeps the same per-feature
+range and mean, and optionally times writing shards to disk.
+
+Usage:
+    cd backend
+    python benchmarks/bench_training_data.py                     # 20k per class
+    python benchmarks/bench_training_data.py --n-per-class 2000000 --skip-loop
+    python benchmarks/bench_training_data.py --shards /tmp/shards --n-per-class 5000000 --skip-loop
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add backend and project root to path
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+sys.path.append(os.path.dirname(BACKEND))
+
+from ml_models.typology_classifier import (
+    FEATURE_NAMES, TYPOLOGY_LABELS, _generate_training_data, write_training_shards,
+)
+
+
+def _generate_training_data_loop(n_per_class: int = 1000, seed: int = 42) -> tuple:
+    """The original implementation: one dict per row."""
+    rng = np.random.RandomState(seed)
+    rows = []
+
+    for _ in range(n_per_class):
+        # --- NORMAL ---
+        rows.append({
+            "label": 0,
+            "total_amount": rng.uniform(50000, 500000),
+            "avg_amount": rng.uniform(10000, 100000),
+            "num_transactions": rng.randint(1, 10),
+            "num_unique_senders": rng.randint(1, 4),
+            "num_unique_receivers": rng.randint(1, 4),
+            "time_window_days": rng.uniform(1, 30),
+            "avg_time_gap_hours": rng.uniform(12, 168),     # hours between txns
+            "max_single_txn": rng.uniform(10000, 200000),
+            "below_threshold_ratio": rng.uniform(0.0, 0.4),
+            "txn_type_diversity": rng.randint(1, 3),
+        })
+
+        # --- STRUCTURING ---
+        n_txn = rng.randint(10, 30)
+        amt = rng.uniform(80000, 99000)
+        rows.append({
+            "label": 1,
+            "total_amount": amt * n_txn,
+            "avg_amount": amt,
+            "num_transactions": n_txn,
+            "num_unique_senders": 1,                          # same sender
+            "num_unique_receivers": 1,                        # same receiver
+            "time_window_days": rng.uniform(1, 5),
+            "avg_time_gap_hours": rng.uniform(0.5, 4),
+            "max_single_txn": rng.uniform(85000, 99900),     # always under 1L
+            "below_threshold_ratio": rng.uniform(0.9, 1.0),  # most under thresh
+            "txn_type_diversity": 1,                          # single type
+        })
+
+        # --- SMURFING ---
+        n_senders = rng.randint(8, 25)
+        avg_a = rng.uniform(70000, 150000)
+        rows.append({
+            "label": 2,
+            "total_amount": avg_a * n_senders,
+            "avg_amount": avg_a,
+            "num_transactions": n_senders,
+            "num_unique_senders": n_senders,                  # many unique senders
+            "num_unique_receivers": 1,                        # single receiver
+            "time_window_days": rng.uniform(1, 7),
+            "avg_time_gap_hours": rng.uniform(0.5, 6),
+            "max_single_txn": rng.uniform(100000, 200000),
+            "below_threshold_ratio": rng.uniform(0.3, 0.8),
+            "txn_type_diversity": rng.randint(1, 3),
+        })
+
+        # --- LAYERING ---
+        n_hops = rng.randint(8, 20)
+        base_amt = rng.uniform(1000000, 5000000)
+        rows.append({
+            "label": 3,
+            "total_amount": base_amt * 0.95 * n_hops,        # amounts decrease
+            "avg_amount": base_amt * 0.95,
+            "num_transactions": n_hops,
+            "num_unique_senders": n_hops - rng.randint(0, 3), # many intermediaries
+            "num_unique_receivers": n_hops - rng.randint(0, 3),
+            "time_window_days": rng.uniform(0.1, 3),          # very fast
+            "avg_time_gap_hours": rng.uniform(0.2, 3),        # rapid hops
+            "max_single_txn": base_amt * rng.uniform(0.9, 1.1),
+            "below_threshold_ratio": rng.uniform(0.0, 0.2),   # large amounts
+            "txn_type_diversity": rng.randint(2, 4),           # mixed types
+        })
+
+        # --- ROUND TRIPPING ---
+        amt_rt = rng.uniform(500000, 3000000)
+        rows.append({
+            "label": 4,
+            "total_amount": amt_rt * rng.uniform(2, 6),
+            "avg_amount": amt_rt,
+            "num_transactions": rng.randint(4, 12),
+            "num_unique_senders": rng.randint(2, 5),
+            "num_unique_receivers": rng.randint(2, 5),         # sender = receiver
+            "time_window_days": rng.uniform(5, 30),
+            "avg_time_gap_hours": rng.uniform(12, 72),
+            "max_single_txn": amt_rt * rng.uniform(0.9, 1.5),
+            "below_threshold_ratio": rng.uniform(0.0, 0.3),
+            "txn_type_diversity": rng.randint(2, 4),
+        })
+
+    df = pd.DataFrame(rows)
+    X = df[FEATURE_NAMES].values
+    y = df["label"].values
+    return X, y
+
+
+def _class_summary(X: np.ndarray, y: np.ndarray) -> pd.DataFrame:
+    """min / mean / max of every feature, per class."""
+    df = pd.DataFrame(X, columns=FEATURE_NAMES)
+    df["label"] = y
+    return df.groupby("label").agg(["min", "mean", "max"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-per-class", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-loop", action="store_true", help="don't run the slow reference")
+    parser.add_argument("--shards", help="also write shards to this directory")
+    args = parser.parse_args()
+    n_rows = args.n_per_class * len(TYPOLOGY_LABELS)
+
+    start = time.perf_counter()
+    X, y = _generate_training_data(args.n_per_class, args.seed)
+    t_vec = time.perf_counter() - start
+    print(f"Rows: {n_rows:,d}")
+    print(f"  vectorized  {t_vec:8.2f}s  {n_rows / t_vec:>14,.0f} rows/s")
+
+    X2, _ = _generate_training_data(args.n_per_class, args.seed)
+    print(f"  same seed → same rows: {np.array_equal(X, X2)}")
+
+    if not args.skip_loop:
+        start = time.perf_counter()
+        X_ref, y_ref = _generate_training_data_loop(args.n_per_class, args.seed)
+        t_loop = time.perf_counter() - start
+        print(f"  loop        {t_loop:8.2f}s  {n_rows / t_loop:>14,.0f} rows/s  "
+              f"({t_loop / t_vec:.0f}x slower)")
+
+        ref, new = _class_summary(X_ref, y_ref), _class_summary(X, y)
+        # Bounds must agree to within sampling noise (1% of the range);
+        # means likewise
+        span = (ref.xs("max", axis=1, level=1) - ref.xs("min", axis=1, level=1)).abs() + 1e-9
+        worst = 0.0
+        for stat in ("min", "mean", "max"):
+            diff = (ref.xs(stat, axis=1, level=1) - new.xs(stat, axis=1, level=1)).abs() / span
+            worst = max(worst, float(diff.max().max()))
+        print(f"  class semantics match (worst min/mean/max gap {worst:.2%} of range): {worst < 0.02}")
+        print(f"  label balance identical: {np.array_equal(np.bincount(y), np.bincount(y_ref))}")
+
+    if args.shards is not None:
+        out_dir = args.shards or tempfile.mkdtemp()
+        start = time.perf_counter()
+        paths = write_training_shards(out_dir, args.n_per_class, args.seed)
+        t_shards = time.perf_counter() - start
+        size = sum(os.path.getsize(p) for p in paths)
+        print(f"  shards      {t_shards:8.2f}s  {n_rows / t_shards:>14,.0f} rows/s  "
+              f"{len(paths)} files, {size / 2**20:,.0f} MiB in {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: compiled tree engine vs the XGBoost Python stack.
+
+Compares CompiledForest.predict_proba() with XGBClassifier.predict_proba()
+on the trained typology model — single-row latency, batch throughput and
+bit-identical probabilities — and the time to import the classifier module
+in a fresh interpreter (it no longer imports xgboost).
+
+Requires a trained model (python ml_models/typology_classifier.py).
+
+Usage:
+    cd backend
+    python benchmarks/bench_tree_engine.py
+    python benchmarks/bench_tree_engine.py --rows 20000 --repeat 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Add backend and project root to path
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+sys.path.append(os.path.dirname(BACKEND))
+
+from benchmarks.bench_classifier import _make_cases
+from ml_models.typology_classifier import TypologyClassifier, _feature_matrix
+
+
+def _import_seconds(module: str, repeat: int = 3) -> float:
+    """Best wall time to import `module` in a fresh interpreter."""
+    code = (
+        "import sys, time; sys.path.insert(0, %r); t = time.perf_counter(); "
+        "import %s; print(time.perf_counter() - t)" % (os.path.dirname(BACKEND), module)
+    )
+    return min(
+        float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             check=True).stdout)
+        for _ in range(repeat)
+    )
+
+
+def _per_call(fn, repeat: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=1000, help="single-row calls to time")
+    args = parser.parse_args()
+
+    clf = TypologyClassifier()
+    clf.load_model()
+    forest, xgb_model = clf.forest, clf._xgb_model()
+    X = _feature_matrix(_make_cases(args.rows)).astype(np.float32)
+
+    identical = np.array_equal(forest.predict_proba(X), xgb_model.predict_proba(X))
+    print(f"Rows: {len(X):,d}   probabilities identical: {identical}")
+
+    print(f"\n{'':18s} {'xgboost':>12s} {'compiled':>12s}")
+    row = X[:1]
+    t_xgb = _per_call(lambda: xgb_model.predict_proba(row), args.repeat)
+    t_fst = _per_call(lambda: forest.predict_proba(row), args.repeat)
+    print(f"{'single row (ms)':18s} {t_xgb * 1e3:>12.3f} {t_fst * 1e3:>12.3f}")
+    for batch in (100, len(X)):
+        reps = max(1, 2000 // batch)
+        t_xgb = _per_call(lambda: xgb_model.predict_proba(X[:batch]), reps)
+        t_fst = _per_call(lambda: forest.predict_proba(X[:batch]), reps)
+        label = f"rows/s @ {batch:,d}"
+        print(f"{label:18s} {batch / t_xgb:>12,.0f} {batch / t_fst:>12,.0f}")
+
+    print("\nImport time (fresh interpreter):")
+    print(f"  xgboost                        {_import_seconds('xgboost'):.2f}s")
+    print(f"  ml_models.typology_classifier  {_import_seconds('ml_models.typology_classifier'):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Falls back gracefully when backend is offline.
 
 Owner: SIDDH ONLY
 """
+import json
 import requests
 import streamlit as st
 from typing import Optional, Tuple, List
@@ -61,15 +62,32 @@ def upload_file(uploaded_file):
         return None, str(e)
 
 
+def append_file(case_id, uploaded_file):
+    # type: (...) -> Tuple[Optional[dict], Optional[str]]
+    """Append a delta file to POST /api/cases/{case_id}/append. Returns (data, error)."""
+    try:
+        files = {"file": (uploaded_file.name, uploaded_file.getvalue(), "application/octet-stream")}
+        r = requests.post(f"{API_BASE}/cases/{case_id}/append", files=files, timeout=TIMEOUT)
+        if r.status_code == 200:
+            return r.json(), None
+        else:
+            return None, r.json().get("detail", f"Append failed (HTTP {r.status_code})")
+    except requests.ConnectionError:
+        return None, "Backend is offline — using demo mode"
+    except Exception as e:
+        return None, str(e)
+
+
 # --------------------------------------------------------------------------- #
 #  SAR Generation
 # --------------------------------------------------------------------------- #
 
-def generate_sar(case_id):
-    # type: (str) -> Tuple[Optional[dict], Optional[str]]
+def generate_sar(case_id, force_regenerate=False):
+    # type: (str, bool) -> Tuple[Optional[dict], Optional[str]]
     """Call POST /api/generate-sar. Returns (sar_response, error)."""
     try:
-        r = requests.post(f"{API_BASE}/generate-sar", json={"case_id": case_id}, timeout=300)
+        r = requests.post(f"{API_BASE}/generate-sar",
+                          json={"case_id": case_id, "force_regenerate": force_regenerate}, timeout=300)
         if r.status_code == 200:
             return r.json(), None
         else:
@@ -80,6 +98,69 @@ def generate_sar(case_id):
         return None, str(e)
 
 
+def generate_sar_stream(case_id, on_event=None, force_regenerate=False):
+    # type: (str, ..., bool) -> Tuple[Optional[dict], Optional[str]]
+    """
+    Call POST /api/generate-sar/stream (server-sent events).
+
+    `on_event(event, data)` is called for every event as it arrives
+    ("start", "token", "section", "done"). Returns (sar_response, error)
+    like generate_sar(). `force_regenerate` skips the LLM response cache.
+    """
+    try:
+        with requests.post(f"{API_BASE}/generate-sar/stream", json={"case_id": case_id, "force_regenerate": force_regenerate},
+                           stream=True, timeout=(TIMEOUT, 300)) as r:
+            if r.status_code != 200:
+                return None, r.json().get("detail", f"Generation failed (HTTP {r.status_code})")
+            event, sar = None, None
+            for line in r.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):])
+                    if event == "done":
+                        sar = data
+                    if on_event:
+                        on_event(event, data)
+            if sar is None:
+                return None, "Stream ended before the SAR was complete"
+            return sar, None
+    except requests.ConnectionError:
+        return None, "Backend is offline — using demo mode"
+    except Exception as e:
+        return None, str(e)
+
+
+def classify_batch(case_ids):
+    # type: (...) -> Tuple[Optional[dict], Optional[str]]
+    """Score many cases via POST /api/classify-batch. Returns (data, error)."""
+    try:
+        r = requests.post(f"{API_BASE}/classify-batch", json={"case_ids": list(case_ids)}, timeout=300)
+        if r.status_code == 200:
+            return r.json(), None
+        else:
+            return None, r.json().get("detail", f"Classification failed (HTTP {r.status_code})")
+    except requests.ConnectionError:
+        return None, "Backend is offline — using demo mode"
+    except Exception as e:
+        return None, str(e)
+
+
+def explain_cases(case_ids):
+    # type: (...) -> Tuple[Optional[dict], Optional[str]]
+    """Per-case SHAP attributions via POST /api/explain. Returns (data, error)."""
+    try:
+        r = requests.post(f"{API_BASE}/explain", json={"case_ids": list(case_ids)}, timeout=300)
+        if r.status_code == 200:
+            return r.json(), None
+        else:
+            return None, r.json().get("detail", f"Explanation failed (HTTP {r.status_code})")
+    except requests.ConnectionError:
+        return None, "Backend is offline — using demo mode"
+    except Exception as e:
+        return None, str(e)
+
+
 # --------------------------------------------------------------------------- #
 #  SAR CRUD
 # --------------------------------------------------------------------------- #
@@ -130,6 +211,21 @@ def approve_sar(sar_id):
         return None, str(e)
 
 
+def reject_sar(sar_id, reason=None):
+    # type: (str, Optional[str]) -> Tuple[Optional[dict], Optional[str]]
+    """POST /api/sar/{sar_id}/reject. Returns (result, error)."""
+    try:
+        r = requests.post(f"{API_BASE}/sar/{sar_id}/reject", json={"reason": reason}, timeout=TIMEOUT)
+        if r.status_code == 200:
+            return r.json(), None
+        else:
+            return None, r.json().get("detail", f"Rejection failed (HTTP {r.status_code})")
+    except requests.ConnectionError:
+        return None, "Backend is offline"
+    except Exception as e:
+        return None, str(e)
+
+
 # --------------------------------------------------------------------------- #
 #  Cases
 # --------------------------------------------------------------------------- #
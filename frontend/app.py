@@ -280,8 +280,8 @@ col_left, col_right = st.columns([1.2, 1])
 with col_left:
     st.markdown("### 📥 Upload Transaction Data")
     uploaded_file = st.file_uploader(
-        "Upload CSV or JSON file with transaction alerts + KYC data",
-        type=["csv", "json"],
+        "Upload CSV, JSON, Parquet or Arrow file with transaction alerts + KYC data",
+        type=["csv", "json", "ndjson", "jsonl", "parquet", "arrow", "feather"],
         help="Expected columns: txn_id, sender, receiver, amount, currency, timestamp, type",
     )
 
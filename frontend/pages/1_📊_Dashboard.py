@@ -9,7 +9,7 @@ import requests
 from streamlit_agraph import agraph, Node, Edge, Config
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
-from api_client import is_backend_available, list_cases, API_BASE
+from api_client import is_backend_available, list_cases, classify_batch, explain_cases, API_BASE
 
 st.set_page_config(page_title="Dashboard | SAR Generator", page_icon="📊", layout="wide")
 
@@ -200,18 +200,61 @@ with tab_map:
     st.map(map_data, zoom=10, use_container_width=True)
 
 with tab_list:
+    if st.button("🧠 Classify All Cases", disabled=not backend_online or df.empty):
+        with st.spinner("Scoring cases..."):
+            batch, err = classify_batch(df["case_id"].tolist())
+        if err:
+            st.error(f"Classification failed: {err}")
+        else:
+            st.session_state["batch_scores"] = pd.DataFrame([
+                {
+                    "case_id": item["case_id"],
+                    "typology": (item.get("typology") or {}).get("prediction"),
+                    "confidence": (item.get("typology") or {}).get("confidence"),
+                    "risk_score": item.get("risk_score"),
+                }
+                for item in batch["results"] if not item.get("error")
+            ])
+            st.caption(f"Classified {batch['classified']}/{batch['total']} cases in {batch['seconds']:.2f}s")
+
+    list_df = df
+    scores = st.session_state.get("batch_scores")
+    if scores is not None and not scores.empty:
+        list_df = df.merge(scores, on="case_id", how="left")
+
     st.dataframe(
-        df,
+        list_df,
         column_config={
             "case_id": "Case ID",
             "customer_name": "Customer",
             "risk_level": st.column_config.TextColumn("Risk", help="Risk Level"),
             "sar_status": "Status",
+            "typology": "Predicted Typology",
+            "confidence": st.column_config.ProgressColumn("Confidence", min_value=0.0, max_value=1.0),
+            "risk_score": "Risk Score",
         },
         use_container_width=True,
         hide_index=True
     )
 
+    st.markdown("#### Why this typology?")
+    c_pick, c_go = st.columns([3, 1])
+    explain_id = c_pick.selectbox("Case to explain", df["case_id"].tolist(), key="explain_case")
+    if c_go.button("🔍 Explain", disabled=not backend_online or explain_id is None):
+        with st.spinner("Computing feature attributions..."):
+            explained, err = explain_cases([explain_id])
+        if err:
+            st.error(f"Explanation failed: {err}")
+        else:
+            item = explained["results"][0]
+            if item.get("error"):
+                st.error(item["error"])
+            else:
+                if item.get("confidence") is not None:
+                    st.caption(f"{item['typology']} ({item['confidence']:.0%} confidence)")
+                contrib = pd.Series(item["features"], name="Contribution").sort_values()
+                st.bar_chart(contrib, color="#7000ff")
+
 with tab_analytics:
     c1, c2 = st.columns(2)
     with c1:
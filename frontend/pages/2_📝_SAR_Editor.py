@@ -13,8 +13,10 @@ from api_client import (
     list_cases,
     get_sar,
     update_sar,
-    generate_sar,
+    generate_sar_stream,
     approve_sar,
+    reject_sar,
+    append_file,
     API_BASE
 )
 
@@ -49,6 +51,24 @@ if not case_options:
 selected_label = st.selectbox("Select Case", list(case_options.keys()))
 selected_case_id = case_options[selected_label]
 
+# --- Append new transactions (delta upload) to the selected case ---
+with st.expander("➕ Append transactions to this case"):
+    delta_file = st.file_uploader(
+        "Delta file (rows need a txn_id; ones already in the case are skipped)",
+        type=["csv", "json", "ndjson", "jsonl", "parquet", "arrow", "feather"],
+        key="delta_upload",
+    )
+    if delta_file and st.button("Append", disabled=not backend_online):
+        result, error = append_file(selected_case_id, delta_file)
+        if error:
+            st.error(f"Append failed: {error}")
+        else:
+            st.success(
+                f"Appended {result.get('appended_count', 0)} transactions "
+                f"({result.get('duplicate_count', 0)} already in the case); "
+                f"case now has {result.get('transaction_count', 0)}. Regenerate the narrative to include them."
+            )
+
 # Initialize Session State
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
@@ -75,16 +95,29 @@ with col_editor:
     with col_gen_btn:
         if st.button("Generate / Refresh Narrative"):
             start_gen = True
+        force_regenerate = st.checkbox("Bypass cache", help="Call the model again even if this exact prompt was answered before")
             
     with col_roi:
         if not sar_data and not start_gen:
              st.markdown("⚡ **Expected Time Savings:** ~5 hours vs manual drafting")
 
     if start_gen:
-        with st.spinner("Generating SAR..."):
-            sar_data, error = generate_sar(selected_case_id)
-            if error:
-                st.error(f"Generation failed: {error}")
+        # Show the narrative as the model writes it
+        live = st.empty()
+        streamed = []
+
+        def show_progress(event, data):
+            if event == "token":
+                streamed.append(data.get("text", ""))
+                live.markdown("".join(streamed))
+
+        live.info("Generating SAR...")
+        sar_data, error = generate_sar_stream(
+            selected_case_id, on_event=show_progress, force_regenerate=force_regenerate,
+        )
+        live.empty()
+        if error:
+            st.error(f"Generation failed: {error}")
     else:
          sar_data, _ = get_sar(selected_case_id) if backend_online else (None, "Offline")
     
@@ -101,8 +134,10 @@ with col_editor:
         with t3:
             conc_edit = st.text_area("Conclusion", narrative.get("conclusion", ""), height=150)
             
+        st.text_input("Rejection reason (optional)", key="reject_reason")
+        
         # Actions
-        c_act1, c_act2, c_act3 = st.columns(3)
+        c_act1, c_act2, c_act3, c_act4 = st.columns(4)
         if c_act1.button("💾 Save Draft"):
             # Update logic
             new_narrative = {"introduction": intro_edit, "body": body_edit, "conclusion": conc_edit}
@@ -114,7 +149,15 @@ with col_editor:
             st.success("SAR Approved and Filed!")
             st.balloons()
             
-        if c_act3.button("📥 Export PDF"):
+        if c_act3.button("❌ Reject"):
+            # The reason lands in the audit trail; the case is fed back as "normal"
+            _, err = reject_sar(sar_data["sar_id"], st.session_state.get("reject_reason") or None)
+            if err:
+                st.error(f"Rejection failed: {err}")
+            else:
+                st.warning("SAR rejected.")
+            
+        if c_act4.button("📥 Export PDF"):
             # Call PDF Export API
             with st.spinner("Generating PDF..."):
                 try:
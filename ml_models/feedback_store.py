@@ -0,0 +1,190 @@
+"""
+Feedback Store — analyst decisions as labeled training rows.
+
+Owner: HET ONLY
+
+Each approve/reject decision appends one JSON line holding the case's
+feature vector (FEATURE_NAMES order) and its final typology label. A cursor
+file records the byte offset up to which rows have already been trained
+on, so an incremental model update reads only the rows added since — its
+cost grows with the new labels, not with the whole history.
+
+A SAR (or, without a sar_id, a case) counts once: a decision repeating the
+latest label for it is not written again, only its newest pending row is
+trained on, and a label the model has already been trained on for it is
+skipped. A changed decision is trained on as a correction.
+
+Usage:
+    store = FeedbackStore()
+    store.record(case_id, features, "structuring", decision="approved")
+    apply_feedback(classifier, store)     # continue boosting on pending rows
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+try:
+    from ml_models.typology_classifier import FEATURE_NAMES, TYPOLOGY_LABELS
+except ImportError:  # run as a script from inside ml_models/
+    from typology_classifier import FEATURE_NAMES, TYPOLOGY_LABELS
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_FEEDBACK_PATH = os.path.join(_HERE, "feedback", "feedback.jsonl")
+
+
+def _row_key(row: dict) -> str:
+    """What a decision is about: its SAR, or the case when there is no sar_id."""
+    return row.get("sar_id") or f"case:{row['case_id']}"
+
+
+class FeedbackStore:
+    """Append-only JSONL of labeled feature vectors plus a consumed-offset cursor."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or _DEFAULT_FEEDBACK_PATH
+        self.cursor_path = self.path + ".cursor"
+        self._lock = threading.Lock()
+        # Latest label recorded per SAR/case, loaded on first record()
+        self._latest: Optional[dict[str, str]] = None
+
+    def _rows(self, start: int = 0, stop: Optional[int] = None):
+        """Yield (end offset, row) for the complete lines in [start, stop)."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read() if stop is None else f.read(stop - start)
+        # Only complete lines; a row being appended right now waits for the next update
+        offset = start
+        for line in data[: data.rfind(b"\n") + 1].splitlines(keepends=True):
+            offset += len(line)
+            if line.strip():
+                yield offset, json.loads(line)
+
+    def record(
+        self,
+        case_id: str,
+        features: dict,
+        label: str,
+        decision: str,
+        sar_id: Optional[str] = None,
+        model_version: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        Append one labeled row; `label` must be one of TYPOLOGY_LABELS.
+
+        Returns the row, or None when it repeats the latest label recorded
+        for the same SAR (or case) and nothing was written.
+        """
+        if label not in TYPOLOGY_LABELS:
+            raise ValueError(f"Unknown typology label: {label}")
+        row = {
+            "feedback_id": f"FB-{uuid.uuid4().hex[:8].upper()}",
+            "case_id": case_id,
+            "sar_id": sar_id,
+            "decision": decision,
+            "label": label,
+            "features": [float(features[f]) for f in FEATURE_NAMES],
+            "model_version": model_version,
+            "recorded_at": datetime.now().isoformat(),
+        }
+        line = json.dumps(row) + "\n"
+        key = _row_key(row)
+        with self._lock:
+            if self._latest is None:
+                self._latest = {_row_key(r): r["label"] for _, r in self._rows()}
+            if self._latest.get(key) == label:
+                return None
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._latest[key] = label
+        return row
+
+    def _cursor(self) -> dict:
+        try:
+            with open(self.cursor_path, encoding="utf-8") as f:
+                cursor = json.load(f)
+            return {"offset": int(cursor["offset"]), "trained": dict(cursor.get("trained", {}))}
+        except (OSError, ValueError, KeyError):
+            return {"offset": 0, "trained": {}}
+
+    def _consumed_offset(self) -> int:
+        return self._cursor()["offset"]
+
+    def _pending_rows(self) -> tuple[list[dict], int, dict]:
+        """Newest pending row per SAR/case not trained on with that label yet."""
+        cursor = self._cursor()
+        latest: dict[str, dict] = {}
+        end = cursor["offset"]
+        for end, row in self._rows(cursor["offset"]):
+            key = _row_key(row)
+            latest.pop(key, None)   # re-insert so rows stay in recording order
+            latest[key] = row
+        rows = [row for key, row in latest.items() if cursor["trained"].get(key) != row["label"]]
+        return rows, end, cursor
+
+    def pending(self) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Rows recorded since the last mark_consumed().
+
+        Returns:
+            (X, y, end_offset) — pass end_offset to mark_consumed() once the
+            rows have been trained on.
+        """
+        rows, end, _ = self._pending_rows()
+        return (
+            np.array([row["features"] for row in rows], dtype=np.float64).reshape(-1, len(FEATURE_NAMES)),
+            np.array([TYPOLOGY_LABELS.index(row["label"]) for row in rows], dtype=np.int64),
+            end,
+        )
+
+    def mark_consumed(self, offset: int):
+        """Record that rows up to byte `offset` have been trained on."""
+        cursor = self._cursor()
+        trained = cursor["trained"]
+        for _, row in self._rows(cursor["offset"], offset):
+            trained[_row_key(row)] = row["label"]
+        tmp = self.cursor_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"offset": offset, "updated_at": datetime.now().isoformat(),
+                       "trained": trained}, f)
+        os.replace(tmp, self.cursor_path)
+
+    def stats(self) -> dict:
+        """Total rows and the number the next update would train on."""
+        total = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                total = sum(1 for line in f if line.strip())
+        return {"path": self.path, "total": total, "pending": len(self._pending_rows()[0])}
+
+
+# --------------------------------------------------------------------------- #
+#  Update job
+# --------------------------------------------------------------------------- #
+
+_update_lock = threading.Lock()
+
+
+def apply_feedback(classifier, store: FeedbackStore, rounds: int = 10, min_rows: int = 1) -> dict:
+    """
+    Continue boosting `classifier` on the feedback rows not yet trained on.
+
+    Concurrent calls run one after another; a call that finds fewer than
+    `min_rows` pending rows leaves the model untouched.
+    """
+    with _update_lock:
+        X, y, offset = store.pending()
+        if len(y) < min_rows:
+            return {"updated": False, "rows": int(len(y)), "model_version": classifier.model_version}
+        if classifier.forest is None:
+            classifier.load_model()
+        stats = classifier.update(X, y, rounds=rounds)
+        store.mark_consumed(offset)
+        return {"updated": True, **stats}
@@ -0,0 +1,178 @@
+"""
+Model Registry — versioned typology models with an active pointer.
+
+Owner: HET ONLY
+
+Every registered model gets its own directory, named after its version
+(the CompiledForest fingerprint, i.e. TypologyClassifier.model_version):
+
+    registry/
+      ACTIVE                    ← version currently served
+      <version>/
+        model.joblib            ← XGBoost model (training, SHAP)
+        model.forest.npz        ← compiled trees (serving)
+        metadata.json           ← metrics, params, feature list, timestamps
+
+Version directories are never modified once published; a feedback update
+or retrain registers a new version. Publishing copies the files into a
+staging directory first and renames it into place, and ACTIVE is replaced
+with os.replace, so readers never see a half-written version.
+
+Usage:
+    registry = ModelRegistry()
+    version = registry.register(clf, metrics=stats)   # after clf.train()
+    registry.activate(version)
+    clf = registry.load(registry.active())
+"""
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import Optional
+
+try:
+    from ml_models.typology_classifier import FEATURE_NAMES, TYPOLOGY_LABELS, TypologyClassifier
+except ImportError:  # run as a script from inside ml_models/
+    from typology_classifier import FEATURE_NAMES, TYPOLOGY_LABELS, TypologyClassifier
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_REGISTRY_DIR = os.path.join(_HERE, "registry")
+
+_MODEL_FILE = "model.joblib"
+_FOREST_FILE = "model.forest.npz"
+_METADATA_FILE = "metadata.json"
+
+
+class ModelRegistry:
+    """Directory of immutable model versions plus an ACTIVE pointer file."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or _DEFAULT_REGISTRY_DIR
+        self.active_path = os.path.join(self.root, "ACTIVE")
+
+    def _version_dir(self, version: str) -> str:
+        # Versions are hex fingerprints; refuse anything that could escape root
+        if not version or not version.isalnum():
+            raise ValueError(f"Invalid model version: {version!r}")
+        return os.path.join(self.root, version)
+
+    def register(
+        self,
+        classifier: TypologyClassifier,
+        metrics: Optional[dict] = None,
+        source: str = "train",
+        parent: Optional[str] = None,
+    ) -> str:
+        """
+        Publish the classifier's saved model files as a new version.
+
+        Args:
+            classifier: A trained/loaded classifier whose model_path and
+                        compiled_path are up to date on disk
+            metrics:    Evaluation results (e.g. the dict train() returns)
+            source:     How the model was produced ("train", "feedback", ...)
+            parent:     Version this one was derived from, if any
+
+        Returns:
+            The version id. Registering the same trees twice is a no-op.
+        """
+        if classifier.forest is None:
+            classifier.load_model()
+        version = classifier.model_version
+        target = self._version_dir(version)
+        if os.path.isdir(target):
+            return version
+
+        metrics = dict(metrics or {})
+        metadata = {
+            "version": version,
+            "source": source,
+            "parent": parent,
+            "params": metrics.pop("params", None),
+            "metrics": metrics,
+            "feature_names": list(FEATURE_NAMES),
+            "typology_labels": list(TYPOLOGY_LABELS),
+            "trained_at": datetime.fromtimestamp(
+                os.path.getmtime(classifier.model_path)).isoformat(),
+            "registered_at": datetime.now().isoformat(),
+        }
+
+        staging = os.path.join(self.root, f".staging-{uuid.uuid4().hex[:8]}")
+        os.makedirs(staging)
+        try:
+            shutil.copy2(classifier.model_path, os.path.join(staging, _MODEL_FILE))
+            shutil.copy2(classifier.compiled_path, os.path.join(staging, _FOREST_FILE))
+            with open(os.path.join(staging, _METADATA_FILE), "w", encoding="utf-8") as f:
+                json.dump(metadata, f, indent=2, default=str)
+            os.rename(staging, target)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(target):
+                raise
+        print(f"[ModelRegistry] Registered version {version} ({source})")
+        return version
+
+    def versions(self) -> list[dict]:
+        """Metadata of every registered version, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name, _METADATA_FILE)
+            if not name.startswith(".") and os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    found.append(json.load(f))
+        return sorted(found, key=lambda m: m.get("registered_at", ""))
+
+    def metadata(self, version: str) -> dict:
+        """metadata.json of one version (FileNotFoundError if unknown)."""
+        with open(os.path.join(self._version_dir(version), _METADATA_FILE), encoding="utf-8") as f:
+            return json.load(f)
+
+    def active(self) -> Optional[str]:
+        """Version currently marked active, or None for an empty registry."""
+        try:
+            with open(self.active_path, encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def activate(self, version: str):
+        """Point ACTIVE at a registered version."""
+        self.metadata(version)   # must exist
+        tmp = f"{self.active_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, self.active_path)
+
+    def load(self, version: str, **kwargs) -> TypologyClassifier:
+        """A new classifier serving `version`, fully loaded (kwargs go to the constructor)."""
+        path = os.path.join(self._version_dir(version), _MODEL_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model version {version} is not registered")
+        classifier = TypologyClassifier(model_path=path, **kwargs)
+        classifier.load_model()
+        return classifier
+
+    def working_copy(self, version: str, **kwargs) -> TypologyClassifier:
+        """
+        A loaded classifier on a private copy of `version`'s files.
+
+        For jobs that modify the model in place (TypologyClassifier.update),
+        which must not touch a published version; register() the result.
+        """
+        scratch = os.path.join(self.root, f".work-{uuid.uuid4().hex[:8]}")
+        os.makedirs(scratch)
+        source = self._version_dir(version)
+        for name in (_MODEL_FILE, _FOREST_FILE):
+            shutil.copy2(os.path.join(source, name), os.path.join(scratch, name))
+        classifier = TypologyClassifier(model_path=os.path.join(scratch, _MODEL_FILE), **kwargs)
+        classifier.load_model()
+        return classifier
+
+    def discard(self, classifier: TypologyClassifier):
+        """Delete a working_copy() directory once it has been registered."""
+        scratch = os.path.dirname(classifier.model_path)
+        if os.path.basename(scratch).startswith(".work-"):
+            shutil.rmtree(scratch, ignore_errors=True)
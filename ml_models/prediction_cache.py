@@ -0,0 +1,105 @@
+"""
+Prediction Cache — content-addressed memo of typology features and predictions.
+
+Owner: HET ONLY
+
+Keys are (hash of the case's transactions, model version); values hold the
+extracted feature vector and the prediction dict. Entries are evicted least
+recently used first once their estimated size exceeds the memory cap.
+"""
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# Default memory cap for cached entries
+_DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def transactions_hash(transactions) -> str:
+    """Stable hex digest of a transaction list (or TransactionTable)."""
+    if hasattr(transactions, "content_hash"):
+        return transactions.content_hash()
+    payload = json.dumps(
+        list(transactions), sort_keys=True, default=str, separators=(",", ":"),
+    )
+    return hashlib.blake2b(payload.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _sizeof(value) -> int:
+    """Rough deep size of a prediction dict (dicts, strings, numbers)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    return size
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU of {(transactions hash, model version): (features, prediction)}.
+
+    Usage:
+        cache = PredictionCache(max_bytes=16 * 1024 * 1024)
+        entry = cache.get(key)          # (features, prediction) or None
+        cache.put(key, features, prediction)
+        cache.stats()                   # hits, misses, evictions, bytes, ...
+    """
+
+    def __init__(self, max_bytes: int = _DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()   # key → (features, prediction, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[tuple[np.ndarray, dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: tuple, features: np.ndarray, prediction: dict):
+        size = sys.getsizeof(key) + sum(map(sys.getsizeof, key)) + features.nbytes + _sizeof(prediction)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (features, prediction, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,92 @@
+"""
+Timestamp parsing shared by the feature extractor and the case store.
+
+Owner: HET ONLY
+
+Typology features must not depend on how a case is stored, so every path
+that turns timestamp text into numbers (extract_features on a list of
+dicts, the TransactionTable encoder, FeatureAccumulator) goes through
+parse_timestamps() here. It reproduces what pd.to_datetime(errors="coerce")
+does on a case's whole timestamp column: the layout is inferred from the
+first non-empty value and rows in another layout become NaT.
+
+A case parsed in pieces (streamed batches, delta appends) keeps the layout
+inferred for its first piece, so the result equals parsing the whole case
+at once.
+
+Usage:
+    fmt = infer_timestamp_format(values)       # once per case
+    ns = parse_timestamps(values, fmt)         # int64 epoch ns, NAT_NS if unparseable
+"""
+import warnings
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# int64 sentinel pandas uses for NaT
+NAT_NS = np.iinfo(np.int64).min
+
+# Layout used when the first value's format cannot be guessed: each value is
+# then parsed on its own, as pd.to_datetime does
+MIXED = "mixed"
+
+# Strings pandas treats as missing when looking for the first value
+_NAT_STRINGS = frozenset({"", "NaT", "nat", "NAT", "nan", "NaN", "NAN"})
+
+
+def _first_value(values):
+    for value in values:
+        if value is None or value is pd.NaT:
+            continue
+        if isinstance(value, float) and value != value:
+            continue
+        if isinstance(value, str) and value in _NAT_STRINGS:
+            continue
+        return value
+    return None
+
+
+def infer_timestamp_format(values) -> Optional[str]:
+    """
+    Layout pd.to_datetime would infer for `values`.
+
+    Returns the strftime layout guessed from the first non-empty value,
+    MIXED if it cannot be guessed (or is not a string), or None when there
+    is no value at all.
+    """
+    first = _first_value(values)
+    if first is None:
+        return None
+    if not isinstance(first, str):
+        return MIXED
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pd.tseries.api.guess_datetime_format(first) or MIXED
+
+
+def parse_timestamps(values, timestamp_format: Optional[str] = MIXED) -> np.ndarray:
+    """
+    Timestamps as int64 epoch nanoseconds (UTC for offset-aware text).
+
+    Args:
+        values: Timestamp values (strings, datetimes, None)
+        timestamp_format: Layout from infer_timestamp_format() for the case
+            the values belong to; None or MIXED parses each value on its own
+
+    Values that do not fit the layout are NAT_NS. Text mixing UTC offsets
+    fails as a whole in pandas, so it gives all NAT_NS, like the original
+    extract_features().
+    """
+    series = pd.Series(values, dtype=object)
+    if series.empty:
+        return np.empty(0, dtype=np.int64)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            parsed = pd.to_datetime(series, errors="coerce", format=timestamp_format or MIXED)
+        if parsed.dt.tz is not None:
+            parsed = parsed.dt.tz_convert(None)
+        return parsed.dt.as_unit("ns").to_numpy().view(np.int64).copy()
+    except (TypeError, ValueError, OverflowError):
+        return np.full(len(series), NAT_NS, dtype=np.int64)
@@ -1,26 +1,94 @@
 """
 Train and save the XGBoost Typology Classifier.
+
+Usage:
+    python ml_models/train_model.py                       # train on 2,000 rows per class
+    python ml_models/train_model.py --search              # hyperparameter search, Pareto pick
+    python ml_models/train_model.py --search --workers 4 --results search.json
+    python ml_models/train_model.py --write-shards data/shards --n-per-class 5000000
+    python ml_models/train_model.py --no-register         # skip the model registry
 """
+import argparse
+import json
 import os
 import sys
 
 # Ensure we can import from local modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from typology_classifier import TypologyClassifier
+from model_registry import ModelRegistry
+from typology_classifier import TypologyClassifier, write_training_shards
+
+
+def _search(args) -> dict:
+    """Run the parallel search, print the candidates and return the params to train with."""
+    from tuning import run_search, select_candidate
+
+    print(f"Searching hyperparameters on {args.workers or os.cpu_count()} worker(s)...")
+    results = run_search(n_per_class=args.n_per_class, seed=args.seed, workers=args.workers)
+    results.sort(key=lambda r: (-r["accuracy"], r["single_row_ms"]))
+
+    print(f"\n{'depth':>5s} {'trees':>6s} {'lr':>5s} {'used':>5s} {'acc':>7s} "
+          f"{'1-row ms':>9s} {'batch rows/s':>13s}  pareto")
+    for r in results:
+        p = r["params"]
+        print(f"{p['max_depth']:>5d} {p['n_estimators']:>6d} {p['learning_rate']:>5.2f} "
+              f"{r['n_estimators_used']:>5d} {r['accuracy']:>7.4f} {r['single_row_ms']:>9.3f} "
+              f"{r['batch_rows_per_sec']:>13,d}  {'*' if r['pareto'] else ''}")
+
+    if args.results:
+        with open(args.results, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.results}")
+
+    best = select_candidate(results)
+    # Early stopping already found how many rounds the chosen settings need
+    params = {**best["params"], "n_estimators": best["n_estimators_used"]}
+    print(f"\nSelected: {params}  (accuracy {best['accuracy']}, "
+          f"{best['single_row_ms']} ms/row)")
+    return params
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Train the typology classifier.")
+    parser.add_argument("--n-per-class", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--search", action="store_true",
+                        help="pick hyperparameters by parallel search before training")
+    parser.add_argument("--workers", type=int, help="search processes (default: CPU count)")
+    parser.add_argument("--results", help="write search results to this JSON file")
+    parser.add_argument("--write-shards", metavar="DIR",
+                        help="only write synthetic training shards to DIR (no training)")
+    parser.add_argument("--no-register", action="store_true",
+                        help="do not publish the model to the registry or make it active")
+    args = parser.parse_args()
+
+    if args.write_shards:
+        print(f"Writing {args.n_per_class:,d} rows per class to {args.write_shards}...")
+        paths = write_training_shards(args.write_shards, args.n_per_class, seed=args.seed)
+        print(f"Wrote {len(paths)} shard(s)")
+        return
+
+    params = _search(args) if args.search else None
+
     print("Initializing classifier...")
     clf = TypologyClassifier()
-    
+
     print("Training model (generating synthetic data)...")
-    stats = clf.train(n_per_class=2000)
-    
+    stats = clf.train(n_per_class=args.n_per_class, seed=args.seed, params=params)
+
     print("\nTraining Stats:")
     print(f"Accuracy:  {stats['accuracy']:.4f}")
     print(f"F1 Score:  {stats['f1']:.4f}")
-    
+
     print(f"\nModel saved to: {clf.model_path}")
 
+    if not args.no_register:
+        registry = ModelRegistry()
+        version = registry.register(clf, metrics=stats, source="train")
+        registry.activate(version)
+        print(f"Registered and activated version {version} in {registry.root}")
+        print("A running API picks it up via POST /api/model/activate")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,387 @@
+"""
+Tree Engine — compiled inference for the XGBoost typology model.
+
+Owner: HET ONLY
+
+The trained booster is exported once into flat NumPy arrays (node feature,
+threshold, child indices, default direction, leaf values) and saved as an
+.npz next to the joblib model, so the API process never imports xgboost.
+
+Evaluation is vectorised over rows and trees at once. For trees of up to
+64 leaves it follows QuickScorer: every split is a dense `x < threshold`
+compare, a right turn clears the bits of the split's left-subtree leaves
+in a per-tree bitmask, and the exit leaf is the lowest bit left standing.
+Deeper trees fall back to walking node indices one level per step.
+
+Arithmetic mirrors XGBoost's CPU predictor: features are compared as
+float32 (missing values follow the default direction), leaf values are
+summed tree by tree in float32 and softmax uses glibc's expf —
+probabilities are bit-identical to predict_proba().
+"""
+import hashlib
+import json
+from decimal import Decimal, localcontext
+from typing import Optional
+
+import numpy as np
+
+_SUPPORTED_OBJECTIVES = ("multi:softprob", "multi:softmax")
+
+
+# --------------------------------------------------------------------------- #
+#  expf — XGBoost's softmax calls the C library's expf, which is not always
+#  the correctly rounded float32 of exp(); NumPy's float32 exp differs from it
+#  in ~40% of inputs. This is glibc's table-driven expf (2^(k/32) table plus a
+#  cubic) evaluated in float64, bit-identical to it for the softmax's x <= 0.
+# --------------------------------------------------------------------------- #
+
+_EXPF_N = 32
+with localcontext() as _ctx:
+    _ctx.prec = 60
+    _EXPF_TABLE = np.array([
+        np.float64(float(Decimal(2) ** (Decimal(i) / _EXPF_N))).view(np.uint64) - np.uint64(i << 47)
+        for i in range(_EXPF_N)
+    ], dtype=np.uint64)
+_EXPF_POLY = (
+    float.fromhex("0x1.c6af84b912394p-5") / _EXPF_N ** 3,
+    float.fromhex("0x1.ebfce50fac4f3p-3") / _EXPF_N ** 2,
+    float.fromhex("0x1.62e42ff0c52d6p-1") / _EXPF_N,
+)
+_EXPF_INV_LN2_N = float.fromhex("0x1.71547652b82fep+0") * _EXPF_N
+_EXPF_SHIFT = float.fromhex("0x1.8p+52")
+_EXPF_UNDERFLOW = np.float32(float.fromhex("-0x1.9fe368p6"))
+
+
+def _expf(x: np.ndarray) -> np.ndarray:
+    """glibc expf() for float32 x <= 0 (underflows to 0 below ~-103.97)."""
+    z = _EXPF_INV_LN2_N * x.astype(np.float64)
+    kd = z + _EXPF_SHIFT
+    ki = kd.view(np.uint64)
+    r = z - (kd - _EXPF_SHIFT)
+    s = (_EXPF_TABLE[ki % np.uint64(_EXPF_N)] + (ki << np.uint64(52 - 5))).view(np.float64)
+    c0, c1, c2 = _EXPF_POLY
+    y = (c0 * r + c1) * (r * r) + (c2 * r + 1)
+    return np.where(x < _EXPF_UNDERFLOW, np.float32(0), (y * s).astype(np.float32))
+
+
+# Rows per evaluation chunk: keeps the (rows x trees) temporaries in cache
+_CHUNK_ROWS = 256
+
+
+class CompiledForest:
+    """
+    A multiclass tree ensemble as flat arrays.
+
+    Nodes of all trees share one index space; `roots[t]` is tree t's root and
+    children are global indices (-1 on leaves). Tree t adds its leaf value to
+    class `tree_class[t]`. Leaves are also numbered in left-to-right order
+    per tree ("leaf positions"), which is what evaluation returns.
+
+    Usage:
+        forest = CompiledForest.from_booster(model.get_booster())
+        forest.save("typology_model.forest.npz")
+
+        forest = CompiledForest.load("typology_model.forest.npz")
+        probas = forest.predict_proba(X)
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        mean_value: np.ndarray,
+        roots: np.ndarray,
+        tree_class: np.ndarray,
+        base_score: np.ndarray,
+        max_depth: int,
+        num_feature: int,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        # Cover-weighted mean leaf value below each node (Saabas attributions)
+        self.mean_value = mean_value
+        self.roots = roots
+        self.tree_class = tree_class
+        self.base_score = base_score
+        self.max_depth = max_depth
+        self.num_class = len(base_score)
+        self.num_feature = num_feature
+        self._build_layout()
+
+    def _build_layout(self):
+        """Leaf positions, per-leaf Saabas paths and (if they fit) leaf bitmasks."""
+        n_trees = len(self.roots)
+        node_pos = np.full(len(self.value), -1, dtype=np.int64)
+        leaf_offset = np.zeros(n_trees, dtype=np.int64)
+        leaf_nodes: list[int] = []
+        leaf_paths: list[np.ndarray] = []
+        splits: list[list[tuple[int, int]]] = []    # per tree: (node, left-subtree leaf bits)
+
+        for t, root in enumerate(self.roots):
+            leaf_offset[t] = len(leaf_nodes)
+            tree_splits = []
+            # Depth-first, left child first: leaves come out left to right
+            stack = [(int(root), np.zeros(self.num_feature, dtype=np.float32))]
+            while stack:
+                nid, path = stack.pop()
+                if self.left[nid] < 0:
+                    node_pos[nid] = len(leaf_nodes)
+                    leaf_nodes.append(nid)
+                    leaf_paths.append(path)
+                    continue
+                tree_splits.append(nid)
+                for child in (self.right[nid], self.left[nid]):
+                    step = path.copy()
+                    step[self.feature[nid]] += self.mean_value[child] - self.mean_value[nid]
+                    stack.append((int(child), step))
+            splits.append(tree_splits)
+
+        self._node_pos = node_pos
+        self._leaf_offset = leaf_offset
+        self._leaf_value = self.value[np.array(leaf_nodes, dtype=np.int64)]
+        self._leaf_contrib = np.array(leaf_paths, dtype=np.float32)
+
+        leaves_per_tree = np.diff(np.append(leaf_offset, len(leaf_nodes)))
+        width = int(leaves_per_tree.max())
+        self._mask_dtype = next(
+            (dt for dt in (np.uint8, np.uint16, np.uint32, np.uint64)
+             if width <= np.iinfo(dt).bits), None,
+        )
+        if self._mask_dtype is None:
+            return
+
+        # Splits padded to the widest tree, laid out (slot, tree); padding
+        # never turns right (threshold +inf, NaN goes left) and masks nothing
+        slots = max(max((len(ts) for ts in splits), default=0), 1)
+        all_ones = np.iinfo(self._mask_dtype).max
+        self._split_feature = np.zeros((slots, n_trees), dtype=np.int64)
+        self._split_threshold = np.full((slots, n_trees), np.inf, dtype=np.float32)
+        self._split_default_left = np.ones((slots, n_trees), dtype=bool)
+        self._split_mask = np.full((slots, n_trees), all_ones, dtype=self._mask_dtype)
+        for t, tree_splits in enumerate(splits):
+            first = leaf_offset[t]
+            for k, nid in enumerate(tree_splits):
+                # Leaves under the left child occupy a contiguous run of positions
+                lo = hi = int(self.left[nid])
+                while self.left[lo] >= 0:
+                    lo = int(self.left[lo])
+                while self.left[hi] >= 0:
+                    hi = int(self.right[hi])
+                run = node_pos[hi] - node_pos[lo] + 1
+                bits = ((1 << int(run)) - 1) << int(node_pos[lo] - first)
+                self._split_feature[k, t] = self.feature[nid]
+                self._split_threshold[k, t] = self.threshold[nid]
+                self._split_default_left[k, t] = self.default_left[nid]
+                self._split_mask[k, t] = all_ones & ~bits
+
+    # ---- Export ---------------------------------------------------------- #
+
+    @classmethod
+    def from_booster(cls, booster) -> "CompiledForest":
+        """Compile an xgboost.Booster (gbtree, multi:softprob/softmax)."""
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in _SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for compiled inference: {objective}")
+        gbm = learner["gradient_booster"]
+        if gbm["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster for compiled inference: {gbm['name']}")
+
+        num_class = int(learner["learner_model_param"]["num_class"])
+        base_score = np.atleast_1d(np.array(
+            json.loads(learner["learner_model_param"]["base_score"]), dtype=np.float32,
+        ))
+        base_score = np.broadcast_to(base_score, (num_class,)).copy()
+
+        trees = gbm["model"]["trees"]
+        features, thresholds, lefts, rights, defaults, values, means, roots = (
+            [], [], [], [], [], [], [], [],
+        )
+        max_depth = 0
+        offset = 0
+        for tree in trees:
+            if any(int(t) != 0 for t in tree["split_type"]):
+                raise ValueError("Categorical splits are not supported by compiled inference")
+            left = np.array(tree["left_children"], dtype=np.int32)
+            right = np.array(tree["right_children"], dtype=np.int32)
+            cond = np.array(tree["split_conditions"], dtype=np.float32)
+            hess = np.array(tree["sum_hessian"], dtype=np.float32)
+            is_leaf = left == -1
+
+            # Breadth-first order from the root; walking it backwards fills the
+            # means bottom-up (same float32 steps as XGBoost's approx contribs)
+            order = [0]
+            depth = np.zeros(len(left), dtype=np.int32)
+            for nid in order:
+                if not is_leaf[nid]:
+                    depth[left[nid]] = depth[right[nid]] = depth[nid] + 1
+                    order.extend((int(left[nid]), int(right[nid])))
+            mean = np.zeros(len(left), dtype=np.float32)
+            for nid in reversed(order):
+                if is_leaf[nid]:
+                    mean[nid] = cond[nid]
+                else:
+                    l, r = left[nid], right[nid]
+                    total = np.float32(mean[l] * hess[l]) + np.float32(mean[r] * hess[r])
+                    mean[nid] = np.float32(total / hess[nid])
+            max_depth = max(max_depth, int(depth.max()))
+
+            features.append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.float32(0), cond))
+            lefts.append(np.where(is_leaf, -1, left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, -1, right + offset).astype(np.int32))
+            defaults.append(np.array(tree["default_left"], dtype=bool))
+            values.append(np.where(is_leaf, cond, np.float32(0)))
+            means.append(mean)
+            roots.append(offset)
+            offset += len(left)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            default_left=np.concatenate(defaults),
+            value=np.concatenate(values),
+            mean_value=np.concatenate(means),
+            roots=np.array(roots, dtype=np.int32),
+            tree_class=np.array(gbm["model"]["tree_info"], dtype=np.int32),
+            base_score=base_score,
+            max_depth=max_depth,
+            num_feature=int(learner["learner_model_param"]["num_feature"]),
+        )
+
+    def save(self, path: str):
+        """Write the arrays to an .npz (uncompressed, loads without pickle)."""
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold,
+            left=self.left, right=self.right, default_left=self.default_left,
+            value=self.value, mean_value=self.mean_value,
+            roots=self.roots, tree_class=self.tree_class,
+            base_score=self.base_score, max_depth=np.array(self.max_depth),
+            num_feature=np.array(self.num_feature),
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Short stable digest of the trees: identifies a model version."""
+        if getattr(self, "_fingerprint", None) is None:
+            h = hashlib.blake2b(digest_size=8)
+            for arr in (self.feature, self.threshold, self.left, self.right,
+                        self.default_left, self.value, self.tree_class, self.base_score):
+                h.update(np.ascontiguousarray(arr).tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files}
+        arrays["max_depth"] = int(arrays["max_depth"])
+        arrays["num_feature"] = int(arrays["num_feature"])
+        return cls(**arrays)
+
+    # ---- Inference ------------------------------------------------------- #
+
+    def _leaf_positions(self, X: np.ndarray) -> np.ndarray:
+        """Exit leaf position of every (row, tree) pair, shape (n_rows, n_trees)."""
+        if self._mask_dtype is None:
+            return self._node_pos[self._walk(X)]
+
+        has_nan = bool(np.isnan(X).any())
+        acc = np.full((len(X), len(self.roots)), np.iinfo(self._mask_dtype).max, dtype=self._mask_dtype)
+        scratch = np.empty_like(acc)
+        for k in range(len(self._split_feature)):
+            x = X[:, self._split_feature[k]]
+            go_left = x < self._split_threshold[k]
+            if has_nan:
+                go_left = np.where(np.isnan(x), self._split_default_left[k], go_left)
+            # 0/1 → all-ones/0, so left turns keep every bit
+            np.negative(go_left.view(np.uint8).astype(self._mask_dtype), out=scratch)
+            scratch |= self._split_mask[k]
+            acc &= scratch
+        # Index of the lowest set bit = popcount of the zeros below it
+        np.subtract(acc, 1, out=scratch)
+        scratch &= ~acc
+        return self._leaf_offset + np.bitwise_count(scratch)
+
+    def _walk(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node reached by every (row, tree) pair, one tree level per step."""
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            child = np.where(go_left, self.left[node], self.right[node])
+            node = np.where(child < 0, node, child)    # leaves stay put
+        return node
+
+    @staticmethod
+    def _as_matrix(X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        return X[None, :] if X.ndim == 1 else X
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """Raw class scores, shape (n_rows, num_class), float32."""
+        X = self._as_matrix(X)
+        n_rounds = len(self.roots) // self.num_class
+        rounds_cycle = np.array_equal(self.tree_class, np.tile(np.arange(self.num_class), n_rounds))
+        out = np.empty((len(X), self.num_class), dtype=np.float32)
+        for start in range(0, len(X), _CHUNK_ROWS):
+            chunk = X[start:start + _CHUNK_ROWS]
+            leaves = self._leaf_value[self._leaf_positions(chunk)]
+            # Accumulate tree by tree in float32 (cumsum is sequential), as
+            # XGBoost does, starting from the base score
+            if rounds_cycle:
+                per_tree = leaves.reshape(len(chunk), n_rounds, self.num_class)
+            else:
+                per_tree = np.zeros((len(chunk), len(self.roots), self.num_class), dtype=np.float32)
+                per_tree[:, np.arange(len(self.roots)), self.tree_class] = leaves
+            base = np.broadcast_to(self.base_score, (len(chunk), 1, self.num_class))
+            out[start:start + len(chunk)] = np.cumsum(
+                np.concatenate([base, per_tree], axis=1), axis=1, dtype=np.float32,
+            )[:, -1]
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities (softmax of the margins), shape (n_rows, num_class)."""
+        margin = self.predict_margin(X)
+        # XGBoost: float32 expf, double-precision sum, float32 division
+        exp = _expf(margin - margin.max(axis=1, keepdims=True))
+        total = exp.astype(np.float64).sum(axis=1, keepdims=True).astype(np.float32)
+        return exp / total
+
+    def contributions(self, X: np.ndarray, classes: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Per-feature Saabas contributions (XGBoost's approx_contribs) to one
+        class per row — `classes[i]`, default the argmax — shape (n_rows, n_features).
+
+        Each split on a row's path credits its feature with the change in
+        mean leaf value from the node to the child taken; those sums are
+        precomputed per leaf, so this is one leaf lookup per tree.
+        """
+        X = self._as_matrix(X)
+        if classes is None:
+            classes = self.predict_margin(X).argmax(axis=1)
+        classes = np.asarray(classes)
+        out = np.zeros((len(X), self._leaf_contrib.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), _CHUNK_ROWS):
+            chunk = slice(start, start + _CHUNK_ROWS)
+            positions = self._leaf_positions(X[chunk])
+            chunk_classes = classes[chunk]
+            for c in np.unique(chunk_classes):
+                rows = np.flatnonzero(chunk_classes == c)
+                trees = np.flatnonzero(self.tree_class == c)
+                out[start + rows] = self._leaf_contrib[positions[np.ix_(rows, trees)]].sum(
+                    axis=1, dtype=np.float64,
+                )
+        return out
@@ -0,0 +1,198 @@
+"""
+Tuning — parallel hyperparameter search for the typology classifier.
+
+Owner: HET ONLY
+
+Every candidate (max_depth x n_estimators x learning_rate) is fitted on a
+process pool with early stopping on a held-out validation split and scored
+on a separate test split. Each fitted model is then compiled to the serving
+engine (tree_engine.CompiledForest) and timed one candidate at a time in
+the parent process — single-row latency and batch throughput — so the
+timings are not skewed by the pool. The model is chosen from the
+accuracy-vs-latency Pareto front rather than by accuracy alone.
+
+Usage:
+    from tuning import run_search, select_candidate
+    results = run_search(n_per_class=2000)
+    best = select_candidate(results)          # fastest near-best on the front
+    TypologyClassifier().train(params=best["params"])
+"""
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+try:
+    from ml_models.tree_engine import CompiledForest
+    from ml_models.typology_classifier import TYPOLOGY_LABELS, _generate_training_data
+except ImportError:  # run as a script from inside ml_models/
+    from tree_engine import CompiledForest
+    from typology_classifier import TYPOLOGY_LABELS, _generate_training_data
+
+# Default search space
+DEFAULT_GRID = {
+    "max_depth": [3, 4, 6, 8],
+    "n_estimators": [100, 300],
+    "learning_rate": [0.05, 0.1, 0.3],
+}
+
+# Rounds without validation improvement before a candidate stops
+_EARLY_STOPPING_ROUNDS = 20
+
+# Latency measurement
+_SINGLE_ROW_CALLS = 200
+_BATCH_ROWS = 10_000
+
+
+# --------------------------------------------------------------------------- #
+#  Worker side
+# --------------------------------------------------------------------------- #
+
+_split: dict = {}
+
+
+def _init_worker(split: dict):
+    """Pool initializer: every worker receives the data split once."""
+    _split.update(split)
+
+
+def _fit_candidate(params: dict, seed: int) -> dict:
+    """Fit one candidate with early stopping; score it on the test split."""
+    from sklearn.metrics import accuracy_score, f1_score
+    from xgboost import XGBClassifier
+
+    started = time.perf_counter()
+    model = XGBClassifier(
+        **params,
+        objective="multi:softprob",
+        num_class=len(TYPOLOGY_LABELS),
+        eval_metric="mlogloss",
+        early_stopping_rounds=_EARLY_STOPPING_ROUNDS,
+        random_state=seed,
+        n_jobs=1,          # parallelism comes from the pool
+        verbosity=0,
+    )
+    model.fit(_split["X_train"], _split["y_train"],
+              eval_set=[(_split["X_val"], _split["y_val"])], verbose=False)
+    train_seconds = time.perf_counter() - started
+
+    # Keep only the rounds up to the best validation score
+    best_iteration = int(model.best_iteration)
+    booster = model.get_booster()[: best_iteration + 1]
+    y_pred = model.predict(_split["X_test"])
+    return {
+        "params": params,
+        "best_iteration": best_iteration,
+        "n_estimators_used": best_iteration + 1,
+        "val_mlogloss": round(float(model.best_score), 6),
+        "accuracy": round(float(accuracy_score(_split["y_test"], y_pred)), 4),
+        "f1": round(float(f1_score(_split["y_test"], y_pred, average="weighted")), 4),
+        "train_seconds": round(train_seconds, 3),
+        "booster": booster.save_raw("ubj"),
+    }
+
+
+# --------------------------------------------------------------------------- #
+#  Parent side
+# --------------------------------------------------------------------------- #
+
+def _time_forest(forest: CompiledForest, X: np.ndarray) -> dict:
+    """Median single-row latency and batch throughput of the serving engine."""
+    X = np.asarray(X, dtype=np.float32)
+    forest.predict_proba(X[:1])   # warm-up
+    single = []
+    for i in range(_SINGLE_ROW_CALLS):
+        row = X[i % len(X): i % len(X) + 1]
+        start = time.perf_counter()
+        forest.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    batch = X[np.arange(_BATCH_ROWS) % len(X)]
+    start = time.perf_counter()
+    forest.predict_proba(batch)
+    batch_seconds = time.perf_counter() - start
+    return {
+        "single_row_ms": round(float(np.median(single)) * 1e3, 4),
+        "batch_rows_per_sec": round(len(batch) / batch_seconds),
+    }
+
+
+def pareto_front(results: list[dict]) -> list[dict]:
+    """
+    Candidates no other candidate beats on accuracy, single-row latency and
+    batch throughput at once (at least as good on all three, better on one).
+    """
+    def dominates(a: dict, b: dict) -> bool:
+        no_worse = (a["accuracy"] >= b["accuracy"]
+                    and a["single_row_ms"] <= b["single_row_ms"]
+                    and a["batch_rows_per_sec"] >= b["batch_rows_per_sec"])
+        better = (a["accuracy"] > b["accuracy"]
+                  or a["single_row_ms"] < b["single_row_ms"]
+                  or a["batch_rows_per_sec"] > b["batch_rows_per_sec"])
+        return no_worse and better
+
+    return [r for r in results if not any(dominates(o, r) for o in results if o is not r)]
+
+
+def select_candidate(results: list[dict], max_accuracy_drop: float = 0.005) -> dict:
+    """
+    Fastest (single-row) model on the Pareto front whose test accuracy is
+    within `max_accuracy_drop` of the best accuracy.
+    """
+    front = [r for r in results if r.get("pareto")] or pareto_front(results)
+    best_accuracy = max(r["accuracy"] for r in front)
+    eligible = [r for r in front if r["accuracy"] >= best_accuracy - max_accuracy_drop]
+    return min(eligible, key=lambda r: (r["single_row_ms"], -r["accuracy"]))
+
+
+def run_search(
+    n_per_class: int = 2000,
+    seed: int = 42,
+    grid: Optional[dict] = None,
+    workers: Optional[int] = None,
+) -> list[dict]:
+    """
+    Fit every grid candidate on a process pool and time its compiled model.
+
+    Data is split 60/20/20 into train / validation (early stopping) / test
+    (accuracy), stratified by label.
+
+    Returns:
+        One dict per candidate: params, best_iteration, n_estimators_used,
+        val_mlogloss, accuracy, f1, train_seconds, single_row_ms,
+        batch_rows_per_sec and pareto (on the accuracy-vs-latency front).
+    """
+    from sklearn.model_selection import train_test_split
+    from xgboost import Booster
+
+    grid = grid or DEFAULT_GRID
+    X, y = _generate_training_data(n_per_class=n_per_class, seed=seed)
+    X_train, X_rest, y_train, y_rest = train_test_split(
+        X, y, test_size=0.4, random_state=seed, stratify=y,
+    )
+    X_val, X_test, y_val, y_test = train_test_split(
+        X_rest, y_rest, test_size=0.5, random_state=seed, stratify=y_rest,
+    )
+    split = {"X_train": X_train, "y_train": y_train, "X_val": X_val,
+             "y_val": y_val, "X_test": X_test, "y_test": y_test}
+
+    names = list(grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(split,)) as pool:
+        fitted = list(pool.map(_fit_candidate, candidates, [seed] * len(candidates)))
+
+    results = []
+    for result in fitted:
+        booster = Booster()
+        booster.load_model(bytearray(result.pop("booster")))
+        result.update(_time_forest(CompiledForest.from_booster(booster), X_test))
+        results.append(result)
+
+    front = pareto_front(results)
+    for r in results:
+        r["pareto"] = any(r is f for f in front)
+    return results
@@ -11,15 +11,29 @@ Classifies transaction sets into AML typologies:
   - normal      (benign activity)
 
 Uses SHAP for feature-level explanations.
+
+Serving runs on a CompiledForest (tree_engine.py) exported next to the
+joblib model, so xgboost is only imported to train, explain with SHAP or
+compile a model that has no compiled copy yet.
 """
 import os
 import warnings
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import numpy as np
 import pandas as pd
-import joblib
-from xgboost import XGBClassifier
+
+try:
+    from ml_models.prediction_cache import PredictionCache, transactions_hash
+    from ml_models.timestamps import NAT_NS, infer_timestamp_format, parse_timestamps
+    from ml_models.tree_engine import CompiledForest
+except ImportError:  # run as a script from inside ml_models/
+    from prediction_cache import PredictionCache, transactions_hash
+    from timestamps import NAT_NS, infer_timestamp_format, parse_timestamps
+    from tree_engine import CompiledForest
+
+if TYPE_CHECKING:
+    from xgboost import XGBClassifier
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -27,10 +41,19 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 _HERE = os.path.dirname(os.path.abspath(__file__))
 _DEFAULT_MODEL_PATH = os.path.join(_HERE, "typology_model.joblib")
 
+
+def _compiled_path(model_path: str) -> str:
+    """typology_model.joblib → typology_model.forest.npz"""
+    return os.path.splitext(model_path)[0] + ".forest.npz"
+
+
 # --- Label mapping ---
 TYPOLOGY_LABELS = ["normal", "structuring", "smurfing", "layering", "round_tripping"]
 _LABEL_TO_INT = {lab: i for i, lab in enumerate(TYPOLOGY_LABELS)}
 
+# Cash-transaction reporting threshold (₹1,00,000) behind below_threshold_ratio
+_REPORTING_THRESHOLD = 100000
+
 
 # =========================================================================== #
 #  Feature Engineering
@@ -38,7 +61,7 @@ _LABEL_TO_INT = {lab: i for i, lab in enumerate(TYPOLOGY_LABELS)}
 
 def extract_features(transactions: list[dict]) -> dict:
     """
-    Extract ML features from a list of transaction dicts.
+    Extract ML features from a list of transaction dicts (or a TransactionTable).
 
     Features:
         total_amount          – sum of all txn amounts
@@ -51,61 +74,140 @@ def extract_features(transactions: list[dict]) -> dict:
         max_single_txn        – largest single transaction
         below_threshold_ratio – fraction of txns under ₹1,00,000
         txn_type_diversity    – number of distinct transfer types
+
+    The transactions are reduced to NumPy arrays (a TransactionTable already
+    holds them) and handed to extract_features_arrays().
     """
-    if not transactions:
-        return {k: 0.0 for k in [
-            "total_amount", "avg_amount", "num_transactions",
-            "num_unique_senders", "num_unique_receivers",
-            "time_window_days", "avg_time_gap_hours",
-            "max_single_txn", "below_threshold_ratio", "txn_type_diversity",
-        ]}
-
-    df = pd.DataFrame(transactions)
-
-    # Amount features
-    amounts = pd.to_numeric(df.get("amount", pd.Series(dtype=float)), errors="coerce").fillna(0)
-    total_amount = float(amounts.sum())
-    avg_amount = float(amounts.mean()) if len(amounts) > 0 else 0.0
-    max_single_txn = float(amounts.max()) if len(amounts) > 0 else 0.0
-    n = len(df)
-    below_threshold = int((amounts < 100000).sum())
-    below_threshold_ratio = below_threshold / n if n > 0 else 0.0
-
-    # Counter-party features
-    senders = df.get("sender", pd.Series(dtype=str))
-    receivers = df.get("receiver", pd.Series(dtype=str))
-    num_unique_senders = int(senders.nunique()) if not senders.empty else 0
-    num_unique_receivers = int(receivers.nunique()) if not receivers.empty else 0
-
-    # Time features
-    time_window_days = 0.0
-    avg_time_gap_hours = 0.0
-    if "timestamp" in df.columns:
-        try:
-            ts = pd.to_datetime(df["timestamp"], errors="coerce").dropna().sort_values()
-            if len(ts) >= 2:
-                time_window_days = (ts.iloc[-1] - ts.iloc[0]).total_seconds() / 86400
-                gaps = ts.diff().dropna().dt.total_seconds() / 3600
-                avg_time_gap_hours = float(gaps.mean())
-        except Exception:
-            pass
-
-    # Type diversity
-    txn_types = df.get("type", pd.Series(dtype=str))
-    txn_type_diversity = int(txn_types.nunique()) if not txn_types.empty else 0
+    return extract_features_arrays(*_case_arrays(transactions))
 
-    return {
-        "total_amount": total_amount,
-        "avg_amount": avg_amount,
-        "num_transactions": float(n),
-        "num_unique_senders": float(num_unique_senders),
-        "num_unique_receivers": float(num_unique_receivers),
-        "time_window_days": time_window_days,
-        "avg_time_gap_hours": avg_time_gap_hours,
-        "max_single_txn": max_single_txn,
-        "below_threshold_ratio": below_threshold_ratio,
-        "txn_type_diversity": float(txn_type_diversity),
+
+def _as_amount(value) -> float:
+    """float(value), with unparseable or missing amounts counted as 0."""
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if amount != amount else amount
+
+
+def _entity_codes(values) -> np.ndarray:
+    """Integer codes by first appearance; None/NaN get -1 (not counted as distinct)."""
+    vocab: dict = {}
+    return np.fromiter(
+        (-1 if v is None or v != v else vocab.setdefault(v, len(vocab)) for v in values),
+        dtype=np.int64, count=len(values),
+    )
+
+
+def _epoch_ns(values) -> np.ndarray:
+    """One case's timestamps as int64 epoch ns, parsed like a TransactionTable's."""
+    return parse_timestamps(values, infer_timestamp_format(values))
+
+
+def _case_arrays(transactions) -> tuple:
+    """(amounts, timestamps, sender_codes, receiver_codes, type_codes) for one case."""
+    if hasattr(transactions, "sender_codes"):
+        return (
+            transactions.amounts, transactions.timestamps,
+            transactions.sender_codes, transactions.receiver_codes, transactions.type_codes,
+        )
+    transactions = list(transactions)
+    return (
+        np.array([_as_amount(t.get("amount")) for t in transactions], dtype=np.float64),
+        _epoch_ns([t.get("timestamp") for t in transactions]),
+        _entity_codes([t.get("sender") for t in transactions]),
+        _entity_codes([t.get("receiver") for t in transactions]),
+        _entity_codes([t.get("type") for t in transactions]),
+    )
+
+
+def _distinct_per_segment(codes: np.ndarray, segment: np.ndarray, n_segments: int) -> np.ndarray:
+    """Number of distinct non-negative codes within each segment."""
+    valid = codes >= 0
+    if not valid.any():
+        return np.zeros(n_segments, dtype=np.int64)
+    width = int(codes.max()) + 1
+    keys = np.unique(segment[valid].astype(np.int64) * width + codes[valid])
+    return np.bincount(keys // width, minlength=n_segments)
+
+
+def extract_features_grouped(
+    offsets, amounts, timestamps, sender_codes, receiver_codes, type_codes,
+) -> np.ndarray:
+    """
+    FEATURE_NAMES for many cases in one pass over concatenated arrays.
+
+    Case i owns rows offsets[i]:offsets[i+1] of every array. Entity codes
+    only need to be consistent within a case (each case may use its own
+    vocabulary). The mean gap between consecutive sorted timestamps
+    telescopes to (last - first) / (n - 1), so no per-case sort is needed.
+
+    Args:
+        offsets: int array of length n_cases + 1, starting at 0
+        amounts: float64 amounts
+        timestamps: int64 epoch nanoseconds, NaT (int64 min) for missing
+        sender_codes, receiver_codes, type_codes: integer codes, -1 for missing
+
+    Returns:
+        float64 matrix of shape (n_cases, len(FEATURE_NAMES)).
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    timestamps = np.asarray(timestamps).view(np.int64)
+    n_cases = len(offsets) - 1
+    counts = np.diff(offsets)
+    out = np.zeros((n_cases, len(FEATURE_NAMES)), dtype=np.float64)
+    if n_cases == 0 or len(amounts) == 0:
+        return out
+
+    # reduceat over non-empty segments only: empty ones would read a stray row
+    has_rows = counts > 0
+    starts = offsets[:-1][has_rows]
+    n = counts[has_rows].astype(np.float64)
+
+    total = np.add.reduceat(amounts, starts)
+    below = np.add.reduceat((amounts < _REPORTING_THRESHOLD).astype(np.int64), starts)
+
+    valid_ts = timestamps != NAT_NS
+    first = np.minimum.reduceat(np.where(valid_ts, timestamps, np.iinfo(np.int64).max), starts)
+    last = np.maximum.reduceat(np.where(valid_ts, timestamps, NAT_NS), starts)
+    n_ts = np.add.reduceat(valid_ts.astype(np.int64), starts)
+    span = np.where(n_ts >= 2, (last - first) / 1e9, 0.0)
+
+    segment = np.repeat(np.arange(n_cases), counts)
+    columns = {
+        "total_amount": total,
+        "avg_amount": total / n,
+        "num_transactions": n,
+        "num_unique_senders": _distinct_per_segment(np.asarray(sender_codes), segment, n_cases)[has_rows],
+        "num_unique_receivers": _distinct_per_segment(np.asarray(receiver_codes), segment, n_cases)[has_rows],
+        "time_window_days": span / 86400,
+        "avg_time_gap_hours": span / 3600 / np.maximum(n_ts - 1, 1),
+        "max_single_txn": np.maximum.reduceat(amounts, starts),
+        "below_threshold_ratio": below / n,
+        "txn_type_diversity": _distinct_per_segment(np.asarray(type_codes), segment, n_cases)[has_rows],
     }
+    for j, name in enumerate(FEATURE_NAMES):
+        out[has_rows, j] = columns[name]
+    return out
+
+
+def _feature_matrix(cases: list) -> np.ndarray:
+    """(n_cases, FEATURE_NAMES) matrix for many cases via extract_features_grouped()."""
+    arrays = [_case_arrays(txns) for txns in cases]
+    if not arrays:
+        return np.zeros((0, len(FEATURE_NAMES)))
+    offsets = np.concatenate([[0], np.cumsum([len(a[0]) for a in arrays])])
+    columns = [np.concatenate([a[k] for a in arrays]) for k in range(5)]
+    return extract_features_grouped(offsets, *columns)
+
+
+def extract_features_arrays(amounts, timestamps, sender_codes, receiver_codes, type_codes) -> dict:
+    """extract_features() for one case given as pre-parsed arrays (see extract_features_grouped)."""
+    row = extract_features_grouped(
+        [0, len(amounts)], amounts, timestamps, sender_codes, receiver_codes, type_codes,
+    )[0]
+    return {name: float(value) for name, value in zip(FEATURE_NAMES, row)}
 
 
 FEATURE_NAMES = [
@@ -116,104 +218,264 @@ FEATURE_NAMES = [
 ]
 
 
+class FeatureAccumulator:
+    """
+    extract_features() maintained incrementally as transactions are added.
+
+    Every feature is a sum, count, maximum or distinct count, so batches are
+    folded in without revisiting earlier ones. The mean gap between
+    consecutive (sorted) timestamps telescopes to (last - first) / (n - 1),
+    so only the earliest and latest timestamps are kept.
+
+    Usage:
+        acc = FeatureAccumulator()
+        acc.update(history)        # list of dicts or a TransactionTable
+        acc.update(new_rows)
+        acc.features()             # == extract_features(history + new_rows)
+    """
+
+    def __init__(self):
+        self.num_transactions = 0
+        self.total_amount = 0.0
+        self.max_single_txn = 0.0
+        self.below_threshold = 0
+        self.senders: set = set()
+        self.receivers: set = set()
+        self.txn_types: set = set()
+        self.num_timestamps = 0
+        self.first_ts: Optional[int] = None   # epoch ns
+        self.last_ts: Optional[int] = None
+        # Layout inferred from the first batch with a timestamp; later
+        # batches are parsed with it, as if the case were parsed at once
+        self.timestamp_format: Optional[str] = None
+
+    def update(self, transactions):
+        """Fold a batch of transactions into the running totals."""
+        if not len(transactions):
+            return
+        if hasattr(transactions, "to_frame"):
+            df = transactions.to_frame()
+        else:
+            df = pd.DataFrame(transactions)
+
+        amounts = pd.to_numeric(df.get("amount", pd.Series(dtype=float)), errors="coerce").fillna(0)
+        if len(amounts) > 0:
+            batch_max = float(amounts.max())
+            self.max_single_txn = batch_max if self.num_transactions == 0 else max(self.max_single_txn, batch_max)
+        self.num_transactions += len(df)
+        self.total_amount += float(amounts.sum())
+        self.below_threshold += int((amounts < _REPORTING_THRESHOLD).sum())
+
+        for column, seen in (("sender", self.senders), ("receiver", self.receivers),
+                             ("type", self.txn_types)):
+            if column in df.columns:
+                seen.update(df[column].dropna().unique().tolist())
+
+        ts = self._timestamps(transactions)
+        ts = ts[ts != NAT_NS]
+        if len(ts):
+            first, last = int(ts.min()), int(ts.max())
+            self.first_ts = first if self.first_ts is None else min(self.first_ts, first)
+            self.last_ts = last if self.last_ts is None else max(self.last_ts, last)
+            self.num_timestamps += len(ts)
+
+    def _timestamps(self, transactions) -> np.ndarray:
+        """Epoch-ns timestamps of a batch, parsed with the case's layout."""
+        if hasattr(transactions, "timestamp_strings"):
+            batch_format = transactions.timestamp_format
+            if self.timestamp_format is None or batch_format in (None, self.timestamp_format):
+                self.timestamp_format = self.timestamp_format or batch_format
+                return transactions.timestamps
+            values = transactions.timestamp_strings()
+        else:
+            values = [t.get("timestamp") for t in transactions]
+        if self.timestamp_format is None:
+            self.timestamp_format = infer_timestamp_format(values)
+        return parse_timestamps(values, self.timestamp_format)
+
+    def features(self) -> dict:
+        """Current feature dict, in the same shape as extract_features()."""
+        n = self.num_transactions
+        if n == 0:
+            return {k: 0.0 for k in FEATURE_NAMES}
+
+        time_window_days = 0.0
+        avg_time_gap_hours = 0.0
+        if self.num_timestamps >= 2:
+            span = (self.last_ts - self.first_ts) / 1e9
+            time_window_days = span / 86400
+            avg_time_gap_hours = span / 3600 / (self.num_timestamps - 1)
+
+        return {
+            "total_amount": self.total_amount,
+            "avg_amount": self.total_amount / n,
+            "num_transactions": float(n),
+            "num_unique_senders": float(len(self.senders)),
+            "num_unique_receivers": float(len(self.receivers)),
+            "time_window_days": time_window_days,
+            "avg_time_gap_hours": avg_time_gap_hours,
+            "max_single_txn": self.max_single_txn,
+            "below_threshold_ratio": self.below_threshold / n,
+            "txn_type_diversity": float(len(self.txn_types)),
+        }
+
+
 # =========================================================================== #
 #  Synthetic Training Data Generator
 # =========================================================================== #
 
+# Rows per class drawn from one child seed; in-memory data and shards of the
+# same size draw identical rows for the same seed
+_GEN_CHUNK = 1_000_000
+
+
+def _normal_rows(rng: np.random.Generator, n: int) -> dict:
+    return {
+        "total_amount": rng.uniform(50000, 500000, n),
+        "avg_amount": rng.uniform(10000, 100000, n),
+        "num_transactions": rng.integers(1, 10, n),
+        "num_unique_senders": rng.integers(1, 4, n),
+        "num_unique_receivers": rng.integers(1, 4, n),
+        "time_window_days": rng.uniform(1, 30, n),
+        "avg_time_gap_hours": rng.uniform(12, 168, n),     # hours between txns
+        "max_single_txn": rng.uniform(10000, 200000, n),
+        "below_threshold_ratio": rng.uniform(0.0, 0.4, n),
+        "txn_type_diversity": rng.integers(1, 3, n),
+    }
+
+
+def _structuring_rows(rng: np.random.Generator, n: int) -> dict:
+    n_txn = rng.integers(10, 30, n)
+    amt = rng.uniform(80000, 99000, n)
+    return {
+        "total_amount": amt * n_txn,
+        "avg_amount": amt,
+        "num_transactions": n_txn,
+        "num_unique_senders": np.ones(n),                  # same sender
+        "num_unique_receivers": np.ones(n),                # same receiver
+        "time_window_days": rng.uniform(1, 5, n),
+        "avg_time_gap_hours": rng.uniform(0.5, 4, n),
+        "max_single_txn": rng.uniform(85000, 99900, n),    # always under 1L
+        "below_threshold_ratio": rng.uniform(0.9, 1.0, n), # most under thresh
+        "txn_type_diversity": np.ones(n),                  # single type
+    }
+
+
+def _smurfing_rows(rng: np.random.Generator, n: int) -> dict:
+    n_senders = rng.integers(8, 25, n)
+    avg_a = rng.uniform(70000, 150000, n)
+    return {
+        "total_amount": avg_a * n_senders,
+        "avg_amount": avg_a,
+        "num_transactions": n_senders,
+        "num_unique_senders": n_senders,                   # many unique senders
+        "num_unique_receivers": np.ones(n),                # single receiver
+        "time_window_days": rng.uniform(1, 7, n),
+        "avg_time_gap_hours": rng.uniform(0.5, 6, n),
+        "max_single_txn": rng.uniform(100000, 200000, n),
+        "below_threshold_ratio": rng.uniform(0.3, 0.8, n),
+        "txn_type_diversity": rng.integers(1, 3, n),
+    }
+
+
+def _layering_rows(rng: np.random.Generator, n: int) -> dict:
+    n_hops = rng.integers(8, 20, n)
+    base_amt = rng.uniform(1000000, 5000000, n)
+    return {
+        "total_amount": base_amt * 0.95 * n_hops,          # amounts decrease
+        "avg_amount": base_amt * 0.95,
+        "num_transactions": n_hops,
+        "num_unique_senders": n_hops - rng.integers(0, 3, n),   # many intermediaries
+        "num_unique_receivers": n_hops - rng.integers(0, 3, n),
+        "time_window_days": rng.uniform(0.1, 3, n),        # very fast
+        "avg_time_gap_hours": rng.uniform(0.2, 3, n),      # rapid hops
+        "max_single_txn": base_amt * rng.uniform(0.9, 1.1, n),
+        "below_threshold_ratio": rng.uniform(0.0, 0.2, n), # large amounts
+        "txn_type_diversity": rng.integers(2, 4, n),       # mixed types
+    }
+
+
+def _round_tripping_rows(rng: np.random.Generator, n: int) -> dict:
+    amt_rt = rng.uniform(500000, 3000000, n)
+    return {
+        "total_amount": amt_rt * rng.uniform(2, 6, n),
+        "avg_amount": amt_rt,
+        "num_transactions": rng.integers(4, 12, n),
+        "num_unique_senders": rng.integers(2, 5, n),
+        "num_unique_receivers": rng.integers(2, 5, n),     # sender = receiver
+        "time_window_days": rng.uniform(5, 30, n),
+        "avg_time_gap_hours": rng.uniform(12, 72, n),
+        "max_single_txn": amt_rt * rng.uniform(0.9, 1.5, n),
+        "below_threshold_ratio": rng.uniform(0.0, 0.3, n),
+        "txn_type_diversity": rng.integers(2, 4, n),
+    }
+
+
+# One generator per label, in TYPOLOGY_LABELS order
+_CLASS_GENERATORS = (
+    _normal_rows, _structuring_rows, _smurfing_rows, _layering_rows, _round_tripping_rows,
+)
+
+
+def _draw_training_chunk(seed_seq: np.random.SeedSequence, n_per_class: int) -> tuple:
+    """n_per_class rows of every class, interleaved by label like the original loop."""
+    rng = np.random.default_rng(seed_seq)
+    X = np.empty((n_per_class, len(_CLASS_GENERATORS), len(FEATURE_NAMES)))
+    for label, generate in enumerate(_CLASS_GENERATORS):
+        columns = generate(rng, n_per_class)
+        for j, name in enumerate(FEATURE_NAMES):
+            X[:, label, j] = columns[name]
+    y = np.tile(np.arange(len(_CLASS_GENERATORS)), n_per_class)
+    return X.reshape(-1, len(FEATURE_NAMES)), y
+
+
+def _training_chunks(n_per_class: int, seed: int, chunk: int = _GEN_CHUNK):
+    """Yield (X, y) chunks of up to `chunk` rows per class from child seeds of `seed`."""
+    n_chunks = -(-n_per_class // chunk)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        yield _draw_training_chunk(child, min(chunk, n_per_class - i * chunk))
+
+
 def _generate_training_data(n_per_class: int = 1000, seed: int = 42) -> tuple:
     """Generate synthetic training data for each typology class."""
-    rng = np.random.RandomState(seed)
-    rows = []
-
-    for _ in range(n_per_class):
-        # --- NORMAL ---
-        rows.append({
-            "label": 0,
-            "total_amount": rng.uniform(50000, 500000),
-            "avg_amount": rng.uniform(10000, 100000),
-            "num_transactions": rng.randint(1, 10),
-            "num_unique_senders": rng.randint(1, 4),
-            "num_unique_receivers": rng.randint(1, 4),
-            "time_window_days": rng.uniform(1, 30),
-            "avg_time_gap_hours": rng.uniform(12, 168),     # hours between txns
-            "max_single_txn": rng.uniform(10000, 200000),
-            "below_threshold_ratio": rng.uniform(0.0, 0.4),
-            "txn_type_diversity": rng.randint(1, 3),
-        })
-
-        # --- STRUCTURING ---
-        n_txn = rng.randint(10, 30)
-        amt = rng.uniform(80000, 99000)
-        rows.append({
-            "label": 1,
-            "total_amount": amt * n_txn,
-            "avg_amount": amt,
-            "num_transactions": n_txn,
-            "num_unique_senders": 1,                          # same sender
-            "num_unique_receivers": 1,                        # same receiver
-            "time_window_days": rng.uniform(1, 5),
-            "avg_time_gap_hours": rng.uniform(0.5, 4),
-            "max_single_txn": rng.uniform(85000, 99900),     # always under 1L
-            "below_threshold_ratio": rng.uniform(0.9, 1.0),  # most under thresh
-            "txn_type_diversity": 1,                          # single type
-        })
-
-        # --- SMURFING ---
-        n_senders = rng.randint(8, 25)
-        avg_a = rng.uniform(70000, 150000)
-        rows.append({
-            "label": 2,
-            "total_amount": avg_a * n_senders,
-            "avg_amount": avg_a,
-            "num_transactions": n_senders,
-            "num_unique_senders": n_senders,                  # many unique senders
-            "num_unique_receivers": 1,                        # single receiver
-            "time_window_days": rng.uniform(1, 7),
-            "avg_time_gap_hours": rng.uniform(0.5, 6),
-            "max_single_txn": rng.uniform(100000, 200000),
-            "below_threshold_ratio": rng.uniform(0.3, 0.8),
-            "txn_type_diversity": rng.randint(1, 3),
-        })
-
-        # --- LAYERING ---
-        n_hops = rng.randint(8, 20)
-        base_amt = rng.uniform(1000000, 5000000)
-        rows.append({
-            "label": 3,
-            "total_amount": base_amt * 0.95 * n_hops,        # amounts decrease
-            "avg_amount": base_amt * 0.95,
-            "num_transactions": n_hops,
-            "num_unique_senders": n_hops - rng.randint(0, 3), # many intermediaries
-            "num_unique_receivers": n_hops - rng.randint(0, 3),
-            "time_window_days": rng.uniform(0.1, 3),          # very fast
-            "avg_time_gap_hours": rng.uniform(0.2, 3),        # rapid hops
-            "max_single_txn": base_amt * rng.uniform(0.9, 1.1),
-            "below_threshold_ratio": rng.uniform(0.0, 0.2),   # large amounts
-            "txn_type_diversity": rng.randint(2, 4),           # mixed types
-        })
-
-        # --- ROUND TRIPPING ---
-        amt_rt = rng.uniform(500000, 3000000)
-        rows.append({
-            "label": 4,
-            "total_amount": amt_rt * rng.uniform(2, 6),
-            "avg_amount": amt_rt,
-            "num_transactions": rng.randint(4, 12),
-            "num_unique_senders": rng.randint(2, 5),
-            "num_unique_receivers": rng.randint(2, 5),         # sender = receiver
-            "time_window_days": rng.uniform(5, 30),
-            "avg_time_gap_hours": rng.uniform(12, 72),
-            "max_single_txn": amt_rt * rng.uniform(0.9, 1.5),
-            "below_threshold_ratio": rng.uniform(0.0, 0.3),
-            "txn_type_diversity": rng.randint(2, 4),
-        })
-
-    df = pd.DataFrame(rows)
-    X = df[FEATURE_NAMES].values
-    y = df["label"].values
+    chunks = list(_training_chunks(n_per_class, seed))
+    X = np.concatenate([c[0] for c in chunks])
+    y = np.concatenate([c[1] for c in chunks])
     return X, y
 
 
+def write_training_shards(
+    out_dir: str, n_per_class: int, seed: int = 42, rows_per_class: int = _GEN_CHUNK,
+) -> list[str]:
+    """
+    Write synthetic training data as .npz shards (X float32, y int8).
+
+    Each shard holds `rows_per_class` rows of every class, so tens of
+    millions of rows never need to sit in memory at once. The same seed and
+    shard size always write the same rows.
+
+    Returns:
+        Shard paths, in order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i, (X, y) in enumerate(_training_chunks(n_per_class, seed, chunk=rows_per_class)):
+        path = os.path.join(out_dir, f"shard-{i:05d}.npz")
+        np.savez(path, X=X.astype(np.float32), y=y.astype(np.int8))
+        paths.append(path)
+    return paths
+
+
+def load_training_shards(paths: list[str]) -> tuple:
+    """Concatenate shards written by write_training_shards() into (X, y)."""
+    Xs, ys = [], []
+    for path in paths:
+        with np.load(path) as shard:
+            Xs.append(shard["X"])
+            ys.append(shard["y"])
+    return np.concatenate(Xs), np.concatenate(ys)
+
+
 # =========================================================================== #
 #  Classifier
 # =========================================================================== #
@@ -234,20 +496,44 @@ class TypologyClassifier:
         explanation = clf.explain(transactions)
     """
 
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        approx_contribs: bool = True,
+        cache_bytes: int = 64 * 1024 * 1024,
+    ):
         self.model_path = model_path or _DEFAULT_MODEL_PATH
-        self.model: Optional[XGBClassifier] = None
+        # Per-case top_features use Saabas contributions (one root-to-leaf
+        # walk per tree, XGBoost's approx_contribs); exact TreeSHAP needs the
+        # XGBoost model and is far slower on large batches
+        self.approx_contribs = approx_contribs
+        self.compiled_path = _compiled_path(self.model_path)
+        # XGBoost model: loaded on demand (training, SHAP, exact contributions)
+        self.model: Optional["XGBClassifier"] = None
+        # Flat-array copy of the trees that serves predictions
+        self.forest: Optional[CompiledForest] = None
+        # predict_cached(): (transactions hash, model_version) → features + prediction
+        self.cache = PredictionCache(max_bytes=cache_bytes)
         self.typology_labels = TYPOLOGY_LABELS
+        # SHAP TreeExplainer for the current model, built on first explain()
+        self._explainer = None
 
     # ---- Training -------------------------------------------------------- #
 
-    def train(self, n_per_class: int = 1000, seed: int = 42) -> dict:
+    def train(self, n_per_class: int = 1000, seed: int = 42, params: Optional[dict] = None) -> dict:
         """
         Train the XGBoost classifier on synthetic data and save to disk.
 
+        Args:
+            params: Overrides for n_estimators / max_depth / learning_rate,
+                    e.g. a candidate picked by tuning.select_candidate()
+
         Returns:
-            Dict with accuracy, f1, precision, recall, and classification report.
+            Dict with accuracy, f1, precision, recall, classification report
+            and the hyperparameters used.
         """
+        import joblib
+        from xgboost import XGBClassifier
         from sklearn.model_selection import train_test_split
         from sklearn.metrics import (
             accuracy_score, f1_score, precision_score, recall_score,
@@ -259,10 +545,9 @@ class TypologyClassifier:
             X, y, test_size=0.2, random_state=seed, stratify=y,
         )
 
+        hyperparams = {"n_estimators": 200, "max_depth": 6, "learning_rate": 0.1, **(params or {})}
         self.model = XGBClassifier(
-            n_estimators=200,
-            max_depth=6,
-            learning_rate=0.1,
+            **hyperparams,
             objective="multi:softprob",
             num_class=len(TYPOLOGY_LABELS),
             eval_metric="mlogloss",
@@ -271,6 +556,8 @@ class TypologyClassifier:
             verbosity=0,
         )
         self.model.fit(X_train, y_train)
+        self._explainer = None
+        self.cache.clear()
 
         y_pred = self.model.predict(X_test)
         acc = accuracy_score(y_test, y_pred)
@@ -285,6 +572,8 @@ class TypologyClassifier:
 
         # Save model
         joblib.dump(self.model, self.model_path)
+        self.forest = CompiledForest.from_booster(self.model.get_booster())
+        self.forest.save(self.compiled_path)
         print(f"[TypologyClassifier] Model saved to {self.model_path}")
         print(f"[TypologyClassifier] Accuracy={acc:.4f}  F1={f1:.4f}  "
               f"Precision={prec:.4f}  Recall={rec:.4f}")
@@ -295,19 +584,107 @@ class TypologyClassifier:
             "precision": round(prec, 4),
             "recall": round(rec, 4),
             "classification_report": report,
+            "params": hyperparams,
+        }
+
+    def update(self, X: np.ndarray, y: np.ndarray, rounds: int = 10) -> dict:
+        """
+        Continue boosting the current model on new labeled rows only.
+
+        Adds `rounds` trees per class fitted to the residuals of the existing
+        ensemble on (X, y), so the cost depends on the number of new rows,
+        not on how much data the model has seen before. The new model is
+        saved and compiled before it replaces the one serving predictions.
+
+        Args:
+            X: (n, len(FEATURE_NAMES)) feature matrix
+            y: Label indices into TYPOLOGY_LABELS
+
+        Returns:
+            Dict with rows, rounds, total trees, seconds and model_version.
+        """
+        import time
+        import joblib
+        import xgboost as xgb
+
+        started = time.perf_counter()
+        current = self._xgb_model()
+        config = current.get_params()
+        params = {
+            "objective": "multi:softprob",
+            "num_class": len(TYPOLOGY_LABELS),
+            "max_depth": config.get("max_depth") or 6,
+            "eta": config.get("learning_rate") or 0.1,
+            "seed": config.get("random_state") or 0,
+            "verbosity": 0,
+        }
+        booster = xgb.train(
+            params,
+            xgb.DMatrix(np.asarray(X, dtype=np.float32), label=np.asarray(y)),
+            num_boost_round=rounds,
+            xgb_model=current.get_booster(),
+        )
+
+        # Same wrapper settings, continued trees
+        model = xgb.XGBClassifier(
+            **{**config, "n_estimators": booster.num_boosted_rounds()},
+        )
+        model.load_model(bytearray(booster.save_raw("ubj")))
+        forest = CompiledForest.from_booster(booster)
+
+        joblib.dump(model, self.model_path)
+        forest.save(self.compiled_path)
+        self.model = model
+        self.forest = forest
+        self._explainer = None
+        self.cache.clear()
+
+        seconds = time.perf_counter() - started
+        print(f"[TypologyClassifier] Updated on {len(y)} row(s) in {seconds:.2f}s "
+              f"({booster.num_boosted_rounds()} rounds)")
+        return {
+            "rows": int(len(y)),
+            "rounds": rounds,
+            "total_rounds": booster.num_boosted_rounds(),
+            "seconds": round(seconds, 3),
+            "model_version": self.model_version,
         }
 
     # ---- Model Loading --------------------------------------------------- #
 
     def load_model(self):
-        """Load trained model from disk."""
+        """Load trained model from disk (its compiled copy, when up to date)."""
         if not os.path.exists(self.model_path):
             raise FileNotFoundError(
                 f"Model not found at {self.model_path}. Run train() first."
             )
-        self.model = joblib.load(self.model_path)
+        self.model = None
+        self._explainer = None
+        self.cache.clear()   # entries of a previous model can no longer hit
+        if (os.path.exists(self.compiled_path)
+                and os.path.getmtime(self.compiled_path) >= os.path.getmtime(self.model_path)):
+            self.forest = CompiledForest.load(self.compiled_path)
+        else:
+            # No (or stale) compiled copy: compile once from the XGBoost model
+            self.forest = CompiledForest.from_booster(self._xgb_model().get_booster())
+            try:
+                self.forest.save(self.compiled_path)
+            except OSError as e:
+                print(f"[WARN] Could not save compiled model: {e}")
         print(f"[TypologyClassifier] Model loaded from {self.model_path}")
 
+    @property
+    def model_version(self) -> Optional[str]:
+        """Fingerprint of the loaded trees (None before load/train)."""
+        return self.forest.fingerprint if self.forest is not None else None
+
+    def _xgb_model(self) -> "XGBClassifier":
+        """The XGBoost model itself, unpickled on first use."""
+        if self.model is None:
+            import joblib
+            self.model = joblib.load(self.model_path)
+        return self.model
+
     # ---- Prediction ------------------------------------------------------ #
 
     def predict(self, transactions: list[dict]) -> dict:
@@ -322,37 +699,97 @@ class TypologyClassifier:
             {
                 "typology": "structuring",
                 "confidence": 0.92,
-                "top_features": {
-                    "num_unique_senders": 0.35,
-                    "total_amount": 0.28,
+                "top_features": {              # this case's largest
+                    "num_unique_senders": 1.35,  # contributions to the
+                    "total_amount": -0.48,       # predicted class (log-odds)
                     "time_window_days": 0.22
                 }
             }
         """
-        if self.model is None:
-            self.load_model()
+        return self.predict_from_features(extract_features(transactions))
 
-        features = extract_features(transactions)
-        X = np.array([[features[f] for f in FEATURE_NAMES]])
+    def predict_from_features(self, features: dict) -> dict:
+        """predict() for an already-extracted feature dict (e.g. from a FeatureAccumulator)."""
+        return self.predict_features_batch([features])[0]
 
-        probas = self.model.predict_proba(X)[0]
-        pred_idx = int(np.argmax(probas))
-        confidence = float(probas[pred_idx])
-        typology = TYPOLOGY_LABELS[pred_idx]
+    def predict_cached(self, transactions, features=None) -> dict:
+        """
+        predict(), memoized on the transactions' content and the model version.
 
-        # Feature importances from the model (global)
-        importances = self.model.feature_importances_
-        feat_imp = {
-            FEATURE_NAMES[i]: round(float(importances[i]), 4)
-            for i in np.argsort(importances)[::-1][:5]
-        }
+        A hit skips feature extraction and inference entirely. `features` is an
+        optional zero-arg callable producing the feature dict on a miss (e.g. an
+        appended case's running totals); by default they are extracted here.
+        """
+        if self.forest is None:
+            self.load_model()
+        key = (transactions_hash(transactions), self.model_version)
+        hit = self.cache.get(key)
+        if hit is None:
+            feats = features() if features is not None else extract_features(transactions)
+            prediction = self.predict_from_features(feats)
+            self.cache.put(key, np.array([feats[f] for f in FEATURE_NAMES]), prediction)
+        else:
+            prediction = hit[1]
+        # Callers may edit the result; keep the cached copy intact
+        return {**prediction, "top_features": dict(prediction["top_features"])}
 
-        return {
-            "typology": typology,
-            "confidence": round(confidence, 4),
-            "risk_score": int(confidence * 100) if typology != "normal" else int(confidence * 10),
-            "top_features": feat_imp,
-        }
+    def predict_batch(self, cases: list) -> list[dict]:
+        """
+        Predict typologies for many cases with a single predict_proba() call.
+
+        Args:
+            cases: One transaction list (or TransactionTable) per case
+
+        Returns:
+            One dict per case, in order, identical to predict() on that case.
+        """
+        return self._predict_matrix(_feature_matrix(cases))
+
+    def predict_features_batch(self, feature_rows: list[dict]) -> list[dict]:
+        """Score already-extracted feature dicts as one matrix."""
+        if not feature_rows:
+            return []
+        X = np.array([[features[f] for f in FEATURE_NAMES] for features in feature_rows])
+        return self._predict_matrix(X)
+
+    def _predict_matrix(self, X: np.ndarray) -> list[dict]:
+        """One compiled-forest pass over a (n_cases, FEATURE_NAMES) matrix."""
+        if self.forest is None:
+            self.load_model()
+        if len(X) == 0:
+            return []
+
+        # One forest for the whole batch, even if update() swaps it meanwhile
+        forest = self.forest
+        probas = forest.predict_proba(X)
+        pred_idx = probas.argmax(axis=1)
+
+        # Per-case attributions to the predicted class: Saabas contributions
+        # from the same tree walk, or the booster's exact TreeSHAP output
+        # (n_cases, n_classes, n_features + 1; last column is the bias)
+        if self.approx_contribs:
+            sv = forest.contributions(X, pred_idx)
+        else:
+            from xgboost import DMatrix
+            contribs = self._xgb_model().get_booster().predict(DMatrix(X), pred_contribs=True)
+            sv = contribs[np.arange(len(X)), pred_idx, :-1]
+        top = np.argsort(-np.abs(sv), axis=1, kind="stable")[:, :5]
+        top_values = np.round(np.take_along_axis(sv, top, axis=1).astype(np.float64), 4)
+
+        results = []
+        for row, proba in enumerate(probas):
+            confidence = float(proba[pred_idx[row]])
+            typology = TYPOLOGY_LABELS[pred_idx[row]]
+            results.append({
+                "typology": typology,
+                "confidence": round(confidence, 4),
+                "risk_score": int(confidence * 100) if typology != "normal" else int(confidence * 10),
+                "top_features": {
+                    FEATURE_NAMES[i]: float(v) for i, v in zip(top[row], top_values[row])
+                },
+                "model_version": forest.fingerprint,
+            })
+        return results
 
     # ---- SHAP Explanations ----------------------------------------------- #
 
@@ -372,44 +809,60 @@ class TypologyClassifier:
                 }
             }
         """
-        if self.model is None:
+        return self.explain_batch([transactions])[0]
+
+    def explain_batch(self, cases: list) -> list[dict]:
+        """SHAP explanations for many cases, in order, from one shap_values() call."""
+        return self._explain_matrix(_feature_matrix(cases))
+
+    def explain_features_batch(self, feature_rows: list[dict]) -> list[dict]:
+        """explain_batch() for already-extracted feature dicts."""
+        if not feature_rows:
+            return []
+        X = np.array([[features[f] for f in FEATURE_NAMES] for features in feature_rows])
+        return self._explain_matrix(X)
+
+    def _get_explainer(self):
+        """TreeExplainer for the loaded model, built once (it costs ~100s of ms)."""
+        if self.forest is None:
             self.load_model()
+        if self._explainer is None:
+            import shap
+            self._explainer = shap.TreeExplainer(self._xgb_model())
+        return self._explainer
 
-        import shap
-
-        features = extract_features(transactions)
-        X = np.array([[features[f] for f in FEATURE_NAMES]])
-
-        # Prediction
-        probas = self.model.predict_proba(X)[0]
-        pred_idx = int(np.argmax(probas))
-        typology = TYPOLOGY_LABELS[pred_idx]
-        confidence = float(probas[pred_idx])
+    def _explain_matrix(self, X: np.ndarray) -> list[dict]:
+        explainer = self._get_explainer()
+        if len(X) == 0:
+            return []
 
-        # SHAP values
-        explainer = shap.TreeExplainer(self.model)
+        probas = self.forest.predict_proba(X)
         shap_values = explainer.shap_values(X)
 
-        # shap_values shape: (n_samples, n_features, n_classes) or list
-        if isinstance(shap_values, list):
-            # One array per class
-            sv = shap_values[pred_idx][0]       # shape (n_features,)
-        elif shap_values.ndim == 3:
-            sv = shap_values[0, :, pred_idx]    # shape (n_features,)
-        else:
-            sv = shap_values[0]                 # fallback
-
-        # Map feature names → SHAP values (sorted by absolute impact)
-        feat_shap = {
-            FEATURE_NAMES[i]: round(float(sv[i]), 4)
-            for i in np.argsort(np.abs(sv))[::-1][:5]
-        }
-
-        return {
-            "typology": typology,
-            "confidence": round(confidence, 4),
-            "features": feat_shap,
-        }
+        results = []
+        for row, proba in enumerate(probas):
+            pred_idx = int(np.argmax(proba))
+
+            # shap_values shape: (n_samples, n_features, n_classes) or list
+            if isinstance(shap_values, list):
+                # One array per class
+                sv = shap_values[pred_idx][row]       # shape (n_features,)
+            elif shap_values.ndim == 3:
+                sv = shap_values[row, :, pred_idx]    # shape (n_features,)
+            else:
+                sv = shap_values[row]                 # fallback
+
+            # Map feature names → SHAP values (sorted by absolute impact)
+            feat_shap = {
+                FEATURE_NAMES[i]: round(float(sv[i]), 4)
+                for i in np.argsort(np.abs(sv))[::-1][:5]
+            }
+            results.append({
+                "typology": TYPOLOGY_LABELS[pred_idx],
+                "confidence": round(float(proba[pred_idx]), 4),
+                "features": feat_shap,
+            })
+        return results
 
 
 # =========================================================================== #
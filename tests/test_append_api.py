@@ -0,0 +1,61 @@
+"""Delta appends: rows need txn_ids, and a delta with nothing new is refused."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.main import app
+
+CSV_HEADER = "txn_id,sender,receiver,amount,currency,timestamp,type\n"
+
+
+def _csv(rows, with_ids=True):
+    header = CSV_HEADER if with_ids else CSV_HEADER.split(",", 1)[1]
+    lines = [
+        (f"{txn_id}," if with_ids else "") + f"Sender {i},Receiver,{50000 + i},INR,2024-01-{i + 1:02d}T10:00:00,NEFT"
+        for i, txn_id in rows
+    ]
+    return (header + "\n".join(lines) + "\n").encode()
+
+
+@pytest.fixture()
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture()
+def case_id(client):
+    r = client.post("/api/upload", files={"file": ("case.csv", _csv([(0, "A1"), (1, "A2")]), "text/csv")})
+    assert r.status_code == 200, r.text
+    return r.json()["case_id"]
+
+
+def test_append_new_rows(client, case_id):
+    r = client.post(f"/api/cases/{case_id}/append",
+                    files={"file": ("delta.csv", _csv([(2, "A2"), (3, "A3")]), "text/csv")})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["appended_count"], body["duplicate_count"], body["transaction_count"]) == (1, 1, 3)
+
+
+def test_append_without_txn_id_column_is_rejected(client, case_id):
+    r = client.post(f"/api/cases/{case_id}/append",
+                    files={"file": ("delta.csv", _csv([(2, None), (3, None)], with_ids=False), "text/csv")})
+    assert r.status_code == 400
+    assert "txn_id" in r.json()["detail"]
+    assert len(routes.cases_store[case_id]["transactions"]) == 2
+
+
+def test_append_json_without_txn_ids_is_rejected(client, case_id):
+    doc = {"transactions": [{"sender": "X", "receiver": "Receiver", "amount": 10,
+                             "timestamp": "2024-02-01T00:00:00"}]}
+    r = client.post(f"/api/cases/{case_id}/append",
+                    files={"file": ("delta.json", json.dumps(doc).encode(), "application/json")})
+    assert r.status_code == 400
+
+
+def test_append_of_only_duplicates_is_refused(client, case_id):
+    r = client.post(f"/api/cases/{case_id}/append",
+                    files={"file": ("delta.csv", _csv([(0, "A1"), (1, "A2")]), "text/csv")})
+    assert r.status_code == 409
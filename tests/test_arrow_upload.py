@@ -0,0 +1,48 @@
+"""The same data parses to the same case whether uploaded as CSV or Parquet/Arrow."""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.utils.data_parser import parse_file_columnar
+
+FRAMES = {
+    "nulls": pd.DataFrame({
+        "txn_id": ["T1", "T2", "T3"], "sender": ["A", None, "C"], "receiver": ["Ravi", "Ravi", None],
+        "amount": [10.5, None, 30.0], "type": ["NEFT", "UPI", None],
+        "timestamp": pd.to_datetime(["2024-01-01 10:00", "2024-01-02 11:30", None]),
+    }),
+    "numeric-ids": pd.DataFrame({
+        "txn_id": [101, 102, 103], "sender": [5001, None, 5003], "receiver": ["Ravi"] * 3,
+        "amount": [1.0, 2.0, 3.0], "timestamp": ["2024-01-01", "2024-01-02", "2024-01-03"],
+    }),
+    "dates-and-tz": pd.DataFrame({
+        "txn_id": ["T1", "T2"], "sender": ["A", "B"], "beneficiary": ["Ravi", "Ravi"], "amount": [1, 2],
+        "timestamp": pd.to_datetime(["2024-03-01 09:00", "2024-03-02 18:45"]).tz_localize("Asia/Kolkata"),
+    }),
+    "midnight": pd.DataFrame({
+        "txn_id": ["T1", "T2"], "sender": ["A", "B"], "receiver": ["Ravi", "Ravi"], "amount": [1, 2],
+        "timestamp": pd.to_datetime(["2024-03-01", "2024-03-02"]),
+    }),
+}
+
+
+@pytest.mark.parametrize("name", list(FRAMES))
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_columnar_upload_matches_csv(name, suffix):
+    df = FRAMES[name]
+    buf = io.BytesIO()
+    if suffix == ".parquet":
+        df.to_parquet(buf)
+    else:
+        df.to_feather(buf)
+    from_csv = parse_file_columnar(df.to_csv(index=False).encode(), f"{name}.csv")
+    columnar = parse_file_columnar(buf.getvalue(), f"{name}{suffix}")
+
+    assert columnar["transactions"].to_records() == from_csv["transactions"].to_records()
+    assert np.array_equal(columnar["transactions"].timestamps, from_csv["transactions"].timestamps)
+    assert columnar["customer"] == from_csv["customer"]
+    assert columnar["txn_ids_missing"] == from_csv["txn_ids_missing"]
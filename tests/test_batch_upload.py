@@ -0,0 +1,60 @@
+"""Batch uploads refuse zip archives that would unpack past the configured limits."""
+import io
+import os
+import tempfile
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.main import app
+
+CSV = b"txn_id,sender,receiver,amount\nT1,A,B,10\n"
+
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buf.getvalue()
+
+
+@pytest.fixture()
+def spool_dir(monkeypatch, tmp_path):
+    """Spool files land in tmp_path, so leftovers can be checked."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("limit, value", [
+    ("ZIP_MAX_MEMBERS", 2),
+    ("ZIP_MAX_MEMBER_BYTES", 1024),
+    ("ZIP_MAX_TOTAL_BYTES", 1500),
+])
+def test_oversized_archive_rejects_the_batch(monkeypatch, spool_dir, limit, value):
+    monkeypatch.setattr(routes, limit, value)
+    files = [
+        ("files", ("plain.csv", CSV, "text/csv")),
+        ("files", ("small.zip", _zip({"a.csv": CSV}), "application/zip")),
+        # 3 members, one 2000 bytes that compress to almost nothing
+        ("files", ("bomb.zip", _zip({"b.csv": CSV, "c.csv": CSV, "big.csv": CSV + b"0" * 2000}),
+                   "application/zip")),
+    ]
+    r = TestClient(app).post("/api/upload-batch", files=files)
+    assert r.status_code == 413, r.text
+    assert "bomb.zip" in r.json()["detail"]
+    assert os.listdir(spool_dir) == []
+
+
+def test_limits_count_across_archives(spool_dir):
+    unpacked = {"members": routes.ZIP_MAX_MEMBERS - 1, "bytes": 0}
+    path = os.path.join(spool_dir, "two.zip")
+    with open(path, "wb") as fh:
+        fh.write(_zip({"a.csv": CSV, "b.csv": CSV}))
+    with pytest.raises(routes.HTTPException) as refused:
+        routes._expand_upload("two.zip", path, unpacked)
+    assert refused.value.status_code == 413
+    assert unpacked["members"] == routes.ZIP_MAX_MEMBERS - 1
+    assert os.listdir(spool_dir) == []
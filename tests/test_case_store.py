@@ -0,0 +1,49 @@
+"""TransactionTable: columnar storage behind the list-of-dicts interface."""
+from app.utils.case_store import TransactionTable
+
+
+def _records(n):
+    return [
+        {"txn_id": f"T{i}", "sender": f"S{i % 7}", "receiver": f"R{i % 3}", "amount": float(i),
+         "currency": "INR", "timestamp": f"2024-01-{i % 28 + 1:02d}T10:00:00", "type": "NEFT"}
+        for i in range(n)
+    ]
+
+
+def test_repr_is_bounded():
+    table = TransactionTable.from_records(_records(50_000))
+    text = repr(table)
+    assert text.startswith("TransactionTable(50000 transactions: [{'txn_id': 'T0'")
+    assert text.endswith(", ...])")
+    assert len(text) < 1_000
+
+
+def test_records_round_trip():
+    records = _records(200)
+    # Timestamp text that does not render back as ISO seconds is kept verbatim
+    records[3]["timestamp"] = "2024-01-04T10:00:00.250000"
+    records[4]["timestamp"] = "not a date"
+    records[5]["timestamp"] = ""
+    records[6]["txn_id"] = "Tö-6"
+    records[7]["channel"] = "mobile"  # non-canonical fields survive as extras
+    table = TransactionTable.from_records(records)
+
+    assert table.to_records() == records
+    assert list(table) == records
+    assert table[7] == records[7] and table[-1] == records[-1]
+    assert table[10:13] == records[10:13]
+    assert TransactionTable.from_records(table.to_records()).content_hash() == table.content_hash()
+
+
+def test_missing_fields_get_parser_defaults():
+    table = TransactionTable.from_records([{"txn_id": "T1", "amount": 5}])
+    assert table[0] == {"txn_id": "T1", "sender": "Unknown", "receiver": "Unknown", "amount": 5.0,
+                        "currency": "INR", "timestamp": "", "type": "NEFT"}
+
+
+def test_concat_and_take_round_trip():
+    records = _records(30)
+    parts = [TransactionTable.from_records(records[i:i + 10]) for i in range(0, 30, 10)]
+    joined = TransactionTable.concat(parts)
+    assert joined.to_records() == records
+    assert joined.take([29, 0, 15]).to_records() == [records[29], records[0], records[15]]
@@ -0,0 +1,58 @@
+"""FeedbackStore: each SAR counts once in continued boosting, however often it is decided."""
+import numpy as np
+import pytest
+
+from ml_models.feedback_store import FeedbackStore
+from ml_models.typology_classifier import FEATURE_NAMES, TYPOLOGY_LABELS
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return FeedbackStore(str(tmp_path / "feedback" / "feedback.jsonl"))
+
+
+def _features(value):
+    return {name: float(value) for name in FEATURE_NAMES}
+
+
+def _labels(store):
+    return [TYPOLOGY_LABELS[i] for i in store.pending()[1]]
+
+
+def test_repeated_decision_is_recorded_once(store):
+    assert store.record("CASE-1", _features(1), "structuring", "approved", sar_id="SAR-1")
+    assert store.record("CASE-1", _features(1), "structuring", "approved", sar_id="SAR-1") is None
+    assert store.record("CASE-2", _features(2), "normal", "rejected", sar_id="SAR-2")
+    assert _labels(store) == ["structuring", "normal"]
+    assert store.stats()["total"] == 2
+    # The index of recorded decisions survives a restart
+    assert FeedbackStore(store.path).record("CASE-1", _features(1), "structuring",
+                                            "approved", sar_id="SAR-1") is None
+
+
+def test_changed_decision_replaces_the_pending_row(store):
+    store.record("CASE-1", _features(1), "structuring", "approved", sar_id="SAR-1")
+    store.record("CASE-1", _features(1), "normal", "rejected", sar_id="SAR-1")
+    X, y, _ = store.pending()
+    assert _labels(store) == ["normal"] and len(X) == 1
+    assert store.stats() == {"path": store.path, "total": 2, "pending": 1}
+
+
+def test_trained_labels_are_not_trained_again(store):
+    store.record("CASE-1", _features(1), "structuring", "approved", sar_id="SAR-1")
+    store.mark_consumed(store.pending()[2])
+    assert store.pending()[1].size == 0
+
+    # Flip-flopping back to the trained label adds nothing; a real change is a correction
+    store.record("CASE-1", _features(1), "normal", "rejected", sar_id="SAR-1")
+    store.record("CASE-1", _features(1), "structuring", "approved", sar_id="SAR-1")
+    assert _labels(store) == []
+    store.record("CASE-1", _features(1), "layering", "approved", sar_id="SAR-1")
+    assert _labels(store) == ["layering"]
+
+
+def test_case_without_sar_id_is_keyed_by_case(store):
+    store.record("CASE-1", _features(1), "smurfing", "approved")
+    assert store.record("CASE-1", _features(1), "smurfing", "approved") is None
+    X, y, end = store.pending()
+    assert np.array_equal(X, np.ones((1, len(FEATURE_NAMES))))
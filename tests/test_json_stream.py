@@ -0,0 +1,56 @@
+"""The streaming JSON parser must decode exactly what json.loads does, however the input is split."""
+import io
+import json
+
+import pytest
+
+from app.utils import data_parser
+from app.utils.data_parser import _iter_json_document, _JsonStream
+
+DOC = {
+    "case_id": "CASE-Ü1",
+    "customer": {"name": "Ravi Kumar", "account_id": "ACC-1", "notes": ["a", {"b": None}]},
+    "transactions": [
+        {"txn_id": f"T{i}", "sender": "Señor ₹ \"quoted\"\n", "receiver": "Ravi Kumar",
+         "amount": [1, 12345.678, -1e-7, 10 ** 20][i % 4], "currency": "INR",
+         "timestamp": f"2024-01-{i + 1:02d}T10:00:00", "type": "NEFT", "flag": i % 2 == 0}
+        for i in range(9)
+    ],
+    "trailer": 1234567890,
+}
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_any_read_size_decodes_like_json_loads(read_size, indent):
+    raw = json.dumps(DOC, ensure_ascii=False, indent=indent).encode("utf-8")
+    doc = {}
+    batches = list(_iter_json_document(_JsonStream(io.BytesIO(raw), read_size=read_size), doc, 4))
+
+    assert [len(b) for b in batches] == [4, 4, 1]
+    assert [txn for batch in batches for txn in batch] == json.loads(raw)["transactions"]
+    assert doc == {k: v for k, v in json.loads(raw).items() if k != "transactions"}
+
+
+def test_bare_array_and_ndjson_match_the_document():
+    expected = data_parser.parse_json(json.dumps(DOC).encode())["transactions"]
+    array = data_parser.parse_json_stream(json.dumps(DOC["transactions"]).encode(), "a.json", batch_size=2)
+    ndjson = "\n".join(json.dumps(txn) for txn in DOC["transactions"]).encode()
+    lines = data_parser.parse_json_stream(ndjson, "a.ndjson", batch_size=2)
+    assert array["transactions"] == lines["transactions"] == expected
+    assert array["ingest_stats"]["chunks"] == 5
+
+
+def test_parse_json_stream_matches_parse_json():
+    raw = json.dumps(DOC).encode()
+    streamed = data_parser.parse_json_stream(raw, "case.json", batch_size=3)
+    whole = data_parser.parse_json(raw)
+    for key in ("case_id", "customer", "transactions", "trailer"):
+        assert streamed[key] == whole[key]
+    assert streamed["txn_ids_missing"] == 0
+
+
+@pytest.mark.parametrize("raw", [b'{"transactions": [{"a": 1}]} {}', b'{"transactions": [{"a": 1},]}',
+                                 b'{"transactions": [1, 2'])
+def test_malformed_documents_are_errors(raw):
+    assert "error" in data_parser.parse_json_stream(raw, "bad.json", batch_size=1)
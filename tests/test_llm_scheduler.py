@@ -0,0 +1,66 @@
+"""LLM admission control: lanes are independent and overflow becomes 429 + Retry-After."""
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core.llm_engine import LLMEngine
+from app.core.llm_scheduler import LaneFull, LLMScheduler
+from app.core.response_cache import ResponseCache
+from app.main import app
+
+
+def test_full_lane_rejects_without_blocking_the_other_lane():
+    async def run():
+        scheduler = LLMScheduler({"sar": (1, 1), "chat": (1, 0)})
+        release = asyncio.Event()
+
+        async def sar_call():
+            async with scheduler.slot("sar"):
+                await release.wait()
+
+        running = asyncio.create_task(sar_call())
+        queued = asyncio.create_task(sar_call())
+        await asyncio.sleep(0)
+        with pytest.raises(LaneFull) as refused:
+            async with scheduler.slot("sar"):
+                pass
+        async with scheduler.slot("chat"):  # SAR lane is full, chat still gets in
+            pass
+        release.set()
+        await asyncio.gather(running, queued)
+        return refused.value, scheduler.stats()
+
+    refused, stats = asyncio.run(run())
+    assert refused.lane == "sar" and refused.retry_after >= 1
+    assert (stats["sar"]["completed"], stats["sar"]["rejected"]) == (2, 1)
+    assert stats["chat"]["completed"] == 1
+
+
+@pytest.fixture()
+def busy_engine(monkeypatch, tmp_path):
+    engine = LLMEngine(response_cache=ResponseCache(os.path.join(tmp_path, "responses.sqlite3")),
+                       sar_max_queue=0, chat_max_queue=0)
+    for lane in engine.scheduler.lanes.values():
+        lane.running = lane.concurrency  # every slot taken, nothing may queue
+    monkeypatch.setattr(routes, "_llm_engine", engine)
+    monkeypatch.setitem(routes.cases_store, "CASE-BUSY", {
+        "customer": {"name": "A"},
+        "transactions": [{"txn_id": "T1", "sender": "a", "receiver": "b", "amount": 5.0,
+                          "timestamp": "2026-01-01"}],
+    })
+    return engine
+
+
+@pytest.mark.parametrize("lane, path, body", [
+    ("chat", "/api/chat", {"case_id": "CASE-BUSY", "query": "why?", "history": []}),
+    ("sar", "/api/generate-sar/stream", {"case_id": "CASE-BUSY"}),
+])
+def test_saturated_lane_answers_429_with_retry_after(busy_engine, lane, path, body):
+    client = TestClient(app)
+    r = client.post(path, json=body)
+    assert r.status_code == 429, r.text
+    assert int(r.headers["Retry-After"]) >= 1
+    assert client.get("/api/llm/scheduler").json()[lane]["rejected"] == 1
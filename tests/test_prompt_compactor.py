@@ -0,0 +1,49 @@
+"""compact_transactions: the rendered block stays within its token budget."""
+import numpy as np
+import pytest
+
+from app.core.prompt_compactor import compact_transactions, estimate_tokens
+from app.utils.case_store import TransactionTable
+
+
+def _transactions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    amounts = rng.lognormal(10, 1.5, n).round(2)
+    amounts[n // 3] = 99_999.99  # just below the reporting threshold
+    return [
+        {"txn_id": f"TXN-{i:06d}", "sender": f"Sender Name {rng.integers(40)}",
+         "receiver": f"Receiver {rng.integers(5)}", "amount": float(amounts[i]), "currency": "INR",
+         "timestamp": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:15:00", "type": "NEFT"}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n", [1, 40, 2_000, 50_000])
+@pytest.mark.parametrize("budget", [600, 3_000])
+def test_output_fits_the_budget(n, budget):
+    compact = compact_transactions(_transactions(n), token_budget=budget)
+    assert compact["tokens"] == estimate_tokens(compact["text"])
+    assert compact["tokens"] <= budget
+    assert compact["rows_total"] == n
+
+
+def test_small_case_lists_every_row():
+    compact = compact_transactions(_transactions(40), token_budget=3_000)
+    assert compact["rows_listed"] == 40
+    assert "omitted" not in compact["text"]
+
+
+def test_large_case_keeps_the_evidence():
+    records = _transactions(50_000)
+    compact = compact_transactions(records, token_budget=3_000)
+    largest = max(records, key=lambda r: r["amount"])
+    assert compact["rows_listed"] < 50_000
+    assert largest["txn_id"] in compact["text"]
+    assert records[50_000 // 3]["txn_id"] in compact["text"]  # near-threshold row
+    assert "more transactions omitted" in compact["text"]
+
+
+def test_table_and_records_render_the_same():
+    records = _transactions(500)
+    assert (compact_transactions(TransactionTable.from_records(records), token_budget=1_500)
+            == compact_transactions(records, token_budget=1_500))
@@ -0,0 +1,59 @@
+"""SAR audit trails number their steps in order, with or without the response cache."""
+import asyncio
+import os
+
+import pytest
+
+from app.core.llm_engine import LLMEngine
+from app.core.response_cache import ResponseCache
+from benchmarks.bench_llm_client import StubOllama
+
+CASE = {
+    "case_id": "CASE-AUDIT",
+    "customer": {"name": "Ravi Kumar"},
+    "transactions": [{"txn_id": f"T{i}", "sender": "A", "receiver": "Ravi Kumar", "amount": 95000.0,
+                      "currency": "INR", "timestamp": f"2024-01-0{i + 1}T10:00:00", "type": "NEFT"}
+                     for i in range(3)],
+}
+
+
+@pytest.fixture(scope="module")
+def host():
+    return StubOllama().start()
+
+
+def _trails(host, tmp_path, cache):
+    async def run():
+        engine = LLMEngine(
+            base_url=f"http://127.0.0.1:{host.port}",
+            response_cache=ResponseCache(os.path.join(tmp_path, "responses.sqlite3")),
+            cache_responses=cache,
+        )
+
+        async def no_context(query, top_k=5):
+            return []
+        engine.rag_pipeline.retrieve_context = no_context
+        try:
+            results = [await engine.generate_sar(CASE), await engine.generate_sar(CASE),
+                       await engine.generate_sar(CASE, force_regenerate=True)]
+        finally:
+            await engine.aclose()
+        return [[(s["step"], s["action"]) for s in r["audit_trail"]] for r in results]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("cache", [True, False], ids=["cached", "uncached"])
+def test_steps_are_numbered_in_order(host, tmp_path, cache):
+    for trail in _trails(host, tmp_path, cache):
+        steps = [step for step, _ in trail]
+        assert steps == list(range(1, len(steps) + 1)), trail
+        assert trail[-1][1] == "Parsing Complete"
+
+
+def test_cache_hit_trail(host, tmp_path):
+    miss, hit, bypass = _trails(host, tmp_path, cache=True)
+    assert ("Cache Miss" in dict(miss).values()) and ("Prompting Model" in dict(miss).values())
+    assert [action for _, action in hit[4:]] == ["Cache Hit", "Generated Response (cached)",
+                                                 "Parsing Complete"]
+    assert "Cache Bypassed" in dict(bypass).values()
@@ -0,0 +1,54 @@
+"""Schema profiles: re-uploading a feed through its learned profile gives the same transactions."""
+import pytest
+
+from app.utils import data_parser
+
+FILES = {
+    # memo is the only text column, and the profile does not read it
+    "numeric-ids": "txn_id,sender,receiver,amount,memo\n101,5001,7001,100.5,salary\n102,5002,7001,20,rent\n",
+    "all-numeric": "txn_id,sender,receiver,amount\n101,5001,7001,100.5\n102,5002,7001,20\n",
+    "text": "txn_id,sender,receiver,amount,timestamp\nA1,Ravi,Asha,10,2024-01-01\nA2,Ravi,,20,2024-01-02\n",
+}
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """A fresh profile registry per test (standard_export only)."""
+    profiles = {fp: p for fp, p in data_parser._SCHEMA_PROFILES.items() if not p.learned}
+    monkeypatch.setattr(data_parser, "_SCHEMA_PROFILES", profiles)
+    return profiles
+
+
+@pytest.mark.parametrize("name", list(FILES))
+@pytest.mark.parametrize("parse", [
+    data_parser.parse_csv,
+    lambda raw, filename: data_parser.parse_csv_stream(raw, filename, chunk_rows=1),
+], ids=["one-shot", "streaming"])
+def test_second_upload_through_learned_profile_is_identical(name, parse):
+    raw = FILES[name].encode()
+    first = parse(raw, "feed.csv")
+    second = parse(raw, "feed.csv")
+    assert first["ingest_stats"]["schema_profile"] is None
+    assert second["ingest_stats"]["schema_profile"].startswith("learned-")
+    assert second["transactions"] == first["transactions"]
+    assert second["customer"] == first["customer"]
+
+
+def test_numeric_ids_keep_their_text():
+    raw = FILES["numeric-ids"].encode()
+    for _ in range(2):
+        txn = data_parser.parse_csv(raw, "feed.csv")["transactions"][0]
+        assert (txn["txn_id"], txn["sender"], txn["receiver"]) == ("101", "5001", "7001")
+
+
+def test_learned_profiles_are_capped(monkeypatch, registry):
+    monkeypatch.setattr(data_parser, "MAX_LEARNED_PROFILES", 3)
+    headers = [["txn_id", "sender", "receiver", "amount", f"note_{i}"] for i in range(5)]
+    for header in headers[:4]:
+        data_parser.parse_csv(f"{','.join(header)}\nT1,a,b,1,x\n".encode(), "feed.csv")
+    data_parser.get_schema_profile(headers[1])  # recently used, so it is kept
+    data_parser.parse_csv(f"{','.join(headers[4])}\nT1,a,b,1,x\n".encode(), "feed.csv")
+
+    kept = [i for i, header in enumerate(headers) if data_parser.header_fingerprint(header) in registry]
+    assert kept == [1, 3, 4]
+    assert sum(p.learned for p in registry.values()) == 3
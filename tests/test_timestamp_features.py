@@ -0,0 +1,69 @@
+"""Typology features must not depend on how a case's transactions are stored."""
+import numpy as np
+import pytest
+
+from app.utils.case_store import TransactionTable, TransactionTableBuilder
+from ml_models.typology_classifier import FeatureAccumulator, extract_features
+
+
+def _rows(timestamps, start=0):
+    return [
+        {"txn_id": f"T{start + i}", "sender": f"S{i % 3}", "receiver": "R", "amount": 1000.0 * (i + 1),
+         "currency": "INR", "timestamp": ts, "type": "NEFT"}
+        for i, ts in enumerate(timestamps)
+    ]
+
+
+MIXED_CASES = [
+    ["2024-01-01T09:00:00", "2024-01-02T10:30:00", "15/01/2024", "2024-01-03T00:00:00"],
+    ["15/01/2024", "2024-01-01T09:00:00", "16/01/2024"],
+    ["", "2024-01-01", "2024-01-05 10:00:00", "2024-01-09"],
+    ["2024-01-01T10:00:00+05:30", "2024-01-02T00:00:00+05:30", "not a date"],
+    ["Jan 5 2024", "2024-01-01", "Feb 1 2024"],
+]
+
+
+def _assert_same(a: dict, b: dict):
+    assert a.keys() == b.keys()
+    for key in a:
+        assert a[key] == pytest.approx(b[key], rel=1e-12, abs=1e-9), key
+
+
+@pytest.mark.parametrize("timestamps", MIXED_CASES)
+def test_table_and_list_features_match(timestamps):
+    records = _rows(timestamps)
+    _assert_same(extract_features(TransactionTable.from_records(records)), extract_features(records))
+
+
+@pytest.mark.parametrize("timestamps", MIXED_CASES)
+def test_batched_and_appended_tables_match_list(timestamps):
+    records = _rows(timestamps)
+    expected = extract_features(records)
+
+    # Streamed in one-row batches, as the chunked parsers do
+    builder = TransactionTableBuilder()
+    for record in records:
+        builder.append([record])
+    _assert_same(extract_features(builder.build()), expected)
+
+    # Delta append: the second table infers its own layout on its own
+    head, tail = TransactionTable.from_records(records[:1]), TransactionTable.from_records(records[1:])
+    _assert_same(extract_features(TransactionTable.concat([head, tail])), expected)
+
+    acc = FeatureAccumulator()
+    acc.update(head)
+    acc.update(tail)
+    _assert_same(acc.features(), expected)
+
+
+def test_appended_rows_in_another_layout_keep_the_case_layout():
+    case = TransactionTable.from_records(_rows(["2024-01-01T00:00:00", "2024-01-15T00:00:00"]))
+    delta = TransactionTable.from_records(_rows(["15/01/2024", "16/01/2024"], start=2))
+    combined = TransactionTable.concat([case, delta])
+
+    records = case.to_records() + delta.to_records()
+    assert combined.to_records() == records
+    features = extract_features(combined)
+    assert features["time_window_days"] == pytest.approx(14.0)
+    _assert_same(features, extract_features(records))
+    assert (combined.timestamps[2:] == np.iinfo(np.int64).min).all()
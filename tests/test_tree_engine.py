@@ -0,0 +1,46 @@
+"""CompiledForest must reproduce XGBoost: probabilities bit for bit, Saabas contributions."""
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+from ml_models.tree_engine import CompiledForest
+
+
+@pytest.fixture(scope="module", params=[3, 8], ids=["quickscorer", "deep-walk"])
+def model(request):
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(3000, 6)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    y = rng.integers(0, 3, len(X))  # noise: deep trees grow well past 64 leaves
+    clf = xgb.XGBClassifier(n_estimators=20, max_depth=request.param, learning_rate=0.3,
+                            min_child_weight=0)
+    clf.fit(X, y)
+    X_test = rng.normal(size=(300, 6)).astype(np.float32)
+    X_test[rng.random(X_test.shape) < 0.2] = np.nan
+    forest = CompiledForest.from_booster(clf.get_booster())
+    # Shallow trees take the QuickScorer bitmask path, deep ones the node walk
+    assert (forest._mask_dtype is None) == (request.param > 6)
+    return clf, forest, X_test
+
+
+def test_probabilities_match_predict_proba(model):
+    clf, forest, X = model
+    assert np.array_equal(forest.predict_proba(X), clf.predict_proba(X))
+
+
+def test_contributions_match_approx_contribs(model):
+    clf, forest, X = model
+    classes = forest.predict_margin(X).argmax(axis=1)
+    expected = clf.get_booster().predict(xgb.DMatrix(X), pred_contribs=True, approx_contribs=True)
+    expected = expected[np.arange(len(X)), classes, :-1]  # drop the bias column
+    np.testing.assert_allclose(forest.contributions(X, classes), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_save_and_load_round_trip(model, tmp_path):
+    _, forest, X = model
+    path = str(tmp_path / "model.forest.npz")
+    forest.save(path)
+    loaded = CompiledForest.load(path)
+    assert loaded.fingerprint == forest.fingerprint
+    assert np.array_equal(loaded.predict_proba(X), forest.predict_proba(X))
@@ -0,0 +1,22 @@
+"""Uploads report ingest throughput whichever parse path the file takes."""
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import data_parser
+
+
+def test_small_csv_upload_reports_rows_per_sec():
+    csv = ("txn_id,sender,receiver,amount,currency,timestamp,type\n"
+           + "".join(f"T{i},Sender,Receiver,{1000 + i},INR,2024-01-01T10:{i:02d}:00,NEFT\n" for i in range(20)))
+    r = TestClient(app).post("/api/upload", files={"file": ("small.csv", csv.encode(), "text/csv")})
+    assert r.status_code == 200, r.text
+    assert r.json()["rows_per_sec"] > 0
+
+
+def test_one_shot_and_streaming_csv_stats_have_the_same_shape():
+    csv = ("txn_id,sender,receiver,amount,timestamp\n"
+           + "".join(f"T{i},S,R,{i},2024-01-01\n" for i in range(10))).encode()
+    one_shot = data_parser.parse_csv(csv, "a.csv")["ingest_stats"]
+    streamed = data_parser.parse_csv_stream(csv, "a.csv", chunk_rows=4)["ingest_stats"]
+    assert one_shot.keys() == streamed.keys()
+    assert (one_shot["rows"], one_shot["chunks"]) == (10, 1)